@@ -0,0 +1,4 @@
+"""
+Benchmarks de Kipo. Cada módulo expone funciones que devuelven
+resultados como diccionarios serializables a JSON.
+"""
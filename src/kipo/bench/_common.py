@@ -0,0 +1,49 @@
+"""
+Utilidades compartidas por los benchmarks: medición de tiempos y el
+dataset sintético de ventas.
+"""
+import statistics
+import time
+from datetime import date
+from typing import Any, Callable, Dict, List
+
+# Polars se importa al generar datos: el benchmark de arranque no debe cargarlo
+
+
+def measure(func: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """Ejecuta `func` `repeat` veces: p50, mínimo y p95 en ms y operaciones por segundo."""
+    samples: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    ordered = sorted(samples)
+    return {
+        "p50_ms": round(statistics.median(samples), 3),
+        "min_ms": round(ordered[0], 3),
+        "p95_ms": round(ordered[max(0, int(len(ordered) * 0.95) - 1)], 3),
+        "ops_per_sec": round(1000 / statistics.mean(samples), 1) if any(samples) else 0.0,
+    }
+
+
+def region_name(index: int) -> str:
+    return f"region_{index:02d}"
+
+
+def synthetic(rows: int, seed: int = 0, start: date = date(2024, 1, 1),
+              days: int = 365, regions: int = 20):
+    """
+    Ventas sintéticas desordenadas: id, fecha (en `days` días desde `start`),
+    región (`regions` distintas, ver `region_name`), cantidad, monto y un texto corto.
+    """
+    import polars as pl
+
+    i = pl.col("i")
+    return pl.DataFrame({"i": pl.arange(0, rows, eager=True)}).select(
+        id=i,
+        fecha=pl.lit(start) + pl.duration(days=i.hash(seed) % days),
+        region=pl.format("region_{}", (i.hash(seed + 1) % regions).cast(pl.String).str.zfill(2)),
+        cantidad=(i.hash(seed + 2) % 100).cast(pl.Int32),
+        monto=(i.hash(seed + 3) % 100_000).cast(pl.Float64) / 100,
+        nota=pl.format("pedido-{}", i % 1000),
+    )
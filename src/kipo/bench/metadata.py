@@ -0,0 +1,129 @@
+"""
+Benchmark del metadata store: inserts de runs y consultas de historial
+sobre una base SQLite poblada con muchas filas.
+
+Uso: python -m kipo.bench.metadata --rows 1000000
+"""
+import argparse
+import json
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlmodel import Session, desc, select
+from kipo.bench._common import measure
+from kipo.core.db import encode_cursor, make_engine, migrate, query_runs
+from kipo.core.models import PipelineRun, RunStatus
+
+PIPELINES = [f"pipeline_{i:02d}" for i in range(20)]
+
+
+def populate(db_engine, rows: int, batch_size: int = 50_000) -> float:
+    """Inserta `rows` runs sintéticos en lote. Devuelve los segundos empleados."""
+    table = PipelineRun.__table__
+    base = datetime(2020, 1, 1)
+    start = time.perf_counter()
+
+    with db_engine.begin() as conn:
+        for offset in range(0, rows, batch_size):
+            batch = []
+            for i in range(offset, min(offset + batch_size, rows)):
+                started = base + timedelta(seconds=i * 60)
+                batch.append({
+                    "pipeline_name": PIPELINES[i % len(PIPELINES)],
+                    "status": RunStatus.SUCCESS if i % 10 else RunStatus.FAILED,
+                    "start_time": started,
+                    "end_time": started + timedelta(seconds=30),
+                    "duration_seconds": 30.0,
+                    "error_message": None,
+                })
+            conn.execute(table.insert(), batch)
+
+    return time.perf_counter() - start
+
+
+def run(rows: int = 1_000_000, repeat: int = 200, db_path: Optional[Path] = None) -> Dict[str, Any]:
+    """
+    Mide inserts/updates de runs (como create_run/update_run_status) y
+    consultas de historial (como el dashboard y `kipo history`).
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        path = db_path or Path(tmp) / "bench.db"
+        db_engine = make_engine(f"sqlite:///{path}")
+        migrate(db_engine)
+
+        populate_seconds = populate(db_engine, rows)
+        inserted: List[int] = []
+
+        def insert_run():
+            with Session(db_engine) as session:
+                run = PipelineRun(pipeline_name="bench_pipeline")
+                session.add(run)
+                session.commit()
+                inserted.append(run.id)
+
+        def update_run():
+            with Session(db_engine) as session:
+                run = session.get(PipelineRun, inserted[len(inserted) // 2])
+                run.status = RunStatus.SUCCESS
+                run.end_time = datetime.utcnow()
+                session.add(run)
+                session.commit()
+
+        latest = select(PipelineRun).order_by(desc(PipelineRun.start_time)).limit(50)
+        by_pipeline = select(PipelineRun).where(
+            PipelineRun.pipeline_name == PIPELINES[3]).order_by(desc(PipelineRun.start_time)).limit(50)
+
+        # Página profunda (mitad del historial): keyset vs OFFSET
+        with Session(db_engine) as session:
+            middle = session.get(PipelineRun, rows // 2)
+        deep_cursor = encode_cursor(middle)
+        deep_offset = select(PipelineRun).order_by(
+            desc(PipelineRun.start_time)).offset(rows // 2).limit(50)
+
+        def deep_keyset():
+            query_runs(before=deep_cursor, limit=50, db_engine=db_engine)
+
+        def query(statement):
+            def _run():
+                with Session(db_engine) as session:
+                    session.exec(statement).all()
+            return _run
+
+        with db_engine.connect() as conn:
+            plan = conn.execute(text(
+                "EXPLAIN QUERY PLAN SELECT * FROM pipelinerun ORDER BY start_time DESC LIMIT 50"
+            )).fetchall()
+            journal_mode = conn.execute(text("PRAGMA journal_mode")).scalar()
+
+        results = {
+            "rows": rows,
+            "journal_mode": journal_mode,
+            "history_uses_index": any("INDEX" in str(row) for row in plan),
+            "populate_rows_per_sec": round(rows / populate_seconds, 1),
+            "insert_run": measure(insert_run, repeat),
+            "update_run": measure(update_run, repeat),
+            "history_latest_50": measure(query(latest), repeat),
+            "history_pipeline_50": measure(query(by_pipeline), repeat),
+            "history_deep_page_keyset": measure(deep_keyset, repeat),
+            "history_deep_page_offset": measure(query(deep_offset), max(1, repeat // 10)),
+        }
+        db_engine.dispose()
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--db", type=Path, default=None,
+                        help="Keep the benchmark database at this path")
+    args = parser.parse_args()
+    print(json.dumps(run(args.rows, args.repeat, args.db), indent=2))
+
+
+if __name__ == "__main__":
+    main()
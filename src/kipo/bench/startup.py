@@ -0,0 +1,99 @@
+"""
+Benchmark del arranque del CLI: tiempo de importación de kipo.main
+(con `python -X importtime`) y latencia de comandos livianos.
+
+Uso: python -m kipo.bench.startup --max-import-ms 150
+Sale con código 1 si kipo.main carga un módulo pesado o supera el umbral.
+"""
+import argparse
+import json
+import subprocess
+import sys
+from typing import Any, Dict, Optional, Sequence
+
+from kipo.bench._common import measure
+
+# Dependencias que solo deben cargarse cuando un comando las usa
+HEAVY_MODULES = ("polars", "sqlalchemy", "sqlmodel", "fastapi", "starlette", "uvicorn")
+
+# Comandos que no deberían pagar por el stack de datos ni la base de metadata
+LIGHT_COMMANDS = (("version",), ("--help",))
+
+
+def import_profile(module: str = "kipo.main") -> Dict[str, Any]:
+    """
+    Importa `module` en un intérprete nuevo con -X importtime y devuelve
+    el tiempo acumulado (ms), los módulos más costosos y los pesados cargados.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    )
+
+    # Formato: "import time: <self us> | <cumulative us> | <indentación><módulo>"
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.split(":", 1)[1].split("|")
+        entries.append((name.strip(), int(self_us), int(cumulative_us)))
+
+    loaded = {name for name, _, _ in entries}
+    total_us = next((cum for name, _, cum in entries if name == module), 0)
+    slowest = sorted(entries, key=lambda entry: entry[1], reverse=True)[:10]
+
+    return {
+        "module": module,
+        "import_ms": round(total_us / 1000, 2),
+        "modules_loaded": len(loaded),
+        "heavy_modules_loaded": sorted(
+            m for m in HEAVY_MODULES if m in loaded),
+        "slowest_self_ms": {name: round(self_us / 1000, 2) for name, self_us, _ in slowest},
+    }
+
+
+def command_latency(args: Sequence[str], repeat: int) -> Dict[str, float]:
+    """Wall time de `kipo <args>` en procesos nuevos."""
+    stats = measure(lambda: subprocess.run([sys.executable, "-m", "kipo.main", *args],
+                                           capture_output=True, check=True), repeat)
+    return {"p50_ms": stats["p50_ms"], "min_ms": stats["min_ms"]}
+
+
+def run(repeat: int = 10, max_import_ms: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Mide el arranque y marca `ok=False` si kipo.main importa un módulo
+    pesado o si su importación supera `max_import_ms`.
+    """
+    profile = import_profile()
+    results = {
+        **profile,
+        "commands": {
+            " ".join(args): command_latency(args, repeat) for args in LIGHT_COMMANDS
+        },
+    }
+
+    problems = [f"kipo.main imports {m} at startup"
+                for m in profile["heavy_modules_loaded"]]
+    if max_import_ms is not None and profile["import_ms"] > max_import_ms:
+        problems.append(
+            f"kipo.main import took {profile['import_ms']} ms (max {max_import_ms} ms)")
+
+    results["ok"] = not problems
+    results["problems"] = problems
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--max-import-ms", type=float, default=None,
+                        help="Fail if importing kipo.main takes longer than this")
+    args = parser.parse_args()
+
+    results = run(args.repeat, args.max_import_ms)
+    print(json.dumps(results, indent=2))
+    sys.exit(0 if results["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""
+Suite de benchmarks de Kipo: overhead de @step, persistencia Parquet,
+lecturas (io.read y read_raw de CSV, Excel y Parquet), run_pipeline de
+punta a punta y metadata store, sobre datasets sintéticos de varios tamaños.
+
+Uso: kipo bench --sizes 10000,100000 --output bench.json
+     kipo bench --baseline bench.json --threshold 0.2
+"""
+import contextlib
+import io as _io
+import json
+import multiprocessing
+import os
+import platform
+import tempfile
+import traceback
+from datetime import datetime
+from pathlib import Path
+from queue import Empty
+from typing import Any, Dict, Sequence
+
+from kipo.bench._common import measure, synthetic
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+
+# Generar y parsear Excel grandes domina la suite sin aportar información
+EXCEL_MAX_ROWS = 100_000
+
+# Resultados de menos de esto se consideran ruido al comparar con el baseline
+NOISE_FLOOR_MS = 0.05
+
+PIPELINE_TEMPLATE = '''
+import polars as pl
+from kipo.core.decorators import step
+from kipo.core.definitions import DataLayer
+from kipo.core.io import read_raw
+
+
+@step(DataLayer.BRONZE, name="bench_bronze_{size}")
+def bronze():
+    return read_raw("bench_{size}.parquet")
+
+
+@step(DataLayer.SILVER, name="bench_silver_{size}")
+def silver(df):
+    return df.lazy().filter(pl.col("monto") > 10).with_columns(
+        total=pl.col("monto") * pl.col("cantidad"))
+
+
+@step(DataLayer.GOLD, name="bench_gold_{size}")
+def gold(lf):
+    return lf.group_by("region").agg(pl.col("total").sum())
+
+
+gold(silver(bronze()))
+'''
+
+
+def _step_overhead(repeat: int) -> Dict[str, Any]:
+    import polars as pl
+    from kipo.core.context import KipoContext
+    from kipo.core.decorators import step
+    from kipo.core.definitions import DataLayer
+
+    tiny = pl.DataFrame({"x": [1, 2, 3]})
+
+    @step(DataLayer.BRONZE, name="bench_noop")
+    def noop():
+        return None
+
+    @step(DataLayer.BRONZE, name="bench_tiny")
+    def persist_tiny():
+        return tiny
+
+    context = KipoContext.get_instance()
+    calls = repeat * 20
+
+    # Sin persistencia: solo el wrapper (métricas, caché, eventos, logging)
+    results = {"step_overhead_noop": measure(noop, calls)}
+
+    context.use_cache = False
+    results["step_overhead_tiny_frame"] = measure(persist_tiny, calls)
+    context.use_cache = True
+    persist_tiny()
+    results["step_cache_hit_tiny_frame"] = measure(persist_tiny, calls)
+    return results
+
+
+def _io_paths(size: int, repeat: int) -> Dict[str, Any]:
+    from kipo.core.config import get_base_dir
+    from kipo.core.definitions import DataLayer
+    from kipo.core.io import read, read_raw, write
+    from kipo.core import raw_cache
+
+    df = synthetic(size)
+    raw_dir = get_base_dir() / "raw"
+    raw_dir.mkdir(parents=True, exist_ok=True)
+    df.write_csv(raw_dir / f"bench_{size}.csv")
+    df.write_parquet(raw_dir / f"bench_{size}.parquet")
+
+    results = {
+        f"write_parquet[{size}]": measure(
+            lambda: write(df, DataLayer.SILVER, f"bench_{size}"), repeat),
+        f"write_parquet_lazy[{size}]": measure(
+            lambda: write(df.lazy(), DataLayer.SILVER, f"bench_lazy_{size}"), repeat),
+        f"read_parquet[{size}]": measure(
+            lambda: read(DataLayer.SILVER, f"bench_{size}", use_cache=False), repeat),
+        f"read_parquet_cached[{size}]": measure(
+            lambda: read(DataLayer.SILVER, f"bench_{size}"), repeat),
+        f"write_ipc[{size}]": measure(
+            lambda: write(df, DataLayer.SILVER, f"bench_ipc_{size}", format="ipc"), repeat),
+        f"read_ipc_mmap[{size}]": measure(
+            lambda: read(DataLayer.SILVER, f"bench_ipc_{size}", use_cache=False), repeat),
+        f"read_raw_parquet[{size}]": measure(
+            lambda: read_raw(f"bench_{size}.parquet"), repeat),
+        f"read_raw_csv[{size}]": measure(
+            lambda: read_raw(f"bench_{size}.csv", use_cache=False), repeat),
+    }
+
+    raw_cache.clear()
+    read_raw(f"bench_{size}.csv")
+    results[f"read_raw_csv_cached[{size}]"] = measure(
+        lambda: read_raw(f"bench_{size}.csv"), repeat)
+
+    if size <= EXCEL_MAX_ROWS:
+        df.write_excel(raw_dir / f"bench_{size}.xlsx")
+        results[f"read_raw_excel[{size}]"] = measure(
+            lambda: read_raw(f"bench_{size}.xlsx", use_cache=False), repeat)
+        read_raw(f"bench_{size}.xlsx")
+        results[f"read_raw_excel_cached[{size}]"] = measure(
+            lambda: read_raw(f"bench_{size}.xlsx"), repeat)
+
+    return results
+
+
+def _pipeline(size: int, repeat: int) -> Dict[str, Any]:
+    from kipo.core.runner import run_pipeline
+
+    pipelines_dir = Path.cwd() / "pipelines"
+    pipelines_dir.mkdir(exist_ok=True)
+    (pipelines_dir / f"bench_{size}.py").write_text(
+        PIPELINE_TEMPLATE.format(size=size), encoding="utf-8")
+
+    return {
+        f"run_pipeline[{size}]": measure(
+            lambda: run_pipeline(f"bench_{size}", use_cache=False), repeat),
+        f"run_pipeline_cached[{size}]": measure(
+            lambda: run_pipeline(f"bench_{size}"), repeat),
+    }
+
+
+def _metadata(rows: int, repeat: int) -> Dict[str, Any]:
+    from kipo.bench import metadata
+
+    stats = metadata.run(rows=rows, repeat=repeat * 20)
+    return {
+        f"metadata_{name}[{rows}]": {"p50_ms": stats[name]["p50_ms"]}
+        for name in ("insert_run", "update_run", "history_latest_50",
+                     "history_pipeline_50", "history_deep_page_keyset")
+    }
+
+
+def _worker(workdir: str, sizes: Sequence[int], repeat: int, metadata_rows: int,
+            queue) -> None:
+    """
+    Corre la suite en un proceso nuevo dentro de `workdir`: la base de
+    metadata, el caché de crudos y los datasets no tocan el proyecto real.
+    """
+    os.chdir(workdir)
+    try:
+        results: Dict[str, Any] = {}
+        # Los steps y el runner loguean con rich: se descarta la salida
+        with contextlib.redirect_stdout(_io.StringIO()):
+            results.update(_step_overhead(repeat))
+            for size in sizes:
+                results.update(_io_paths(size, repeat))
+                results.update(_pipeline(size, repeat))
+            results.update(_metadata(metadata_rows, repeat))
+        queue.put({"results": results})
+    except Exception:
+        queue.put({"error": traceback.format_exc()})
+
+
+def run(sizes: Sequence[int] = DEFAULT_SIZES, repeat: int = 5,
+        metadata_rows: int = 100_000) -> Dict[str, Any]:
+    """
+    Ejecuta la suite y devuelve un documento JSON con el entorno y los
+    tiempos (p50/min en ms) de cada camino medido.
+    """
+    import polars as pl
+    from kipo import __version__
+
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    with tempfile.TemporaryDirectory(prefix="kipo-bench-") as workdir:
+        process = ctx.Process(target=_worker,
+                              args=(workdir, list(sizes), repeat, metadata_rows, queue))
+        process.start()
+        while True:
+            try:
+                outcome = queue.get(timeout=1)
+                break
+            except Empty:
+                if not process.is_alive():
+                    outcome = {"error": f"Worker exited with code {process.exitcode}"}
+                    break
+        process.join()
+
+    if "error" in outcome:
+        raise RuntimeError(f"Benchmark suite failed:\n{outcome['error']}")
+
+    return {
+        "kipo_version": __version__,
+        "polars_version": pl.__version__,
+        "python_version": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "sizes": list(sizes),
+        "repeat": repeat,
+        "results": outcome["results"],
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any],
+            threshold: float = 0.2) -> Dict[str, Any]:
+    """
+    Compara el p50 de cada benchmark con el baseline. Es regresión si es más
+    de `threshold` (0.2 = 20%) más lento y la diferencia supera el ruido.
+    """
+    rows = []
+    for name, stats in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            continue
+        old, new = before["p50_ms"], stats["p50_ms"]
+        change = (new - old) / old if old else 0.0
+        rows.append({
+            "name": name,
+            "baseline_ms": old,
+            "current_ms": new,
+            "change": round(change, 4),
+            "regression": change > threshold and new - old > NOISE_FLOOR_MS,
+        })
+
+    return {
+        "threshold": threshold,
+        "benchmarks": rows,
+        "regressions": [r["name"] for r in rows if r["regression"]],
+    }
+
+
+def load(path: Path) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
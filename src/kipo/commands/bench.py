@@ -0,0 +1,73 @@
+import json
+from pathlib import Path
+from typing import Optional, Sequence
+from rich.console import Console
+from rich.table import Table
+
+from rich import box
+from kipo.bench import suite
+
+
+# Progreso y reportes a stderr: stdout queda libre para el JSON
+console = Console(stderr=True)
+
+
+def run_bench(sizes: Sequence[int], repeat: int, metadata_rows: int,
+              output: Optional[Path] = None, baseline: Optional[Path] = None,
+              threshold: float = 0.2) -> bool:
+    """
+    Runs the benchmark suite and writes the JSON results to `output` (or stdout).
+    With a baseline, prints the comparison and returns False on regressions.
+    """
+    console.print(
+        f"[bold blue]Running benchmarks[/bold blue] (sizes: {', '.join(map(str, sizes))}, repeat: {repeat})...")
+    results = suite.run(sizes=sizes, repeat=repeat, metadata_rows=metadata_rows)
+
+    comparison = None
+    if baseline is not None:
+        comparison = suite.compare(results, suite.load(baseline), threshold)
+        results["comparison"] = comparison
+
+    document = json.dumps(results, indent=2)
+    if output is not None:
+        output.write_text(document + "\n", encoding="utf-8")
+        console.print(f"[dim]Results saved to: {output}[/dim]")
+    else:
+        print(document)
+
+    if comparison is None:
+        return True
+
+    _show_comparison(comparison, baseline)
+    return not comparison["regressions"]
+
+
+def _show_comparison(comparison: dict, baseline: Path):
+    table = Table(
+        title=f"Benchmark vs {baseline.name} (threshold {comparison['threshold']:.0%})",
+        box=box.ROUNDED,
+        header_style="bold white",
+        border_style="dim white"
+    )
+
+    table.add_column("Benchmark", style="bold white")
+    table.add_column("Baseline", justify="right")
+    table.add_column("Current", justify="right")
+    table.add_column("Change", justify="right")
+
+    for row in comparison["benchmarks"]:
+        style = "red" if row["regression"] else ("green" if row["change"] < 0 else "white")
+        table.add_row(
+            row["name"],
+            f"{row['baseline_ms']:.3f} ms",
+            f"{row['current_ms']:.3f} ms",
+            f"[{style}]{row['change']:+.1%}[/{style}]",
+        )
+
+    console.print(table)
+
+    if comparison["regressions"]:
+        console.print(
+            f"[bold red]{len(comparison['regressions'])} regression(s):[/bold red] {', '.join(comparison['regressions'])}")
+    else:
+        console.print("[bold green]No regressions[/bold green]")
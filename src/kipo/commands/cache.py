@@ -0,0 +1,87 @@
+from datetime import datetime
+from typing import Optional
+from rich.console import Console
+from rich.table import Table
+
+from rich import box
+from kipo.core import raw_cache
+from kipo.core.config import get_raw_cache_config, get_read_cache_config
+from kipo.core.definitions import DataLayer
+
+
+console = Console()
+
+
+def clear_cache(layer: Optional[str] = None, name: Optional[str] = None):
+    """
+    Removes recorded step fingerprints (all, one layer, or one dataset).
+    """
+    # kipo.core.cache trae Polars: solo lo paga el comando que lo usa
+    from kipo.core import cache
+
+    target_layer = None
+    if layer is not None:
+        try:
+            target_layer = DataLayer[layer.upper()]
+        except KeyError:
+            console.print(
+                f"[bold red]❌ Invalid Layer:[/bold red] '{layer}'. Options are: bronze, silver, gold.")
+            return
+
+    removed = cache.clear(target_layer, name)
+    console.print(
+        f"[bold green]Cache cleared:[/bold green] {removed} fingerprint(s) removed")
+
+
+def clear_raw_cache():
+    """
+    Removes every Parquet copy from the raw file cache.
+    """
+    removed = raw_cache.clear()
+    console.print(
+        f"[bold green]Raw cache cleared:[/bold green] {removed} file(s) removed")
+
+
+def show_cache_info():
+    """
+    Displays the raw file cache entries and their disk usage.
+    """
+    settings = get_raw_cache_config()
+    current = raw_cache.entries()
+    total = sum(e["bytes"] for e in current)
+
+    status = "enabled" if settings["enabled"] else "disabled"
+    console.print(
+        f"[bold blue]Raw cache[/bold blue] ({status}): {raw_cache.cache_dir()}")
+    console.print(
+        f"Usage: [cyan]{total / 1024 / 1024:.1f} MB[/cyan] of {settings['max_bytes'] / 1024 / 1024:.0f} MB, {len(current)} file(s)")
+
+    read_settings = get_read_cache_config()
+    read_status = "enabled" if read_settings["enabled"] else "disabled"
+    console.print(
+        f"[bold blue]Read cache[/bold blue] ({read_status}): in memory, "
+        f"{read_settings['max_bytes'] / 1024 / 1024:.0f} MB per process "
+        f"[dim](hits/misses are reported at the end of each run)[/dim]")
+
+    if not current:
+        return
+
+    table = Table(
+        box=box.ROUNDED,
+        header_style="bold white",
+        border_style="dim white"
+    )
+    table.add_column("Source", style="bold white")
+    table.add_column("Rows", justify="right")
+    table.add_column("Size", justify="right")
+    table.add_column("Last Used", style="cyan")
+
+    for entry in current:
+        table.add_row(
+            entry.get("source", "?") + (f" [dim]({entry['variant']})[/dim]" if entry.get("variant") else ""),
+            str(entry.get("rows", "-")),
+            f"{entry['bytes'] / 1024:.1f} KB",
+            datetime.fromtimestamp(entry["last_used"]).strftime("%Y-%m-%d %H:%M:%S"),
+        )
+
+    console.print(table)
@@ -0,0 +1,140 @@
+import json
+from typing import Optional
+from rich.console import Console
+from rich.table import Table
+
+from rich import box
+from kipo.commands.history import _format_bytes
+from kipo.core import catalog
+from kipo.core.definitions import DataLayer
+
+
+console = Console()
+
+
+def _parse_layer(layer: Optional[str]) -> Optional[DataLayer]:
+    if layer is None:
+        return None
+    try:
+        return DataLayer[layer.upper()]
+    except KeyError:
+        console.print(
+            f"[bold red]❌ Invalid Layer:[/bold red] '{layer}'. Options are: bronze, silver, gold.")
+        return None
+
+
+def _show(value) -> str:
+    return "-" if value is None else str(value)
+
+
+def show_datasets(layer: Optional[str] = None):
+    """
+    Lists the datasets recorded in the catalog, without touching the files.
+    """
+    target_layer = _parse_layer(layer)
+    if layer is not None and target_layer is None:
+        return
+
+    datasets = catalog.list_datasets(target_layer)
+    if not datasets:
+        console.print("[italic yellow]The dataset catalog is empty.[/italic yellow]")
+        console.print(
+            "[dim]Run a pipeline, or index existing data with: kipo catalog rebuild[/dim]")
+        return
+
+    table = Table(
+        title="Datasets",
+        box=box.ROUNDED,
+        header_style="bold white",
+        border_style="dim white"
+    )
+    table.add_column("Dataset", style="bold white")
+    table.add_column("Format", style="dim")
+    table.add_column("Rows", justify="right")
+    table.add_column("Size", justify="right")
+    table.add_column("Files", justify="right")
+    table.add_column("Row Groups", justify="right")
+    table.add_column("Partitions")
+    table.add_column("Run", justify="right", style="dim")
+    table.add_column("Updated (UTC)", style="cyan")
+
+    for dataset in datasets:
+        table.add_row(
+            f"{dataset.layer.lower()}/{dataset.name}",
+            dataset.format,
+            f"{dataset.row_count:,}",
+            _format_bytes(dataset.bytes),
+            str(dataset.file_count),
+            str(dataset.row_groups),
+            dataset.partition_by or "-",
+            f"#{dataset.run_id}" if dataset.run_id else "-",
+            dataset.updated_at.strftime("%Y-%m-%d %H:%M"),
+        )
+
+    console.print(table)
+
+
+def show_dataset(layer: str, name: str):
+    """
+    Displays the catalog entry of one dataset: schema and column statistics.
+    """
+    target_layer = _parse_layer(layer)
+    if target_layer is None:
+        return
+
+    dataset = catalog.get_dataset(target_layer, name)
+    if dataset is None:
+        console.print(
+            f"[italic yellow]{layer.lower()}/{name} is not in the catalog.[/italic yellow]")
+        console.print("[dim]Index existing data with: kipo catalog rebuild[/dim]")
+        return
+
+    console.print(
+        f"[bold white]{dataset.layer.lower()}/{dataset.name}[/bold white] · "
+        f"{dataset.format} · {dataset.row_count:,} rows · {_format_bytes(dataset.bytes)} · "
+        f"{dataset.file_count} file(s) · {dataset.row_groups} row group(s)")
+    console.print(f"[dim]{dataset.path}[/dim]")
+
+    schema = json.loads(dataset.column_types)
+    stats = json.loads(dataset.column_stats or "{}")
+
+    table = Table(
+        box=box.ROUNDED,
+        header_style="bold white",
+        border_style="dim white"
+    )
+    table.add_column("Column", style="bold white")
+    table.add_column("Type", style="cyan")
+    table.add_column("Nulls", justify="right")
+    table.add_column("Min")
+    table.add_column("Max")
+    table.add_column("Compressed", justify="right")
+    table.add_column("Codec", style="dim")
+
+    partitions = (dataset.partition_by or "").split(",")
+    for column, dtype in schema.items():
+        column_stats = stats.get(column, {})
+        if column in partitions:
+            dtype = f"{dtype} (partition)"
+
+        table.add_row(
+            column,
+            dtype,
+            _show(column_stats.get("null_count")),
+            _show(column_stats.get("min")),
+            _show(column_stats.get("max")),
+            _format_bytes(column_stats.get("compressed_bytes")),
+            _show(column_stats.get("codec")),
+        )
+
+    console.print(table)
+
+
+def rebuild_catalog():
+    """
+    Re-indexes every dataset found under the data directory.
+    """
+    console.print("[bold blue]Rebuilding the dataset catalog from disk...[/bold blue]")
+    datasets = catalog.rebuild()
+    console.print(
+        f"[bold green]Catalog rebuilt:[/bold green] {len(datasets)} dataset(s) indexed")
@@ -2,24 +2,53 @@ from rich.console import Console
 from rich.table import Table
 
 from rich import box
-from sqlmodel import Session, select, desc
-from datetime import timezone
-from kipo.core.db import engine
+from sqlmodel import Session
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from kipo.core.db import get_engine, get_step_runs, init_db, query_runs
 from kipo.core.models import PipelineRun, RunStatus
 
 
 console = Console()
 
+SINCE_UNITS = {"m": "minutes", "h": "hours", "d": "days", "w": "weeks"}
 
-def show_history(limit: int = 10):
+
+def parse_since(value: str) -> datetime:
+    """
+    Parses a relative age ("30m", "12h", "7d", "2w") or an ISO date/datetime
+    in local time, and returns it as naive UTC (how run times are stored).
+    """
+    value = value.strip()
+    unit = SINCE_UNITS.get(value[-1:].lower())
+    if unit and value[:-1].isdigit():
+        return datetime.utcnow() - timedelta(**{unit: int(value[:-1])})
+
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(
+            f"Invalid --since value {value!r}: use an ISO date (2024-05-01) or an age like 7d, 12h") from None
+    if moment.tzinfo is None:
+        moment = moment.astimezone()
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def show_history(limit: int = 10, pipeline: Optional[str] = None,
+                 status: Optional[str] = None, since: Optional[str] = None,
+                 page: Optional[str] = None):
     """
-    Displays a formatted table of the most recent pipeline runs.
+    Displays a formatted table of pipeline runs, newest first.
+    Results can be filtered and paged with the cursor printed under the table.
     """
     try:
-        with Session(engine) as session:
-            statement = select(PipelineRun).order_by(
-                desc(PipelineRun.start_time)).limit(limit)
-            runs = session.exec(statement).all()
+        runs, next_cursor = query_runs(
+            pipeline=pipeline,
+            status=status,
+            since=parse_since(since) if since else None,
+            before=page,
+            limit=limit,
+        )
 
         if not runs:
             console.print(
@@ -77,6 +106,90 @@ def show_history(limit: int = 10):
             )
 
         console.print(table)
+        if next_cursor:
+            # El cursor solo es válido con los mismos filtros
+            options = {"--limit": limit, "--pipeline": pipeline,
+                       "--status": status, "--since": since}
+            filters = "".join(f" {flag} {value}" for flag, value in options.items()
+                              if value is not None)
+            console.print(
+                f"[dim]Older runs: kipo history{filters} --page {next_cursor}[/dim]")
 
     except Exception as e:
         console.print(f"[bold red]Error fetching history:[/bold red] {e}")
+
+
+def _format_bytes(value):
+    if value is None:
+        return "-"
+    for unit in ["B", "KB", "MB", "GB"]:
+        if value < 1024:
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} TB"
+
+
+def show_run_steps(run_id: int):
+    """
+    Displays the per-step timing breakdown of a single run.
+    """
+    try:
+        init_db()
+        with Session(get_engine()) as session:
+            run = session.get(PipelineRun, run_id)
+
+        if run is None:
+            console.print(
+                f"[italic yellow]Run #{run_id} not found.[/italic yellow]")
+            return
+
+        steps = get_step_runs(run_id)
+        if not steps:
+            console.print(
+                f"[italic yellow]No step metrics recorded for run #{run_id}.[/italic yellow]")
+            return
+
+        table = Table(
+            title=f"Run #{run.id} · {run.pipeline_name} · {run.status}",
+            box=box.ROUNDED,
+            header_style="bold white",
+            border_style="dim white"
+        )
+
+        table.add_column("Step", style="bold white")
+        table.add_column("Layer", style="dim")
+        table.add_column("Status", justify="center")
+        table.add_column("Wall", justify="right")
+        table.add_column("Proc CPU", justify="right")
+        table.add_column("Proc Peak RSS", justify="right")
+        table.add_column("Rows In", justify="right")
+        table.add_column("Rows Out", justify="right")
+        table.add_column("Written", justify="right")
+
+        total = run.duration_seconds or sum(s.wall_seconds or 0 for s in steps)
+        for step in steps:
+            status_style = "green" if step.status == RunStatus.SUCCESS else "red"
+            status = "cached" if step.cached else step.status
+            wall = "-"
+            if step.wall_seconds is not None:
+                share = f" ({step.wall_seconds / total:.0%})" if total else ""
+                wall = f"{step.wall_seconds:.2f}s{share}"
+
+            table.add_row(
+                step.step_name,
+                step.layer,
+                f"[{status_style}]{status}[/{status_style}]",
+                wall,
+                f"{step.cpu_seconds:.2f}s" if step.cpu_seconds is not None else "-",
+                _format_bytes(step.peak_rss_bytes),
+                str(step.input_rows) if step.input_rows is not None else "-",
+                str(step.output_rows) if step.output_rows is not None else "-",
+                _format_bytes(step.bytes_written),
+            )
+
+        console.print(table)
+        console.print(
+            "[dim]Proc CPU / Proc Peak RSS are process-wide: steps that ran in parallel share them.[/dim]")
+
+    except Exception as e:
+        console.print(f"[bold red]Error fetching run steps:[/bold red] {e}")
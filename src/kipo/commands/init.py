@@ -38,6 +38,7 @@ data/raw/*
 data/bronze/*
 data/silver/*
 data/gold/*
+data/.versions/
 !data/raw/.gitkeep
 !data/bronze/.gitkeep
 !data/silver/.gitkeep
@@ -68,6 +69,57 @@ python pipelines/example_pipeline.py
 ```
 """
 
+CONFIG_CONTENT = """# Kipo Configuration
+
+# Parquet write profiles per layer (uncomment to enable).
+# Options: compression, compression_level, row_group_size, data_page_size,
+# statistics, sort_by. A step can override them with @step(write_profile=...).
+#
+# [storage.layers.bronze]
+# compression = "zstd"
+# compression_level = 1
+#
+# [storage.layers.silver]
+# format = "ipc"  # Arrow IPC: memory-mapped reads for data read many times
+#
+# [storage.layers.gold]
+# compression = "zstd"
+# compression_level = 9
+# row_group_size = 100000
+# sort_by = ["date"]
+
+# Write step outputs in a background pool while the pipeline continues
+# (a step can override it with @step(persist="sync" | "async")).
+#
+# [storage]
+# persist = "async"
+# async_writers = 2
+
+# Schema contracts of raw files: read_raw uses these types without inference
+# and rejects files that do not match. `kipo schema infer <file>` bootstraps
+# one as a sidecar (<file>.schema.json), which takes precedence.
+#
+# [raw.schemas."ventas_*.csv"]
+# id = "Int64"
+# fecha = "Date"
+# monto = "Float64"
+
+# Dataset versions: each run that writes a dataset saves its state as hard
+# links (no data copied). Read one with kipo.read(..., version=<run_id>) or
+# as_of=<datetime>; `kipo versions gc` applies the retention below.
+#
+# [versions]
+# enabled = true
+# keep = 10
+# keep_days = 30
+
+# In-memory cache of kipo.read() results, per process (uncomment to change).
+#
+# [cache]
+# read_enabled = true
+# read_max_mb = 512
+"""
+
 
 def init_project(project_name: str):
     """
@@ -101,7 +153,7 @@ def init_project(project_name: str):
         # Create files
         (base_path / "pipelines" /
          "example_pipeline.py").write_text(EXAMPLE_PIPELINE_CONTENT, encoding="utf-8")
-        (base_path / "kipo_config.toml").write_text("# Kipo Configuration\n", encoding="utf-8")
+        (base_path / "kipo_config.toml").write_text(CONFIG_CONTENT, encoding="utf-8")
         (base_path / ".gitignore").write_text(GITIGNORE_CONTENT, encoding="utf-8")
         (base_path / "README.md").write_text(README_CONTENT, encoding="utf-8")
 
@@ -0,0 +1,64 @@
+from typing import Optional
+from rich.console import Console
+from rich.table import Table
+
+from rich import box
+from kipo.commands.history import _format_bytes
+from kipo.core import profiling
+
+
+console = Console()
+
+
+def show_profile(run_id: int, step: Optional[str] = None, limit: int = 15,
+                 sort: str = "tottime", show_plan: bool = False):
+    """
+    Displays the top hotspots of each profiled step of a run.
+    """
+    profiles = profiling.load_run(run_id, sort=sort, limit=limit)
+    if step is not None:
+        step = step.strip().lower().replace(" ", "_")
+        profiles = [p for p in profiles if p["step"] == step]
+
+    if not profiles:
+        console.print(
+            f"[italic yellow]No profiles found for run #{run_id}"
+            f"{f' and step {step}' if step else ''}.[/italic yellow]")
+        console.print(
+            f"[dim]Profile a run with: kipo run <pipeline> --profile (searched {profiling.run_dir(run_id)})[/dim]")
+        return
+
+    for summary in profiles:
+        console.print(
+            f"\n[bold white]{summary['step']}[/bold white] · {summary['status']} · "
+            f"{summary['wall_seconds']:.2f}s · peak RSS {_format_bytes(summary['peak_rss_bytes'])}"
+            f" (+{_format_bytes(summary['peak_rss_growth_bytes'])})")
+
+        if summary["hotspots"]:
+            table = Table(
+                box=box.ROUNDED,
+                header_style="bold white",
+                border_style="dim white"
+            )
+            table.add_column("Function", style="bold white")
+            table.add_column("Location", style="dim")
+            table.add_column("Calls", justify="right")
+            table.add_column("Own", justify="right")
+            table.add_column("Cumulative", justify="right")
+
+            for row in summary["hotspots"]:
+                table.add_row(
+                    row["function"],
+                    row["location"],
+                    str(row["calls"]),
+                    f"{row['tottime']:.3f}s",
+                    f"{row['cumtime']:.3f}s",
+                )
+            console.print(table)
+        else:
+            console.print(
+                "[dim]No cProfile data (another profiler was active during this step)[/dim]")
+
+        if show_plan and summary["plan"]:
+            console.print("[bold blue]Query plan:[/bold blue]")
+            console.print(summary["plan"], markup=False, highlight=False)
@@ -0,0 +1,75 @@
+from pathlib import Path
+from typing import Optional
+from rich.console import Console
+from rich.table import Table
+
+from rich import box
+from kipo.core import contracts
+from kipo.core.config import get_base_dir
+
+
+console = Console()
+
+
+def _toml_snippet(filename: str, schema: contracts.Schema) -> str:
+    lines = [f'[raw.schemas."{filename}"]']
+    for column, dtype in schema.items():
+        # Las comillas dobles de TOML admiten cualquier nombre de columna
+        key = column.replace("\\", "\\\\").replace('"', '\\"')
+        lines.append(f'"{key}" = "{dtype}"')
+    return "\n".join(lines)
+
+
+def infer_schema(filename: str, sample_rows: int = contracts.SAMPLE_ROWS,
+                 sheet: Optional[str] = None, force: bool = False,
+                 as_toml: bool = False) -> bool:
+    """
+    Infers the schema contract of a raw file from a sample and writes it as
+    a sidecar next to the file (or prints a [raw.schemas] entry with --toml).
+    Returns False if the contract could not be created.
+    """
+    raw_path = Path(filename)
+    if not raw_path.is_absolute():
+        raw_path = get_base_dir() / "raw" / filename
+    if not raw_path.is_file():
+        console.print(f"[bold red]❌ File not found:[/bold red] {raw_path}")
+        return False
+
+    sidecar = contracts.sidecar_path(raw_path)
+    if not as_toml and sidecar.exists() and not force:
+        console.print(
+            f"[bold yellow]⚠️ Contract already exists:[/bold yellow] {sidecar} (use --force to overwrite)")
+        return False
+
+    try:
+        schema = contracts.infer(raw_path, sample_rows, sheet)
+    except Exception as e:
+        console.print(f"[bold red]❌ Could not infer schema:[/bold red] {e}")
+        return False
+
+    if as_toml:
+        # Los patrones de [raw.schemas] se comparan con la ruta relativa a data/raw
+        try:
+            key = raw_path.relative_to(get_base_dir() / "raw").as_posix()
+        except ValueError:
+            key = raw_path.name
+        console.print(_toml_snippet(key, schema), markup=False, highlight=False)
+        return True
+
+    contracts.save(raw_path, schema, sample_rows)
+
+    table = Table(
+        box=box.ROUNDED,
+        header_style="bold white",
+        border_style="dim white"
+    )
+    table.add_column("Column", style="bold white")
+    table.add_column("Type", style="cyan")
+    for column, dtype in schema.items():
+        table.add_row(column, str(dtype))
+
+    console.print(table)
+    console.print(
+        f"[bold green]Contract saved:[/bold green] {sidecar} "
+        f"[dim](inferred from up to {sample_rows} rows; review it before committing)[/dim]")
+    return True
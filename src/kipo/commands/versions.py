@@ -0,0 +1,84 @@
+import os
+from typing import Optional
+from rich.console import Console
+from rich.table import Table
+
+from rich import box
+from kipo.commands.datasets import _parse_layer
+from kipo.commands.history import _format_bytes
+from kipo.core import versions
+from kipo.core.io import get_dataset_dir
+
+
+console = Console()
+
+
+def _inodes(version_path) -> dict:
+    inodes = {}
+    for root, _, files in os.walk(version_path):
+        for file in files:
+            if file == versions.MANIFEST:
+                continue
+            stat = os.stat(os.path.join(root, file))
+            inodes[(stat.st_dev, stat.st_ino)] = stat.st_size
+    return inodes
+
+
+def show_versions(layer: str, name: str):
+    """
+    Lists the saved versions of a dataset, with the bytes each one added
+    (files shared with the previous version are hard links and cost nothing).
+    """
+    target_layer = _parse_layer(layer)
+    if target_layer is None:
+        return
+
+    found = versions.list_versions(get_dataset_dir(target_layer, name))
+    if not found:
+        console.print(
+            f"[italic yellow]{layer.lower()}/{name} has no saved versions.[/italic yellow]")
+        console.print("[dim]Versions are saved when `kipo run` writes the dataset.[/dim]")
+        return
+
+    table = Table(
+        title=f"Versions of {target_layer.lower()}/{name}",
+        box=box.ROUNDED,
+        header_style="bold white",
+        border_style="dim white"
+    )
+    table.add_column("Run", justify="right", style="bold white")
+    table.add_column("Written (UTC)", style="cyan")
+    table.add_column("Files", justify="right")
+    table.add_column("Size", justify="right")
+    table.add_column("New Data", justify="right")
+
+    previous: dict = {}
+    for version in found:
+        inodes = _inodes(version["path"])
+        added = sum(size for inode, size in inodes.items() if inode not in previous)
+        table.add_row(
+            f"#{version['run_id']}",
+            version["created"].strftime("%Y-%m-%d %H:%M:%S"),
+            str(version["files"]),
+            _format_bytes(version["bytes"]),
+            _format_bytes(added),
+        )
+        previous = inodes
+
+    console.print(table)
+    console.print(
+        f"[dim]Read one with kipo.read(..., version=<run>) or "
+        f"kipo show {target_layer.lower()} {name} --version <run>[/dim]")
+
+
+def gc_versions(keep: Optional[int] = None, keep_days: Optional[int] = None):
+    """
+    Applies the retention policy to every versioned dataset.
+    """
+    removed = versions.gc(keep, keep_days)
+    total = sum(len(runs) for runs in removed.values())
+    for dataset, runs in sorted(removed.items()):
+        console.print(
+            f"[dim]{dataset}: removed {', '.join(f'#{r}' for r in sorted(runs))}[/dim]")
+    console.print(
+        f"[bold green]Versions cleaned:[/bold green] {total} version(s) removed")
@@ -0,0 +1,46 @@
+from rich.console import Console
+
+from kipo.core import worker
+
+
+console = Console()
+
+
+def start_worker():
+    """
+    Runs the worker daemon in the foreground until Ctrl-C or `kipo worker stop`.
+    """
+    try:
+        worker.serve()
+    except RuntimeError as e:
+        console.print(f"[bold red]❌ {e}[/bold red]")
+        return False
+    return True
+
+
+def stop_worker():
+    """
+    Asks the project's worker daemon to exit. Runs in progress finish normally.
+    """
+    if worker.stop():
+        console.print("[bold green]Kipo worker stopping[/bold green]")
+    else:
+        console.print("[italic yellow]No Kipo worker is running for this project.[/italic yellow]")
+
+
+def show_worker_status():
+    """
+    Displays whether a worker daemon serves this project, and its counters.
+    """
+    info = worker.status()
+    if info is None:
+        console.print("[italic yellow]No Kipo worker is running for this project.[/italic yellow]")
+        console.print("[dim]Start one with: kipo worker start[/dim]")
+        return
+
+    console.print(
+        f"[bold green]Kipo worker running[/bold green] (pid {info['pid']}, v{info['version']}) "
+        f"on {worker.socket_path()}")
+    console.print(
+        f"Uptime: [cyan]{info['uptime_seconds'] / 60:.1f} min[/cyan] · "
+        f"runs served: [cyan]{info['runs_served']}[/cyan] · running now: [cyan]{info['running']}[/cyan]")
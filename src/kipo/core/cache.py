@@ -0,0 +1,164 @@
+import glob
+import hashlib
+import inspect
+import json
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import polars as pl
+from kipo import __version__
+from kipo.core.definitions import DataLayer, StorageFormat
+from kipo.core.config import get_base_dir
+from kipo.core.io import get_data_path, scan_files, scan_signature, track_scan
+
+# El fingerprint vive junto al Parquet: data/bronze/x.parquet -> x.parquet.fingerprint
+# (x.arrow -> x.arrow.fingerprint en formato IPC)
+FINGERPRINT_SUFFIX = ".fingerprint"
+
+Frame = Union[pl.DataFrame, pl.LazyFrame]
+
+
+def _hash_frame(frame: Frame) -> str:
+    """
+    Hash de contenido de un DataFrame/LazyFrame: esquema + hash de filas.
+    Cada fila se hashea junto con su posición, así que el mismo contenido en
+    otro orden da otro hash.
+
+    Un scan de un dataset de kipo (io.scan o el resultado lazy de un step) se
+    identifica por la firma de sus archivos, sin leerlos. Cualquier otro
+    LazyFrame se agrega con el motor streaming, sin materializarlo.
+    """
+    lf = frame.lazy()
+    schema = lf.collect_schema()
+    digest = hashlib.sha256(repr(list(schema.items())).encode())
+
+    sources = scan_signature(frame) if isinstance(frame, pl.LazyFrame) else None
+    if sources is not None:
+        digest.update(json.dumps(sources).encode())
+    elif len(schema) > 0:
+        row_hash = pl.struct(pl.all()).hash(seed=0)
+        stats = lf.select(
+            pl.struct(row_hash, pl.int_range(pl.len(), dtype=pl.UInt64))
+            .hash(seed=1).sum().alias("rows_hash"),
+            pl.len().alias("rows"),
+        ).collect(engine="streaming" if isinstance(frame, pl.LazyFrame) else "auto")
+        digest.update(repr(stats.row(0)).encode())
+
+    return digest.hexdigest()
+
+
+def _hash_value(value: Any) -> str:
+    if isinstance(value, (pl.DataFrame, pl.LazyFrame)):
+        return f"frame:{_hash_frame(value)}"
+    return f"value:{value!r}"
+
+
+def _function_source(func: Callable) -> str:
+    try:
+        return inspect.getsource(func)
+    except (OSError, TypeError):
+        # Funciones sin archivo fuente (REPL, exec): usamos el bytecode
+        return func.__code__.co_code.hex()
+
+
+def fingerprint(func: Callable, args: Tuple[Any, ...], kwargs: Dict[str, Any],
+                settings: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Calcula el fingerprint de una llamada a un step:
+    código fuente de la función + hash de los frames de entrada + resto de argumentos.
+    `settings` (perfil de escritura y formato resueltos) también cuenta: el
+    mismo resultado escrito con otras opciones es otro archivo.
+    """
+    digest = hashlib.sha256()
+    # Versiones incluidas porque el hash de filas de Polars no es estable entre versiones
+    digest.update(f"kipo={__version__};polars={pl.__version__}".encode())
+    digest.update(_function_source(func).encode())
+    digest.update(json.dumps(settings or {}, sort_keys=True, default=str).encode())
+
+    for arg in args:
+        digest.update(_hash_value(arg).encode())
+    for key in sorted(kwargs):
+        digest.update(f"{key}={_hash_value(kwargs[key])}".encode())
+
+    return digest.hexdigest()
+
+
+def _raw_signature(patterns: Sequence[str]) -> Dict[str, List[List[Any]]]:
+    """Ruta, tamaño y mtime de cada archivo de entrada (crudo o dataset) que coincide con los patrones."""
+    signature = {}
+    for pattern in patterns:
+        files = []
+        # "**" recorre las particiones de un dataset leído
+        for file in sorted(glob.glob(pattern, recursive=True)):
+            stat = Path(file).stat()
+            files.append([file, stat.st_size, stat.st_mtime_ns])
+        signature[pattern] = files
+    return signature
+
+
+def fingerprint_path(data_path: Path) -> Path:
+    return data_path.with_name(data_path.name + FINGERPRINT_SUFFIX)
+
+
+def load_cached(data_path: Path, expected: str) -> Optional[Frame]:
+    """
+    Devuelve el resultado cacheado si el fingerprint registrado coincide, o None.
+    Respeta el tipo que devolvió el step originalmente (DataFrame o LazyFrame).
+    """
+    fp_file = fingerprint_path(data_path)
+    if not data_path.exists() or not fp_file.exists():
+        return None
+
+    try:
+        record = json.loads(fp_file.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+    if record.get("fingerprint") != expected:
+        return None
+
+    # Archivos leídos por el step (crudos y datasets): nuevos, borrados o modificados invalidan
+    raw_inputs = record.get("raw_inputs", {})
+    if raw_inputs and _raw_signature(list(raw_inputs)) != raw_inputs:
+        return None
+
+    if record.get("kind") == "LazyFrame":
+        return track_scan(scan_files([data_path]), [data_path])
+    if data_path.suffix == StorageFormat.IPC.suffix:
+        return pl.read_ipc(data_path)
+    return pl.read_parquet(data_path)
+
+
+def record(data_path: Path, value: str, result: Frame,
+           raw_inputs: Sequence[str] = ()) -> None:
+    """
+    Registra el fingerprint de la última escritura exitosa junto al Parquet,
+    con la firma de los archivos crudos que leyó el step.
+    """
+    payload = {
+        "fingerprint": value,
+        "kind": type(result).__name__,
+        "raw_inputs": _raw_signature(raw_inputs),
+    }
+    fingerprint_path(data_path).write_text(json.dumps(payload), encoding="utf-8")
+
+
+def clear(layer: Optional[DataLayer] = None, name: Optional[str] = None) -> int:
+    """
+    Elimina fingerprints registrados para forzar la re-ejecución de steps.
+    Sin argumentos limpia todos los layers. Devuelve cuántos se eliminaron.
+    """
+    if layer is not None and name is not None:
+        targets = [fingerprint_path(get_data_path(layer, name, f)) for f in StorageFormat]
+    elif layer is not None:
+        layer_dir = get_data_path(layer, "_").parent
+        targets = list(layer_dir.glob(f"*{FINGERPRINT_SUFFIX}"))
+    else:
+        targets = list(get_base_dir().glob(f"*/*{FINGERPRINT_SUFFIX}"))
+
+    removed = 0
+    for target in targets:
+        if target.exists():
+            target.unlink()
+            removed += 1
+    return removed
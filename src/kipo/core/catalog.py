@@ -0,0 +1,282 @@
+import json
+import os
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import polars as pl
+from sqlmodel import Session, select
+from kipo.core.config import get_base_dir
+from kipo.core.db import get_engine, init_db
+from kipo.core.definitions import DATA_SUFFIXES, DataLayer, StorageFormat
+from kipo.core.io import (_partition_columns, _pruned_files, dataset_lock, format_of,
+                          get_data_path, get_dataset_dir, scan_files)
+from kipo.core.models import Dataset
+from kipo.core.parquet_footer import read_footer
+
+# Catálogo de datasets: una fila por (layer, nombre) con el último estado
+# escrito. `kipo datasets` y el dashboard lo consultan sin tocar los archivos;
+# `kipo catalog rebuild` lo reconstruye recorriendo data/.
+
+# Layers que escriben los steps (RAW son archivos de entrada, no datasets)
+CATALOG_LAYERS = (DataLayer.BRONZE, DataLayer.SILVER, DataLayer.GOLD)
+
+_EPOCH = datetime(1970, 1, 1)
+# Factor para pasar cada unidad de timestamp a microsegundos
+_UNITS = {"ns": 0.001, "us": 1, "ms": 1000}
+
+# Resumen de cada archivo de un dataset (filas, row groups, estadísticas)
+# con el tamaño y mtime con que se leyó: tras un append o una compactación
+# solo se leen los footers de los archivos nuevos o reescritos.
+# Dataset (ruta absoluta) -> archivo -> ((tamaño, mtime), resumen)
+_described: Dict[str, Dict[str, Tuple[Tuple[int, int], Dict[str, Any]]]] = {}
+
+
+def _logical(value: Any, dtype: Optional[pl.DataType]) -> Any:
+    """Convierte un min/max físico del footer al tipo lógico (fechas, timestamps)."""
+    if value is None or dtype is None:
+        return value
+    try:
+        if dtype == pl.Date:
+            return (date(1970, 1, 1) + timedelta(days=value)).isoformat()
+        if isinstance(dtype, pl.Datetime):
+            micros = value * _UNITS[dtype.time_unit]
+            return (_EPOCH + timedelta(microseconds=micros)).isoformat()
+    except (OverflowError, TypeError, ValueError):
+        return None
+    return value
+
+
+def _merge(current: Optional[Dict[str, Any]], column: Dict[str, Any]) -> Dict[str, Any]:
+    """Acumula las estadísticas de una columna entre row groups."""
+    if current is None:
+        return dict(column)
+
+    merged = dict(current)
+    merged["compressed_bytes"] = (current["compressed_bytes"] or 0) + (column["compressed_bytes"] or 0)
+    if current["null_count"] is None or column["null_count"] is None:
+        merged["null_count"] = None
+    else:
+        merged["null_count"] = current["null_count"] + column["null_count"]
+
+    for key, pick in (("min", min), ("max", max)):
+        values = [v for v in (current[key], column[key]) if v is not None]
+        try:
+            merged[key] = pick(values) if values else None
+        except TypeError:
+            merged[key] = None
+    return merged
+
+
+def _locate(layer: DataLayer, name: str) -> Optional[Dict[str, Any]]:
+    """Archivos del dataset: archivo único o directorio (particionado / fragmentos)."""
+    path = get_data_path(layer, name)
+    if path.exists():
+        return {"path": path, "files": [path], "partition_by": []}
+
+    dataset_dir = get_dataset_dir(layer, name)
+    if dataset_dir.is_dir():
+        files = list(_pruned_files(dataset_dir, {}))
+        if files:
+            return {"path": dataset_dir, "files": files,
+                    "partition_by": sorted(_partition_columns(files, dataset_dir))}
+    return None
+
+
+def _describe_file(file: Path) -> Dict[str, Any]:
+    """Filas, row groups y estadísticas por columna de un archivo de datos."""
+    if format_of(file) == StorageFormat.IPC:
+        rows = scan_files([file]).select(pl.len()).collect().item()
+        return {"rows": rows, "row_groups": 0, "columns": {}}
+
+    footer = read_footer(file)
+    columns: Dict[str, Dict[str, Any]] = {}
+    for group in footer["row_groups"]:
+        for column, stats in group["columns"].items():
+            columns[column] = _merge(columns.get(column), stats)
+    return {"rows": footer["num_rows"], "row_groups": len(footer["row_groups"]),
+            "columns": columns}
+
+
+def describe(layer: DataLayer, name: str) -> Optional[Dict[str, Any]]:
+    """
+    Describe un dataset leyendo solo metadata: esquema, filas, bytes,
+    archivos, row groups y estadísticas por columna de los footers Parquet.
+    Los archivos Arrow IPC aportan esquema y filas (no guardan estadísticas).
+    Solo se leen los archivos nuevos o modificados desde la última descripción
+    en este proceso. Devuelve None si el dataset no existe.
+    """
+    located = _locate(layer, name)
+    if located is None:
+        return None
+
+    files = located["files"]
+    if located["partition_by"]:
+        schema = scan_files(files, hive_partitioning=True).collect_schema()
+    else:
+        schema = scan_files(files[:1]).collect_schema()
+
+    previous = _described.get(os.path.abspath(located["path"]), {})
+    current = {}
+    row_count = row_groups = total_bytes = 0
+    columns: Dict[str, Dict[str, Any]] = {}
+    for file in files:
+        stat = file.stat()
+        stamp = (stat.st_size, stat.st_mtime_ns)
+        key = os.path.abspath(file)
+        known = previous.get(key)
+        summary = known[1] if known is not None and known[0] == stamp else _describe_file(file)
+        current[key] = (stamp, summary)
+
+        row_count += summary["rows"]
+        row_groups += summary["row_groups"]
+        total_bytes += stat.st_size
+        for column, stats in summary["columns"].items():
+            columns[column] = _merge(columns.get(column), stats)
+    # Solo quedan los archivos actuales: los borrados no se acumulan
+    _described[os.path.abspath(located["path"])] = current
+
+    for column, stats in columns.items():
+        stats["min"] = _logical(stats["min"], schema.get(column))
+        stats["max"] = _logical(stats["max"], schema.get(column))
+
+    return {
+        "layer": str(layer),
+        "name": name,
+        "path": str(located["path"]),
+        "partition_by": located["partition_by"],
+        # Un dataset que cambió de formato puede mezclar archivos de ambos
+        "format": "+".join(sorted({str(format_of(f)) for f in files})),
+        "schema": {column: str(dtype) for column, dtype in schema.items()},
+        "row_count": row_count,
+        "bytes": total_bytes,
+        "file_count": len(files),
+        "row_groups": row_groups,
+        "columns": columns,
+    }
+
+
+def _entry(description: Dict[str, Any], run_id: Optional[int],
+           updated_at: datetime) -> Dataset:
+    return Dataset(
+        layer=description["layer"],
+        name=description["name"],
+        path=description["path"],
+        partition_by=",".join(description["partition_by"]) or None,
+        column_types=json.dumps(description["schema"]),
+        row_count=description["row_count"],
+        bytes=description["bytes"],
+        file_count=description["file_count"],
+        row_groups=description["row_groups"],
+        format=description["format"],
+        column_stats=json.dumps(description["columns"], default=str),
+        run_id=run_id,
+        updated_at=updated_at,
+    )
+
+
+def _find(session: Session, layer: str, name: str) -> Optional[Dataset]:
+    return session.exec(select(Dataset).where(
+        Dataset.layer == layer, Dataset.name == name)).first()
+
+
+def record(layer: DataLayer, name: str, run_id: Optional[int] = None,
+           keep_run: bool = False) -> Optional[Dataset]:
+    """
+    Registra (o actualiza) el estado actual de un dataset en el catálogo.
+    Con `keep_run` conserva el run productor ya registrado (p. ej. tras compactar).
+    """
+    # La compactación reemplaza fragmentos: no leer footers a mitad de camino
+    with dataset_lock(get_dataset_dir(layer, name)):
+        description = describe(layer, name)
+    if description is None:
+        return None
+
+    init_db()
+    with Session(get_engine()) as session:
+        existing = _find(session, str(layer), name)
+        if existing is not None and keep_run:
+            run_id = existing.run_id
+        entry = _entry(description, run_id, datetime.utcnow())
+        if existing is not None:
+            entry.id = existing.id
+            entry = session.merge(entry)
+        else:
+            session.add(entry)
+        session.commit()
+        session.refresh(entry)
+        return entry
+
+
+def discover() -> List[tuple]:
+    """(layer, nombre) de cada dataset presente en disco."""
+    found = []
+    for layer in CATALOG_LAYERS:
+        layer_dir = get_base_dir() / str(layer).lower()
+        if not layer_dir.is_dir():
+            continue
+        names = set()
+        for child in layer_dir.iterdir():
+            if child.name.startswith("."):
+                continue
+            if child.is_file() and child.suffix in DATA_SUFFIXES:
+                names.add(child.stem)
+            elif child.is_dir():
+                names.add(child.name)
+        found.extend((layer, name) for name in sorted(names))
+    return found
+
+
+def rebuild() -> List[Dataset]:
+    """
+    Reconstruye el catálogo desde los archivos en disco. Conserva el run
+    productor de los datasets ya registrados y elimina los que no existen.
+    """
+    init_db()
+    with Session(get_engine()) as session:
+        previous = {(d.layer, d.name): d for d in session.exec(select(Dataset)).all()}
+
+        entries = []
+        for layer, name in discover():
+            description = describe(layer, name)
+            if description is None:
+                continue
+            old = previous.pop((str(layer), name), None)
+            # Fecha de escritura: la del registro previo, salvo que el archivo sea más nuevo
+            mtime = datetime.utcfromtimestamp(Path(description["path"]).stat().st_mtime)
+            entry = _entry(description, old.run_id if old else None,
+                           max(old.updated_at, mtime) if old else mtime)
+            if old is not None:
+                entry.id = old.id
+                entry = session.merge(entry)
+            else:
+                session.add(entry)
+            entries.append(entry)
+
+        for stale in previous.values():
+            session.delete(stale)
+        session.commit()
+        for entry in entries:
+            session.refresh(entry)
+        return entries
+
+
+def list_datasets(layer: Optional[DataLayer] = None) -> List[Dataset]:
+    """Datasets del catálogo, por layer y nombre."""
+    init_db()
+    statement = select(Dataset)
+    if layer is not None:
+        statement = statement.where(Dataset.layer == str(layer))
+    with Session(get_engine()) as session:
+        datasets = list(session.exec(statement).all())
+
+    order = {str(l): i for i, l in enumerate(DataLayer)}
+    datasets.sort(key=lambda d: (order.get(d.layer, len(order)), d.name))
+    return datasets
+
+
+def get_dataset(layer: DataLayer, name: str) -> Optional[Dataset]:
+    """Entrada del catálogo de un dataset, o None si no está registrado."""
+    init_db()
+    with Session(get_engine()) as session:
+        return _find(session, str(layer), name)
@@ -0,0 +1,187 @@
+import json
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from rich.console import Console
+from kipo.core import catalog
+from kipo.core.config import get_compaction_config, get_write_profile
+from kipo.core.definitions import DataLayer
+from kipo.core.io import (WriteOptions, _atomic_write, dataset_lock, get_dataset_dir, list_fragments,
+                          scan_files, write_file)
+
+
+console = Console()
+
+# Datasets escritos con append/upsert durante el run. Se compactan al
+# terminarlo y no en segundo plano: compactar borra fragmentos que los
+# steps siguientes (o el LazyFrame que devolvió el step) pueden estar leyendo
+_pending: Dict[Tuple[DataLayer, str], Union[str, WriteOptions, None]] = {}
+_pending_lock = threading.Lock()
+
+# Journal de la compactación en curso de un directorio. Existe desde que el
+# archivo fusionado está completo hasta que reemplazó a sus fragmentos: si el
+# proceso se corta en el medio, la próxima compactación la termina
+JOURNAL = ".compaction.json"
+
+
+def _leaf_dirs(dataset_dir: Path) -> List[Path]:
+    """El directorio del dataset y cada directorio de partición."""
+    return [Path(root) for root, _, _ in os.walk(dataset_dir)]
+
+
+def _plan_groups(fragments: List[Path], target_bytes: int) -> List[List[Path]]:
+    """
+    Agrupa fragmentos consecutivos pequeños hasta alcanzar `target_bytes`.
+    Solo los grupos con más de un fragmento necesitan reescribirse.
+    """
+    groups: List[List[Path]] = []
+    current: List[Path] = []
+    current_bytes = 0
+
+    for fragment in fragments:
+        size = fragment.stat().st_size
+        if size >= target_bytes:
+            # Ya tiene buen tamaño: cierra el grupo en curso y queda como está
+            groups.append(current)
+            current, current_bytes = [], 0
+            continue
+
+        current.append(fragment)
+        current_bytes += size
+        if current_bytes >= target_bytes:
+            groups.append(current)
+            current, current_bytes = [], 0
+
+    groups.append(current)
+    return [g for g in groups if len(g) > 1]
+
+
+def _merged_name(first: Path) -> str:
+    """
+    Nombre del fragmento fusionado: ocupa en el orden el lugar del primero
+    del grupo (mismo prefijo, sin la marca de una compactación anterior).
+    """
+    stem = first.stem.split("_c", 1)[0]
+    return f"{stem}_c{uuid.uuid4().hex[:8]}{first.suffix}"
+
+
+def _finish_pending(directory: Path) -> None:
+    """
+    Termina (o descarta) una compactación interrumpida del directorio. Cada
+    paso se puede repetir: borrar los fragmentos ya fusionados y publicar.
+    """
+    journal = directory / JOURNAL
+    if journal.exists():
+        try:
+            entry = json.loads(journal.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            entry = None
+        if entry is not None:
+            staged = directory / entry["staged"]
+            if staged.exists():
+                for name in entry["replaces"]:
+                    (directory / name).unlink(missing_ok=True)
+                os.replace(staged, directory / entry["merged"])
+        journal.unlink(missing_ok=True)
+
+    # Fusionados que no llegaron al journal: sus fragmentos siguen intactos
+    for leftover in directory.glob(".*.staged.*"):
+        leftover.unlink(missing_ok=True)
+
+
+def compact_dir(directory: Path, target_bytes: int,
+                options: Optional[WriteOptions] = None) -> Dict[str, int]:
+    """
+    Fusiona los fragmentos pequeños de un directorio en archivos de ~target_bytes.
+    El resultado de cada grupo ocupa el lugar de su primer fragmento, conservando
+    el orden. Los archivos fusionados se escriben con las opciones del perfil del layer.
+
+    Cada grupo se fusiona en un archivo oculto; un journal registra qué
+    fragmentos reemplaza; se borran esos fragmentos y recién entonces el
+    fusionado se publica con un nombre nuevo. Un corte en cualquier punto
+    nunca deja filas duplicadas.
+    """
+    _finish_pending(directory)
+    groups = _plan_groups(list_fragments(directory), target_bytes)
+    merged = 0
+
+    for group in groups:
+        name = _merged_name(group[0])
+        staged = directory / f".{Path(name).stem}.staged{group[0].suffix}"
+        write_file(scan_files(group), staged, options=options)
+        _atomic_write(directory / JOURNAL, lambda path: path.write_text(json.dumps({
+            "staged": staged.name,
+            "merged": name,
+            "replaces": [fragment.name for fragment in group],
+        }), encoding="utf-8"))
+        _finish_pending(directory)
+        merged += len(group)
+
+    return {"fragments_merged": merged, "files_written": len(groups)}
+
+
+def compact(layer: DataLayer, name: str, target_bytes: Optional[int] = None,
+            write_profile: Union[str, WriteOptions, None] = None) -> Dict[str, int]:
+    """
+    Compacta un dataset fragmentado (y cada una de sus particiones).
+    Devuelve cuántos fragmentos se fusionaron y cuántos archivos se escribieron.
+    """
+    dataset_dir = get_dataset_dir(layer, name)
+    if not dataset_dir.is_dir():
+        raise FileNotFoundError(f"No fragmented dataset found at {dataset_dir}")
+
+    if target_bytes is None:
+        target_bytes = get_compaction_config()["target_bytes"]
+    options = get_write_profile(layer, write_profile)
+
+    totals = {"fragments_merged": 0, "files_written": 0}
+    with dataset_lock(dataset_dir):
+        for directory in _leaf_dirs(dataset_dir):
+            stats = compact_dir(directory, target_bytes, options)
+            for k, v in stats.items():
+                totals[k] += v
+
+    if totals["files_written"]:
+        # Cambió el layout (archivos y row groups), no los datos ni su productor
+        catalog.record(layer, name, keep_run=True)
+    return totals
+
+
+def _needs_compaction(dataset_dir: Path, max_fragments: int) -> bool:
+    return any(len(list_fragments(d)) > max_fragments for d in _leaf_dirs(dataset_dir))
+
+
+def schedule_compaction(layer: DataLayer, name: str,
+                        write_profile: Union[str, WriteOptions, None] = None) -> None:
+    """
+    Anota el dataset para compactarlo al final del run
+    (`run_pending_compactions`), si [storage] max_fragments lo habilita.
+    """
+    if get_compaction_config()["max_fragments"] <= 0:
+        return
+    with _pending_lock:
+        _pending[(layer, name)] = write_profile
+
+
+def run_pending_compactions() -> None:
+    """
+    Compacta los datasets anotados en el run que superaron
+    `[storage] max_fragments`. Se llama cuando ya no queda ningún step ni
+    escritura en curso. Un fallo no rompe el pipeline: los fragmentos
+    originales siguen siendo válidos.
+    """
+    with _pending_lock:
+        pending = list(_pending.items())
+        _pending.clear()
+
+    max_fragments = get_compaction_config()["max_fragments"]
+    for (layer, name), write_profile in pending:
+        dataset_dir = get_dataset_dir(layer, name)
+        try:
+            if dataset_dir.is_dir() and _needs_compaction(dataset_dir, max_fragments):
+                compact(layer, name, None, write_profile)
+        except Exception as e:
+            console.print(f"[yellow]Compaction of {layer}/{name} failed:[/yellow] {e}")
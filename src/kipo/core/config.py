@@ -1,25 +1,183 @@
+import os
 import tomllib
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Tuple, Union
 
 # Buscamos el archivo en el directorio actual de ejecución
 CONFIG_PATH = Path("kipo_config.toml")
 
+# Última configuración leída, por (ruta absoluta, mtime): no se relee el TOML
+# en cada get_* mientras el archivo no cambie
+_loaded: Tuple[Optional[Tuple[str, int]], Dict[str, Any]] = (None, {})
+
 def load_config() -> Dict[str, Any]:
     """
-    Carga la configuración del proyecto.
+    Carga la configuración del proyecto (en el primer uso, no al importar).
     Si no existe el archivo, devuelve valores por defecto seguros.
     """
-    if not CONFIG_PATH.exists():
+    global _loaded
+    try:
+        stamp = (str(CONFIG_PATH.resolve()), CONFIG_PATH.stat().st_mtime_ns)
+    except FileNotFoundError:
         # Fallback por defecto si el usuario borró el archivo
         return {"storage": {"base_dir": "data"}}
 
-    with open(CONFIG_PATH, "rb") as f:
-        return tomllib.load(f)
+    if _loaded[0] != stamp:
+        with open(CONFIG_PATH, "rb") as f:
+            _loaded = (stamp, tomllib.load(f))
+    return _loaded[1]
 
 def get_base_dir() -> Path:
     """Helper para obtener directamente el directorio base."""
     config = load_config()
     # Navegamos el diccionario: storage -> base_dir. Default: "data"
     dir_name = config.get("storage", {}).get("base_dir", "data")
-    return Path(dir_name)
\ No newline at end of file
+    return Path(dir_name)
+
+
+def get_max_workers() -> int:
+    """Concurrencia del scheduler de steps: [runner] max_workers. Default: núcleos disponibles."""
+    config = load_config()
+    workers = config.get("runner", {}).get("max_workers", os.cpu_count() or 1)
+    return max(1, int(workers))
+
+
+def get_raw_cache_config() -> Dict[str, Any]:
+    """
+    Configuración del caché Parquet de archivos crudos: [cache].
+    - raw_enabled: activa el caché (default: true)
+    - raw_max_mb: tamaño máximo antes de desalojar entradas (default: 1024)
+    - raw_hash_content: incluye un hash del contenido en la clave (default: false)
+    """
+    section = load_config().get("cache", {})
+    return {
+        "enabled": bool(section.get("raw_enabled", True)),
+        "max_bytes": int(section.get("raw_max_mb", 1024)) * 1024 * 1024,
+        "hash_content": bool(section.get("raw_hash_content", False)),
+    }
+
+
+def get_raw_schemas() -> Dict[str, Dict[str, str]]:
+    """
+    Contratos de esquema de archivos crudos: [raw.schemas."<patrón>"], una
+    tabla por archivo o patrón glob relativo a data/raw con columna = "tipo".
+    Ej: [raw.schemas."ventas_*.csv"] con id = "Int64" y fecha = "Date".
+    El sidecar <archivo>.schema.json de un archivo tiene prioridad.
+    """
+    schemas = load_config().get("raw", {}).get("schemas", {})
+    return {pattern: dict(columns) for pattern, columns in schemas.items()}
+
+
+def get_read_cache_config() -> Dict[str, Any]:
+    """
+    Caché en memoria de io.read (por proceso): [cache].
+    - read_enabled: activa el caché (default: true)
+    - read_max_mb: tamaño Arrow total de los frames cacheados (default: 512)
+    """
+    section = load_config().get("cache", {})
+    return {
+        "enabled": bool(section.get("read_enabled", True)),
+        "max_bytes": int(section.get("read_max_mb", 512)) * 1024 * 1024,
+    }
+
+
+def get_compaction_config() -> Dict[str, Any]:
+    """
+    Compactación de datasets fragmentados (append/upsert): [storage].
+    - target_file_mb: tamaño objetivo de cada archivo compactado (default: 128)
+    - max_fragments: fragmentos por directorio que disparan la compactación
+      al final del run que los escribió; 0 la desactiva (default: 64)
+    """
+    section = load_config().get("storage", {})
+    return {
+        "target_bytes": int(section.get("target_file_mb", 128)) * 1024 * 1024,
+        "max_fragments": int(section.get("max_fragments", 64)),
+    }
+
+
+def get_storage_format(layer: Any) -> str:
+    """
+    Formato en disco de los datasets de un layer: `format` en
+    [storage.layers.<layer>], "parquet" (default) o "ipc" (Arrow IPC,
+    leído con memory-map). Un step puede pisarlo con @step(format=...).
+    """
+    layer_name = str(layer).split('.')[-1].lower()
+    section = load_config().get("storage", {}).get("layers", {}).get(layer_name, {})
+    return str(section.get("format", "parquet")).lower()
+
+
+def get_persist_config() -> Dict[str, Any]:
+    """
+    Persistencia de los resultados de steps: [storage].
+    - persist: "sync" (default) o "async" (escritura en segundo plano)
+    - async_writers: threads de escritura en modo async (default: 2)
+    """
+    section = load_config().get("storage", {})
+    return {
+        "mode": str(section.get("persist", "sync")).lower(),
+        "workers": max(1, int(section.get("async_writers", 2))),
+    }
+
+
+def get_versions_config() -> Dict[str, Any]:
+    """
+    Versiones de datasets (una por run que los escribe): [versions].
+    - enabled: guarda una versión tras cada escritura en un run (default: true)
+    - keep: versiones que se conservan por dataset; 0 = todas (default: 10)
+    - keep_days: borra las versiones más viejas que esto; 0 = sin límite (default: 0)
+    """
+    section = load_config().get("versions", {})
+    return {
+        "enabled": bool(section.get("enabled", True)),
+        "keep": max(0, int(section.get("keep", 10))),
+        "keep_days": max(0, int(section.get("keep_days", 0))),
+    }
+
+
+def get_job_workers() -> int:
+    """Pipelines que el dashboard ejecuta a la vez: [server] max_workers. Default: 2."""
+    workers = load_config().get("server", {}).get("max_workers", 2)
+    return max(1, int(workers))
+
+
+# Opciones de escritura Parquet admitidas en un perfil
+WRITE_PROFILE_KEYS = ("compression", "compression_level", "row_group_size",
+                      "data_page_size", "statistics", "sort_by")
+
+
+def _check_profile(profile: Dict[str, Any], where: str) -> Dict[str, Any]:
+    unknown = set(profile) - set(WRITE_PROFILE_KEYS)
+    if unknown:
+        raise ValueError(
+            f"Unknown write option(s) {sorted(unknown)} in {where}. "
+            f"Valid options: {', '.join(WRITE_PROFILE_KEYS)}")
+    return dict(profile)
+
+
+def get_write_profile(layer: Any, override: Union[str, Dict[str, Any], None] = None) -> Dict[str, Any]:
+    """
+    Opciones de escritura Parquet de un layer: [storage.layers.<layer>],
+    ej. compression = "zstd", compression_level = 1, row_group_size = 100000,
+    statistics = true, sort_by = ["fecha"]. Sin sección se usan los defaults
+    de Polars.
+
+    `override` (por step) se aplica encima: un dict de opciones o el nombre
+    de un perfil declarado en [storage.profiles.<nombre>].
+    """
+    storage = load_config().get("storage", {})
+    layer_name = str(layer).split('.')[-1].lower()
+    # `format` del layer no es una opción de escritura (ver get_storage_format)
+    layer_section = dict(storage.get("layers", {}).get(layer_name, {}))
+    layer_section.pop("format", None)
+    profile = _check_profile(layer_section, f"[storage.layers.{layer_name}]")
+
+    if isinstance(override, str):
+        profiles = storage.get("profiles", {})
+        if override not in profiles:
+            raise ValueError(
+                f"Write profile '{override}' not found in [storage.profiles]")
+        override = _check_profile(profiles[override], f"[storage.profiles.{override}]")
+    if override:
+        profile.update(_check_profile(override, "write_profile"))
+
+    return profile
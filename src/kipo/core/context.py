@@ -1,11 +1,18 @@
+from contextvars import ContextVar, Token
 from pathlib import Path
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import List, Optional, Set
 
 @dataclass
 class KipoContext:
     project_root: Path = field(default_factory=lambda: Path.cwd())
     data_dir: Path = field(default_factory=lambda: Path("data"))
+    # False con `kipo run --force/--no-cache`: los steps ignoran su fingerprint
+    use_cache: bool = True
+    # PipelineRun en curso (lo fija el runner); None fuera de `kipo run`
+    run_id: Optional[int] = None
+    # True con `kipo run --profile`: todos los steps guardan su perfil
+    profile: bool = False
     
     _instance: Optional["KipoContext"] = None
 
@@ -14,3 +21,55 @@ class KipoContext:
         if cls._instance is None:
             cls._instance = cls()
         return cls._instance
+
+
+# Archivos leídos por el step en ejecución (rutas o patrones glob): crudos
+# (read_raw) y datasets de otros steps (io.read / io.scan). Permite invalidar
+# su caché cuando cambian, aunque no sean argumentos del step.
+_raw_inputs: ContextVar[Optional[Set[str]]] = ContextVar("kipo_raw_inputs", default=None)
+
+
+def start_input_tracking() -> Token:
+    return _raw_inputs.set(set())
+
+
+def stop_input_tracking(token: Token) -> List[str]:
+    inputs = _raw_inputs.get() or set()
+    _raw_inputs.reset(token)
+    return sorted(inputs)
+
+
+def note_raw_input(pattern: str) -> None:
+    inputs = _raw_inputs.get()
+    if inputs is not None:
+        inputs.add(pattern)
+
+
+# Archivos de datos que publica la escritura en curso del step (los que
+# contienen su resultado, no los que una escritura reacomoda)
+_outputs: ContextVar[Optional[List[Path]]] = ContextVar("kipo_outputs", default=None)
+
+
+def start_output_tracking() -> Token:
+    return _outputs.set([])
+
+
+def stop_output_tracking(token: Token) -> List[Path]:
+    outputs = _outputs.get() or []
+    _outputs.reset(token)
+    return outputs
+
+
+def note_output(path: Path) -> None:
+    outputs = _outputs.get()
+    if outputs is not None:
+        outputs.append(path)
+
+
+def note_dataset_input(dataset_dir: Path) -> None:
+    """Registra un dataset leído: <name>.parquet / <name>.arrow o los archivos de <name>/."""
+    inputs = _raw_inputs.get()
+    if inputs is not None:
+        inputs.add(f"{dataset_dir}.parquet")
+        inputs.add(f"{dataset_dir}.arrow")
+        inputs.add(str(dataset_dir / "**" / "*"))
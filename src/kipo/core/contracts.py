@@ -0,0 +1,181 @@
+import ast
+import fnmatch
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+import polars as pl
+from kipo.core.config import get_base_dir, get_raw_schemas
+
+# Contratos de esquema de archivos crudos: columnas y tipos esperados. Con
+# contrato, read_raw lee con esos tipos (sin inferencia: no cambian entre
+# corridas), rechaza antes de leerlo un archivo cuyas columnas no coinciden
+# y falla ante un valor que no convierte. Se declaran en un sidecar <archivo>.schema.json
+# junto al crudo (`kipo schema infer` lo genera) o en [raw.schemas].
+
+SIDECAR_SUFFIX = ".schema.json"
+
+# Filas que lee `kipo schema infer` para proponer los tipos
+SAMPLE_ROWS = 10000
+
+Schema = Dict[str, pl.DataType]
+
+
+def sidecar_path(raw_path: Path) -> Path:
+    """Contrato de un archivo crudo: data/raw/ventas.csv -> ventas.csv.schema.json"""
+    return raw_path.with_name(raw_path.name + SIDECAR_SUFFIX)
+
+
+def _dtype_class(name: str) -> type:
+    dtype = getattr(pl, name, None)
+    if not (isinstance(dtype, type) and issubclass(dtype, pl.DataType)):
+        raise ValueError(f"unknown dtype {name!r}")
+    return dtype
+
+
+def _build(node: ast.AST) -> pl.DataType:
+    if isinstance(node, ast.Name):
+        return _dtype_class(node.id)()
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+        dtype = _dtype_class(node.func.id)
+        args = [_argument(a) for a in node.args]
+        kwargs = {k.arg: _argument(k.value) for k in node.keywords}
+        return dtype(*args, **kwargs)
+    raise ValueError("expected a dtype name or call")
+
+
+def _argument(node: ast.AST) -> Any:
+    # Tipos anidados (List(Int64)) o literales (time_unit='ms', scale=2)
+    if isinstance(node, (ast.Name, ast.Call)):
+        return _build(node)
+    return ast.literal_eval(node)
+
+
+def parse_dtype(text: str) -> pl.DataType:
+    """
+    Tipo Polars desde su nombre, tal como lo imprime Polars: "Int64",
+    "String", "Date", "Datetime(time_unit='ms', time_zone=None)"...
+    No evalúa código: solo nombres de tipos de Polars y literales.
+    """
+    try:
+        return _build(ast.parse(str(text).strip(), mode="eval").body)
+    except (SyntaxError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid dtype {text!r}: {e}") from e
+
+
+def _parse_columns(columns: Dict[str, str], where: str) -> Schema:
+    try:
+        return {name: parse_dtype(dtype) for name, dtype in columns.items()}
+    except ValueError as e:
+        raise ValueError(f"Invalid schema contract in {where}: {e}") from e
+
+
+def load(raw_path: Path) -> Optional[Schema]:
+    """
+    Contrato de un archivo crudo: su sidecar o, si no tiene, la primera
+    entrada de [raw.schemas] cuyo patrón coincide con su ruta relativa a
+    data/raw. None si el archivo no tiene contrato.
+    """
+    sidecar = sidecar_path(raw_path)
+    if sidecar.exists():
+        try:
+            columns = json.loads(sidecar.read_text(encoding="utf-8"))["columns"]
+        except (OSError, ValueError, KeyError) as e:
+            raise ValueError(f"Invalid schema contract in {sidecar}: {e}") from e
+        return _parse_columns(columns, str(sidecar))
+
+    raw_dir = get_base_dir() / "raw"
+    try:
+        relative = raw_path.relative_to(raw_dir).as_posix()
+    except ValueError:
+        relative = raw_path.name
+    for pattern, columns in get_raw_schemas().items():
+        if fnmatch.fnmatch(relative, pattern):
+            return _parse_columns(columns, f'[raw.schemas."{pattern}"]')
+    return None
+
+
+def digest(schema: Schema) -> str:
+    """Huella del contrato: otro contrato invalida las copias cacheadas del crudo."""
+    text = json.dumps([[name, str(dtype)] for name, dtype in schema.items()])
+    return "schema=" + hashlib.sha256(text.encode()).hexdigest()[:16]
+
+
+def check_columns(columns: Sequence[str], schema: Schema, source: str) -> None:
+    """Rechaza un archivo cuyas columnas no son las del contrato (sin mirar los datos)."""
+    missing = [c for c in schema if c not in columns]
+    unexpected = [c for c in columns if c not in schema]
+    if missing or unexpected:
+        problems = []
+        if missing:
+            problems.append(f"missing columns {missing}")
+        if unexpected:
+            problems.append(f"unexpected columns {unexpected}")
+        raise ValueError(
+            f"{source} does not match its schema contract: {'; '.join(problems)}")
+
+
+def _convert(column: str, current: pl.DataType, dtype: pl.DataType) -> pl.Expr:
+    """Expresión que lleva una columna a `dtype`; desde texto, fechas y booleanos se parsean."""
+    expr = pl.col(column)
+    if current == pl.String:
+        if dtype == pl.Date:
+            return expr.str.to_datetime(strict=True).dt.date()
+        if isinstance(dtype, pl.Datetime):
+            return expr.str.to_datetime(time_unit=dtype.time_unit, time_zone=dtype.time_zone,
+                                        strict=True)
+        if dtype == pl.Boolean:
+            return expr.str.to_lowercase().replace_strict(
+                {"true": True, "false": False}, return_dtype=pl.Boolean)
+    return expr.cast(dtype, strict=True)
+
+
+def enforce(df: pl.DataFrame, schema: Schema, source: str) -> pl.DataFrame:
+    """
+    Verifica las columnas y lleva cada una al tipo del contrato (estricto:
+    un valor que no convierte es un error, no un null). Devuelve las
+    columnas en el orden del contrato.
+    """
+    check_columns(df.columns, schema, source)
+    conversions = [_convert(c, df.schema[c], dtype) for c, dtype in schema.items()
+                   if df.schema[c] != dtype]
+    if conversions:
+        try:
+            df = df.with_columns(conversions)
+        except pl.exceptions.PolarsError as e:
+            raise ValueError(f"{source} does not match its schema contract: {e}") from e
+    return df.select(list(schema))
+
+
+def infer(raw_path: Path, sample_rows: int = SAMPLE_ROWS,
+          sheet: Optional[str] = None) -> Schema:
+    """
+    Propone el contrato de un archivo crudo a partir de sus primeras
+    `sample_rows` filas (los CSV prueban también fechas).
+    """
+    suffix = raw_path.suffix.lower()
+    if suffix == ".csv":
+        return dict(pl.read_csv(raw_path, n_rows=sample_rows, infer_schema_length=None,
+                                try_parse_dates=True).schema)
+    if suffix in [".xlsx", ".xls"]:
+        return dict(pl.read_excel(raw_path, sheet_name=sheet, engine="calamine",
+                                  infer_schema_length=sample_rows).schema)
+    if suffix == ".parquet":
+        return dict(pl.read_parquet_schema(raw_path))
+    if suffix in [".arrow", ".ipc"]:
+        return dict(pl.read_ipc_schema(raw_path))
+    raise ValueError(f"Unsupported format: {suffix}")
+
+
+def save(raw_path: Path, schema: Schema, sample_rows: Optional[int] = None) -> Path:
+    """Escribe el contrato en el sidecar del archivo y devuelve su ruta."""
+    sidecar = sidecar_path(raw_path)
+    sidecar.write_text(json.dumps({
+        "source": raw_path.name,
+        "columns": {name: str(dtype) for name, dtype in schema.items()},
+        "inferred_from_rows": sample_rows,
+        "created": datetime.now().isoformat(timespec="seconds"),
+    }, indent=2), encoding="utf-8")
+    return sidecar
@@ -1,37 +1,171 @@
 import os
+import threading
 from pathlib import Path
-from sqlmodel import SQLModel, create_engine, Session, select
-from kipo.core.models import PipelineRun, RunStatus
+from sqlalchemy import event, text, tuple_
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+from sqlmodel import SQLModel, create_engine, Session, desc, select
+from kipo.core.models import Dataset, Job, PipelineRun, RunStatus, StepRun
 from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
 
-# Define DB path
-# We use the current working directory because we want the DB to live in the user's project
-DB_DIR = Path.cwd() / ".kipo"
+# The DB lives in the user's project: .kipo/kipo.db under the current
+# working directory, resolved on each use (not at import) so that processes
+# that change directory after importing kipo still find their project
 DB_NAME = "kipo.db"
-DB_URL = f"sqlite:///{DB_DIR}/{DB_NAME}"
 
-engine = create_engine(DB_URL)
 
+def db_dir() -> Path:
+    """Metadata directory of the current project."""
+    return Path.cwd() / ".kipo"
 
-def init_db():
+
+def db_url() -> str:
+    return f"sqlite:///{db_dir()}/{DB_NAME}"
+
+# Milliseconds a writer waits for a lock before failing with "database is locked"
+BUSY_TIMEOUT_MS = 30000
+
+
+def _tune_sqlite(dbapi_connection, connection_record):
+    """
+    Per-connection pragmas. WAL lets the dashboard read while a pipeline
+    writes; NORMAL sync is durable under WAL except on power loss.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def make_engine(url: Optional[str] = None) -> Engine:
+    """
+    Creates a tuned SQLite engine: WAL journal, busy timeout and a
+    pool of reusable connections shared across threads.
+    Defaults to the current project's database.
+    """
+    db_engine = create_engine(
+        url or db_url(),
+        poolclass=QueuePool,
+        pool_size=5,
+        max_overflow=10,
+        pool_pre_ping=True,
+        connect_args={
+            "check_same_thread": False,
+            "timeout": BUSY_TIMEOUT_MS / 1000,
+        },
+    )
+    event.listen(db_engine, "connect", _tune_sqlite)
+    return db_engine
+
+
+# One engine per database URL, so that a change of directory opens the
+# database of the new project instead of reusing the previous one
+_engines: Dict[str, Engine] = {}
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> Engine:
+    """
+    Returns the project's metadata engine, created on first use so that
+    importing this module stays cheap for commands that never touch the DB.
+    """
+    url = db_url()
+    db_engine = _engines.get(url)
+    if db_engine is None:
+        with _engine_lock:
+            db_engine = _engines.get(url)
+            if db_engine is None:
+                db_engine = _engines[url] = make_engine(url)
+    return db_engine
+
+
+def __getattr__(name: str):
+    # Backwards compatibility: `from kipo.core.db import engine`, DB_DIR, DB_URL
+    if name == "engine":
+        return get_engine()
+    if name == "DB_DIR":
+        return db_dir()
+    if name == "DB_URL":
+        return db_url()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _add_column(table: str, column: str, ddl: str) -> Callable:
+    """Migration adding a column, unless create_all already made it (new databases)."""
+    def migration(conn) -> None:
+        columns = {row[1] for row in conn.execute(text(f"PRAGMA table_info({table})"))}
+        if column not in columns:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+    return migration
+
+
+# Versioned schema migrations, tracked with PRAGMA user_version.
+# Each one runs exactly once per database; append new ones, never edit old ones.
+MIGRATIONS: List[Union[str, Callable]] = [
+    # 1: base tables (create_all skips tables that already exist)
+    lambda conn: SQLModel.metadata.create_all(conn),
+    # 2: indexes for history queries on databases created before they existed
+    "CREATE INDEX IF NOT EXISTS ix_pipelinerun_start_time ON pipelinerun (start_time)",
+    "CREATE INDEX IF NOT EXISTS ix_pipelinerun_pipeline_start ON pipelinerun (pipeline_name, start_time)",
+    "CREATE INDEX IF NOT EXISTS ix_steprun_run_id ON steprun (run_id)",
+    # 5: dashboard job queue
+    lambda conn: Job.__table__.create(conn, checkfirst=True),
+    # 6: history filtered by status
+    "CREATE INDEX IF NOT EXISTS ix_pipelinerun_status_start ON pipelinerun (status, start_time)",
+    # 7: dataset catalog
+    lambda conn: Dataset.__table__.create(conn, checkfirst=True),
+    # 8: storage format of each dataset (parquet | ipc)
+    _add_column("dataset", "format", "VARCHAR NOT NULL DEFAULT 'parquet'"),
+]
+
+_initialized = set()
+
+
+def migrate(db_engine: Optional[Engine] = None) -> int:
+    """
+    Applies pending migrations and returns the resulting schema version.
+    """
+    db_engine = db_engine or get_engine()
+    with db_engine.begin() as conn:
+        version = conn.execute(text("PRAGMA user_version")).scalar()
+        for number, migration in enumerate(MIGRATIONS, start=1):
+            if number <= version:
+                continue
+            if callable(migration):
+                migration(conn)
+            else:
+                conn.execute(text(migration))
+            conn.execute(text(f"PRAGMA user_version={number}"))
+            version = number
+    return version
+
+
+def init_db(db_engine: Optional[Engine] = None):
     """
-    Initializes the SQLite database.
+    Initializes the SQLite database once per process.
     Creates the .kipo directory if it doesn't exist.
-    Creates tables based on SQLModel metadata.
+    Applies pending schema migrations.
     """
-    if not DB_DIR.exists():
-        DB_DIR.mkdir(parents=True, exist_ok=True)
+    db_engine = db_engine or get_engine()
+    if db_engine in _initialized:
+        return
 
-    SQLModel.metadata.create_all(engine)
+    db_dir().mkdir(parents=True, exist_ok=True)
+
+    migrate(db_engine)
+    _initialized.add(db_engine)
 
 
 def create_run(pipeline_name: str) -> PipelineRun:
     """
     Creates a new pipeline run record with status RUNNING.
     """
-    init_db()  # Ensure DB exists
+    init_db()  # Ensure DB exists (no-op after the first call)
 
-    with Session(engine) as session:
+    with Session(get_engine()) as session:
         run = PipelineRun(pipeline_name=pipeline_name)
         session.add(run)
         session.commit()
@@ -43,7 +177,7 @@ def update_run_status(run_id: int, status: str, error_message: str = None):
     """
     Updates the status and end time of a run.
     """
-    with Session(engine) as session:
+    with Session(get_engine()) as session:
         run = session.get(PipelineRun, run_id)
         if run:
             run.status = status
@@ -57,3 +191,91 @@ def update_run_status(run_id: int, status: str, error_message: str = None):
             session.commit()
             session.refresh(run)
             return run
+
+
+def save_step_runs(steps: Sequence[StepRun]):
+    """
+    Persists a batch of step metrics in a single transaction.
+    """
+    if not steps:
+        return
+
+    with Session(get_engine()) as session:
+        session.add_all(steps)
+        session.commit()
+
+
+def get_step_runs(run_id: int) -> List[StepRun]:
+    """
+    Returns the step metrics of a run, in execution order.
+    """
+    init_db()
+    with Session(get_engine()) as session:
+        statement = select(StepRun).where(
+            StepRun.run_id == run_id).order_by(StepRun.start_time)
+        return list(session.exec(statement).all())
+
+
+def encode_cursor(run: PipelineRun) -> str:
+    """
+    Opaque keyset cursor pointing just after `run` in newest-first order.
+    """
+    return f"{run.start_time.isoformat()}_{run.id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Parses a cursor produced by `encode_cursor`. Raises ValueError if malformed.
+    """
+    start_time, _, run_id = cursor.rpartition("_")
+    try:
+        return datetime.fromisoformat(start_time), int(run_id)
+    except ValueError:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from None
+
+
+def query_runs(
+    pipeline: Optional[str] = None,
+    status: Optional[str] = None,
+    since: Optional[datetime] = None,
+    before: Optional[str] = None,
+    limit: int = 50,
+    db_engine: Optional[Engine] = None,
+) -> Tuple[List[PipelineRun], Optional[str]]:
+    """
+    Returns one page of runs, newest first, and the cursor of the next page
+    (None on the last page).
+
+    Pages are keyset-paginated on (start_time, id): each page seeks directly
+    past the previous one through the start_time indexes, so deep pages cost
+    the same as the first one (no OFFSET scan).
+    """
+    db_engine = db_engine or get_engine()
+    init_db(db_engine)
+
+    statement = select(PipelineRun)
+    if pipeline:
+        # Los runs guardan el nombre del archivo, como lo resuelve `kipo run`
+        if not pipeline.endswith(".py"):
+            pipeline += ".py"
+        statement = statement.where(PipelineRun.pipeline_name == pipeline)
+    if status:
+        statement = statement.where(PipelineRun.status == status)
+    if since:
+        statement = statement.where(PipelineRun.start_time >= since)
+    if before:
+        statement = statement.where(
+            tuple_(PipelineRun.start_time, PipelineRun.id) < tuple_(*decode_cursor(before)))
+
+    # Una fila extra indica si existe una página siguiente
+    statement = statement.order_by(
+        desc(PipelineRun.start_time), desc(PipelineRun.id)).limit(limit + 1)
+
+    with Session(db_engine) as session:
+        runs = list(session.exec(statement).all())
+
+    next_cursor = None
+    if len(runs) > limit:
+        runs = runs[:limit]
+        next_cursor = encode_cursor(runs[-1])
+    return runs, next_cursor
@@ -1,64 +1,298 @@
 import functools
-from typing import Callable, Any, Optional
+from pathlib import Path
+from typing import Callable, Any, Dict, List, Optional, Sequence, Union
 
 import polars as pl
 from rich.console import Console
-from kipo.core.definitions import DataLayer
-from kipo.core.io import get_data_path
+from kipo.core import cache, catalog, compaction, events, metrics, profiling, scheduler, writers
+from kipo.core.config import get_persist_config, get_storage_format, get_write_profile
+from kipo.core.context import (KipoContext, start_input_tracking, start_output_tracking,
+                               stop_input_tracking, stop_output_tracking)
+from kipo.core.definitions import DataLayer, Engine, PersistMode, StorageFormat, WriteMode
+from kipo.core.definitions import RunStatus
+from kipo.core.io import get_data_path, scan, scan_files, track_scan, write
+from kipo.core.models import StepRun
 
 
 console = Console()
 
+Frame = Union[pl.DataFrame, pl.LazyFrame]
 
-def step(layer: DataLayer, name: Optional[str] = None):
+
+def _record_in_catalog(layer: DataLayer, name: str, run_id: Optional[int]) -> None:
+    # El catálogo es un índice: si falla, el dataset ya está escrito y
+    # `kipo catalog rebuild` lo recupera
+    try:
+        catalog.record(layer, name, run_id)
+    except Exception as e:
+        console.print(f"[yellow]Could not update the dataset catalog:[/yellow] {e}")
+
+
+def _finish_async_write(step_run: Optional[StepRun], step_name: str, layer: DataLayer,
+                        run_id: Optional[int], bytes_written: Optional[int],
+                        error: Optional[BaseException]) -> None:
+    if error is not None:
+        console.print(f"[bold red]Background write failed:[/bold red] {step_name}")
+        console.print(f"[red]{error}[/red]")
+        events.publish("step.failed", run_id=run_id, step=step_name, layer=str(layer),
+                       error=f"Background write failed: {error}")
+    if step_run is not None:
+        step_run.bytes_written = bytes_written
+        if error is not None:
+            step_run.status = RunStatus.FAILED
+        metrics.record(step_run)
+
+
+def _scan_written(files: List[Path], output: Path, result: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Scan lazy de los archivos que escribió el step. En un dataset particionado
+    las columnas de partición salen de las rutas (col=valor/) y se devuelven
+    en el orden del resultado original.
+    """
+    if not files:
+        # Resultado vacío: nada escrito, mismo esquema
+        return result.head(0)
+    if output.is_file():
+        return track_scan(scan_files(files), files)
+    schema = result.collect_schema()
+    scanned = scan_files(files, hive_partitioning=True).select(schema.names()).cast(dict(schema))
+    return track_scan(scanned, files, repr(list(schema.items())))
+
+
+def step(layer: DataLayer, name: Optional[str] = None,
+         engine: Engine = Engine.STREAMING,
+         depends_on: Optional[Sequence[str]] = None,
+         partition_by: Optional[Sequence[str]] = None,
+         mode: WriteMode = WriteMode.OVERWRITE,
+         key: Optional[Sequence[str]] = None,
+         write_profile: Union[str, Dict[str, Any], None] = None,
+         profile: bool = False,
+         persist: Union[PersistMode, str, None] = None,
+         format: Union[StorageFormat, str, None] = None):
     """
     Decorator to mark a function as an ETL step.
-    Wraps execution with Rich logging, error handling, 
+    Wraps execution with Rich logging, error handling,
     AND automatic data persistence based on the layer.
+
+    Steps may return a `pl.DataFrame` or a `pl.LazyFrame`. Lazy results are
+    written with `sink_parquet` when `engine` is STREAMING (the default) or
+    collected first when it is IN_MEMORY; either way the step returns a lazy
+    scan of the written file.
+
+    Each call is fingerprinted (function source + input frames + other
+    arguments; scans of kipo datasets count by their files' size and mtime,
+    so they are not read to be hashed). When the fingerprint matches the one recorded next to the
+    persisted file, the step is skipped and the file is loaded instead.
+
+    Steps are registered in the pipeline DAG. Dependencies are inferred from
+    parameter names matching upstream step names, or declared explicitly with
+    `depends_on`; see `kipo.core.scheduler.run_dag`.
+
+    With `partition_by`, results are written as a Hive-partitioned dataset
+    (`<layer>/<name>/<col>=<value>/part-0.parquet`) and only the partitions
+    present in the result are overwritten.
+
+    `mode="append"` adds each result as a new fragment file under
+    `<layer>/<name>/`; `mode="upsert"` merges on `key`, rewriting only the
+    fragments that hold updated keys. Fragmented datasets are compacted at
+    the end of the run once they exceed `[storage] max_fragments`.
+
+    Partitioned, append and upsert steps are not cached, since the dataset
+    on disk holds more than the last result.
+
+    Parquet options (codec, row group size, statistics, sort order) come from
+    `[storage.layers.<layer>]` in `kipo_config.toml`. `write_profile` overrides
+    them for this step, either as a dict of options or as the name of a
+    `[storage.profiles.<name>]` section.
+
+    `persist="async"` (or `[storage] persist = "async"`) hands the write to a
+    background writer pool and returns the in-memory frame right away, so
+    the next step overlaps with compression and disk I/O. Reads of the
+    dataset wait for its pending write, and `run_pipeline` waits for every
+    write (flushed to disk, errors raised) before marking the run SUCCESS.
+    Lazy results with the STREAMING engine are always written synchronously.
+
+    `format="ipc"` (or `format = "ipc"` in `[storage.layers.<layer>]`) stores
+    the output as Arrow IPC instead of Parquet: no decoding on read, and
+    uncompressed files are memory-mapped, so downstream steps, `kipo show`
+    and other processes share the OS page cache. Reads detect the format.
+
+    Every write is recorded in the dataset catalog (schema, rows, size,
+    row-group statistics and producing run); see `kipo datasets`.
+
+    Within `kipo run`, each write also saves the dataset as a version of the
+    run (hard links, so unchanged files are shared). Read past versions with
+    `read(..., version=<run_id>)` or `as_of=`; see `kipo versions`.
+
+    `profile=True` (or `kipo run --profile` for every step) records a cProfile
+    of the step, the memory high-water mark and, for lazy results, the Polars
+    query plan under `.kipo/profiles/<run_id>/`. View them with `kipo profile`.
     """
-    def decorator(func: Callable[..., Optional[pl.DataFrame]]) -> Callable[..., Optional[pl.DataFrame]]:
-        @functools.wraps(func)
-        def wrapper(*args: Any, **kwargs: Any) -> Optional[pl.DataFrame]:
-            # Lógica de nombre: Priorizamos el 'name' del decorador, si no, el de la función.
-            # SANITIZACIÓN: Forzamos minúsculas y reemplazamos espacios por guiones bajos.
-            raw_name = name or func.__name__
-            step_name = raw_name.strip().lower().replace(" ", "_")
+    engine = Engine(engine)
+    mode = WriteMode(mode)
+    if mode == WriteMode.UPSERT and not key:
+        raise ValueError("@step(mode='upsert') requires a key")
+    # Un perfil mal escrito falla al decorar, no al final del step
+    get_write_profile(layer, write_profile)
+    persist_mode = PersistMode(persist) if persist is not None else None
+    storage_format = StorageFormat(format) if format is not None else None
 
-            # 1. Definir rutas
-            output_file = get_data_path(layer, step_name)
-            output_dir = output_file.parent
+    # Solo un overwrite completo deja en disco exactamente el último resultado
+    cacheable = mode == WriteMode.OVERWRITE and not partition_by
 
-            console.print(
-                f"[bold blue]Starting step:[/bold blue] {step_name} [{layer}]")
+    def decorator(func: Callable[..., Optional[Frame]]) -> Callable[..., Optional[Frame]]:
+        # Lógica de nombre: Priorizamos el 'name' del decorador, si no, el de la función.
+        # SANITIZACIÓN: Forzamos minúsculas y reemplazamos espacios por guiones bajos.
+        raw_name = name or func.__name__
+        step_name = raw_name.strip().lower().replace(" ", "_")
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Optional[Frame]:
+            scheduler.mark_called(step_name)
+            step_format = storage_format or StorageFormat(get_storage_format(layer))
+            output_file = get_data_path(layer, step_name, step_format)
+            timer = metrics.StepTimer(step_name, str(layer))
+            input_rows = metrics.count_input_rows(args, kwargs)
+            run_id = KipoContext.get_instance().run_id
+            profiler = None
 
             try:
+                # 1. Cache por fingerprint: si nada cambió, cargamos el resultado previo.
+                # Sin cache (--no-cache o step no cacheable) no se calcula: hashear
+                # las entradas puede costar tanto como el step
+                fingerprint = None
+                if KipoContext.get_instance().use_cache and cacheable:
+                    fingerprint = cache.fingerprint(func, args, kwargs, {
+                        "write_profile": get_write_profile(layer, write_profile),
+                        "format": step_format,
+                    })
+                # Una escritura async anterior de este dataset debe terminar antes
+                writers.wait_for(output_file)
+                if fingerprint is not None:
+                    cached = cache.load_cached(output_file, fingerprint)
+                    if cached is not None:
+                        console.print(
+                            f"[bold cyan]Step cached:[/bold cyan] {step_name} [{layer}] [dim](inputs unchanged)[/dim]")
+                        cached_rows = cached.height if isinstance(cached, pl.DataFrame) else None
+                        timer.finish(cached=True, input_rows=input_rows,
+                                     output_rows=cached_rows)
+                        events.publish("step.finished", run_id=run_id, step=step_name,
+                                       layer=str(layer), cached=True,
+                                       wall_seconds=timer.elapsed())
+                        return cached
 
-                # 2. Ejecutar la lógica del usuario
-                result = func(*args, **kwargs)
+                console.print(
+                    f"[bold blue]Starting step:[/bold blue] {step_name} [{layer}]")
+                events.publish("step.started", run_id=run_id, step=step_name,
+                               layer=str(layer))
+
+                # 2. Ejecutar la lógica del usuario (registrando los archivos crudos que lee)
+                if profile or KipoContext.get_instance().profile:
+                    profiler = profiling.StepProfiler(step_name, run_id)
+                tracking = start_input_tracking()
+                try:
+                    result = func(*args, **kwargs)
+                finally:
+                    raw_inputs = stop_input_tracking(tracking)
+                if profiler:
+                    profiler.capture_plan(result)
 
                 # 3. Lógica de Persistencia Automática
-                # Solo guardamos si el resultado es un DataFrame
-                if isinstance(result, pl.DataFrame):
-                    # Asegurar que el directorio existe (mkdir -p)
-                    output_dir.mkdir(parents=True, exist_ok=True)
+                # Solo guardamos si el resultado es un DataFrame o LazyFrame
+                output_rows = bytes_written = None
+                pending = None
+                if isinstance(result, (pl.DataFrame, pl.LazyFrame)):
+                    returned = result
+
+                    def save(data: Frame) -> Path:
+                        # Guardar en Parquet (Estándar de oro)
+                        written = write(data, layer, step_name, engine=engine,
+                                        partition_by=partition_by, mode=mode, key=key,
+                                        write_profile=write_profile, format=step_format)
+
+                        if fingerprint is not None:
+                            cache.record(written, fingerprint, returned, raw_inputs)
+                        elif cacheable:
+                            # El fingerprint anterior ya no describe el archivo escrito
+                            cache.clear(layer, step_name)
+                        _record_in_catalog(layer, step_name, run_id)
+                        if mode != WriteMode.OVERWRITE:
+                            compaction.schedule_compaction(layer, step_name, write_profile)
+
+                        console.print(f"[dim]Saved to: {written}[/dim]")
+                        return written
+
+                    step_persist = persist_mode or PersistMode(get_persist_config()["mode"])
+                    if step_persist == PersistMode.ASYNC and (
+                            isinstance(result, pl.DataFrame) or engine == Engine.IN_MEMORY):
+                        # 3a. Async: el writer escribe mientras el pipeline sigue con el
+                        # frame en memoria (lazy si el step devolvió un LazyFrame)
+                        frame = result if isinstance(result, pl.DataFrame) else result.collect()
+                        output_rows = frame.height
+                        # El writer usa su propio objeto (comparte los buffers): Polars
+                        # toma el frame de forma exclusiva mientras lo escribe y el
+                        # pipeline lo está leyendo al mismo tiempo
+                        to_write = frame.clone()
+
+                        def save_durably() -> int:
+                            files = metrics.written_files(save(to_write), timer.start_epoch)
+                            writers.fsync(files)
+                            return sum(f.stat().st_size for f in files)
+
+                        pending = save_durably
+                        result = frame if isinstance(returned, pl.DataFrame) else frame.lazy()
+                    else:
+                        # Solo los archivos que publica esta escritura: en datasets
+                        # particionados o fragmentados el resto no es de este resultado
+                        writing = start_output_tracking()
+                        try:
+                            output_file = save(result)
+                        finally:
+                            files = stop_output_tracking(writing)
 
-                    # Guardar en Parquet (Estándar de oro)
-                    result.write_parquet(output_file)
+                        # Métricas de salida: solo metadata de los archivos recién escritos
+                        bytes_written = sum(f.stat().st_size for f in files)
+                        if isinstance(result, pl.DataFrame):
+                            output_rows = result.height
+                        elif files:
+                            output_rows = scan_files(files).select(pl.len()).collect().item()
 
-                    console.print(f"[dim]Saved to: {output_file}[/dim]")
+                        # El siguiente step recibe un scan lazy de lo que escribió este
+                        if isinstance(result, pl.LazyFrame):
+                            result = _scan_written(files, output_file, result)
                 elif result is None:
                     console.print(
                         f"[dim]Step returned None (nothing to save)[/dim]")
 
+                if profiler:
+                    profiler.finish(RunStatus.SUCCESS)
+                if pending is None:
+                    timer.finish(input_rows=input_rows, output_rows=output_rows,
+                                 bytes_written=bytes_written)
+                else:
+                    # Las métricas se registran cuando el writer termina (bytes o fallo)
+                    step_run = timer.build(input_rows=input_rows, output_rows=output_rows)
+                    writers.submit(output_file, f"{step_name} [{layer}]", pending,
+                                   functools.partial(_finish_async_write, step_run,
+                                                     step_name, layer, run_id))
+                events.publish("step.finished", run_id=run_id, step=step_name,
+                               layer=str(layer), cached=False,
+                               wall_seconds=timer.elapsed(), output_rows=output_rows)
                 console.print(
                     f"[bold green]Step finished:[/bold green] {step_name}")
                 return result
 
             except Exception as e:
+                if profiler:
+                    profiler.finish(RunStatus.FAILED)
+                timer.finish(status=RunStatus.FAILED, input_rows=input_rows)
+                events.publish("step.failed", run_id=run_id, step=step_name,
+                               layer=str(layer), error=str(e))
                 console.print(f"[bold red]Step failed:[/bold red] {step_name}")
                 console.print(f"[red]{e}[/red]")
 
                 raise e
 
+        scheduler.register(step_name, wrapper, depends_on or ())
         return wrapper
     return decorator
@@ -5,3 +5,50 @@ class DataLayer(StrEnum):
     BRONZE = "BRONZE"
     SILVER = "SILVER"
     GOLD = "GOLD"
+
+
+class Engine(StrEnum):
+    """Motor de Polars usado para materializar resultados lazy."""
+    STREAMING = "streaming"
+    IN_MEMORY = "in-memory"
+
+
+class WriteMode(StrEnum):
+    """Cómo persiste un step su resultado sobre el dataset existente."""
+    OVERWRITE = "overwrite"
+    APPEND = "append"
+    UPSERT = "upsert"
+
+
+class StorageFormat(StrEnum):
+    """Formato en disco de los datasets: Parquet o Arrow IPC (lectura con mmap)."""
+    PARQUET = "parquet"
+    IPC = "ipc"
+
+    @property
+    def suffix(self) -> str:
+        return ".arrow" if self == StorageFormat.IPC else ".parquet"
+
+
+# Extensiones de los archivos de datos que escribe Kipo
+DATA_SUFFIXES = tuple(f.suffix for f in StorageFormat)
+
+
+class PersistMode(StrEnum):
+    """Cuándo escribe un step su resultado: antes de devolverlo o en segundo plano."""
+    SYNC = "sync"
+    ASYNC = "async"
+
+
+class RunStatus(StrEnum):
+    RUNNING = "RUNNING"
+    SUCCESS = "SUCCESS"
+    FAILED = "FAILED"
+
+
+class JobStatus(StrEnum):
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    SUCCESS = "SUCCESS"
+    FAILED = "FAILED"
+    CANCELLED = "CANCELLED"
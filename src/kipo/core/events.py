@@ -0,0 +1,46 @@
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+# Bus de eventos en proceso: steps y runner publican, el dashboard (SSE)
+# y los procesos worker se suscriben. Los suscriptores no deben bloquear.
+Event = Dict[str, Any]
+Subscriber = Callable[[Event], None]
+
+_subscribers: List[Subscriber] = []
+_lock = threading.Lock()
+
+
+def subscribe(callback: Subscriber) -> Callable[[], None]:
+    """Registra un suscriptor. Devuelve la función para desuscribirlo."""
+    with _lock:
+        _subscribers.append(callback)
+
+    def unsubscribe() -> None:
+        with _lock:
+            if callback in _subscribers:
+                _subscribers.remove(callback)
+
+    return unsubscribe
+
+
+def dispatch(event: Event) -> None:
+    """Entrega un evento ya armado (por ejemplo, reenviado desde un worker)."""
+    with _lock:
+        subscribers = list(_subscribers)
+    for callback in subscribers:
+        try:
+            callback(event)
+        except Exception:
+            # Un suscriptor roto no puede tumbar un step
+            pass
+
+
+def publish(event_type: str, **payload: Any) -> None:
+    """
+    Publica un evento, ej: publish("step.finished", run_id=1, step="load").
+    Sin suscriptores el costo es despreciable.
+    """
+    if not _subscribers:
+        return
+    dispatch({"type": event_type, "ts": time.time(), **payload})
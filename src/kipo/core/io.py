@@ -1,62 +1,867 @@
+import fnmatch
+import os
+import shutil
+import threading
+import time
+import uuid
+import weakref
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple, Union
+from urllib.parse import quote
 import polars as pl
-from kipo.core.definitions import DataLayer
-from kipo.core.config import get_base_dir
+from kipo.core.definitions import DATA_SUFFIXES, DataLayer, Engine, StorageFormat, WriteMode
+from kipo.core.config import get_base_dir, get_storage_format, get_write_profile
+from kipo.core import contracts, raw_cache, read_cache, versions, writers
+from kipo.core.context import KipoContext, note_dataset_input, note_output, note_raw_input
 
-BASE_DIR = get_base_dir()
+# Convenciones de datasets particionados estilo Hive:
+# <layer>/<name>/<col>=<valor>/part-0.parquet (o part-0.arrow en formato IPC)
+PART_FILE = "part-0.parquet"
+HIVE_NULL = "__HIVE_DEFAULT_PARTITION__"
 
+# Codecs que admite Arrow IPC; el resto de las opciones Parquet no aplican
+IPC_COMPRESSIONS = ("uncompressed", "lz4", "zstd")
 
-def get_data_path(layer: DataLayer, name: str) -> Path:
+Filters = Dict[str, Any]
+
+# Scans de datasets de kipo: id del LazyFrame -> (archivos, detalle de lo que
+# se les aplicó). El cache identifica estos scans por la firma de sus
+# archivos en lugar de leer los datos para hashearlos.
+_scan_sources: Dict[int, Tuple[Tuple[str, ...], str]] = {}
+
+
+def __getattr__(name: str) -> Any:
+    # Compatibilidad: BASE_DIR ya no se calcula al importar el módulo
+    if name == "BASE_DIR":
+        return get_base_dir()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def get_data_path(layer: DataLayer, name: str,
+                  format: Union[StorageFormat, str, None] = None) -> Path:
     """
     Calcula la ruta estandarizada para un dataset.
     Aplica sanitización: minúsculas, espacios a guiones bajos y elimina espacios extra.
+
+    Sin `format` se usa el del archivo que ya existe en disco (.arrow si el
+    dataset se escribió en Arrow IPC; si no, .parquet).
     """
     clean_name = name.strip().lower().replace(" ", "_")
     # Asume que DataLayer es un Enum, extrae el nombre (ej: 'BRONZE') y lo pasa a minúsculas
     layer_name = str(layer).split('.')[-1].lower()
+    base = get_base_dir() / layer_name
+
+    if format is None:
+        ipc_path = base / f"{clean_name}{StorageFormat.IPC.suffix}"
+        format = StorageFormat.IPC if ipc_path.exists() else StorageFormat.PARQUET
+    return base / f"{clean_name}{StorageFormat(format).suffix}"
 
-    return BASE_DIR / layer_name / f"{clean_name}.parquet"
 
+def format_of(path: Path) -> StorageFormat:
+    """Formato de un archivo de datos según su extensión."""
+    return StorageFormat.IPC if path.suffix == StorageFormat.IPC.suffix else StorageFormat.PARQUET
 
-def read(layer: DataLayer, name: str) -> pl.DataFrame:
+
+def scan_files(files: Sequence[Path], hive_partitioning: bool = False) -> pl.LazyFrame:
     """
-    Lee un dataset del framework asegurando consistencia en la ruta.
+    LazyFrame sobre archivos de datos Parquet y/o Arrow IPC. Un dataset que
+    cambió de formato puede tener fragmentos de ambos: se escanean por
+    tramos consecutivos del mismo formato, conservando el orden.
+    """
+    runs: List[List[Path]] = []
+    for file in files:
+        if runs and format_of(runs[-1][0]) == format_of(file):
+            runs[-1].append(file)
+        else:
+            runs.append([file])
+
+    frames = []
+    for run in runs:
+        # Los IPC sin comprimir se leen con memory-map: sin copias ni decodificación,
+        # y los procesos que leen el mismo archivo comparten el page cache
+        reader = pl.scan_ipc if format_of(run[0]) == StorageFormat.IPC else pl.scan_parquet
+        frames.append(reader(run, hive_partitioning=hive_partitioning))
+    return frames[0] if len(frames) == 1 else pl.concat(frames, how="diagonal_relaxed")
+
+
+def track_scan(lf: pl.LazyFrame, files: Sequence[Path], detail: str = "") -> pl.LazyFrame:
     """
-    path = get_data_path(layer, name)
-    if not path.exists():
+    Registra `lf` como scan de `files` (con `detail`: filtros u otra
+    transformación aplicada). Un LazyFrame derivado de él ya no cuenta.
+    """
+    key = id(lf)
+    _scan_sources[key] = (tuple(str(f) for f in files), detail)
+    weakref.finalize(lf, _scan_sources.pop, key, None)
+    return lf
+
+
+def scan_signature(lf: pl.LazyFrame) -> Optional[List[Any]]:
+    """
+    Detalle + ruta, tamaño y mtime de los archivos de un scan registrado con
+    `track_scan`. None si el LazyFrame no es uno de ellos o si falta un archivo.
+    """
+    source = _scan_sources.get(id(lf))
+    if source is None:
+        return None
+    files, detail = source
+    signature: List[Any] = [detail]
+    for file in files:
+        try:
+            stat = os.stat(file)
+        except OSError:
+            return None
+        signature.append([file, stat.st_size, stat.st_mtime_ns])
+    return signature
+
+
+def get_dataset_dir(layer: DataLayer, name: str) -> Path:
+    """Directorio de un dataset particionado: <layer>/<name>/."""
+    return get_data_path(layer, name).with_suffix("")
+
+
+def _format_partition_value(value: Any) -> str:
+    if value is None:
+        return HIVE_NULL
+    return quote(str(value), safe="")
+
+
+def _wanted_partitions(filters: Filters) -> Dict[str, Set[str]]:
+    wanted = {}
+    for column, values in filters.items():
+        if not isinstance(values, (list, tuple, set)):
+            values = [values]
+        wanted[column] = {_format_partition_value(v) for v in values}
+    return wanted
+
+
+def _pruned_files(directory: Path, wanted: Dict[str, Set[str]]) -> Iterator[Path]:
+    """
+    Recorre el árbol de particiones descartando directorios `col=valor`
+    que no cumplen los filtros, sin abrir sus archivos.
+    """
+    for child in sorted(directory.iterdir()):
+        if child.is_dir():
+            column, sep, value = child.name.partition("=")
+            if sep and column in wanted and value not in wanted[column]:
+                continue
+            yield from _pruned_files(child, wanted)
+        elif child.suffix in DATA_SUFFIXES and not child.name.startswith("."):
+            yield child
+
+
+def _partition_columns(files: Sequence[Path], dataset_dir: Path) -> Set[str]:
+    columns = set()
+    for file in files:
+        for part in file.relative_to(dataset_dir).parent.parts:
+            column, sep, _ = part.partition("=")
+            if sep:
+                columns.add(column)
+    return columns
+
+
+def _predicate(filters: Filters) -> List[pl.Expr]:
+    exprs = []
+    for column, values in filters.items():
+        if isinstance(values, (list, tuple, set)):
+            exprs.append(pl.col(column).is_in(list(values)))
+        elif values is None:
+            exprs.append(pl.col(column).is_null())
+        else:
+            exprs.append(pl.col(column) == values)
+    return exprs
+
+
+def _locate(layer: DataLayer, name: str, version: Optional[int] = None,
+            as_of: Optional[versions.AsOf] = None) -> tuple:
+    """
+    (archivo único, directorio) del dataset: los actuales o, con `version` /
+    `as_of`, los de esa versión guardada. A lo sumo uno de los dos existe.
+    """
+    dataset_dir = get_dataset_dir(layer, name)
+    # Un step con persist="async" puede estar escribiendo este dataset
+    # (antes de mirar qué archivo existe: puede ser el que está creando)
+    writers.wait_for(dataset_dir)
+    if version is None and as_of is None:
+        # El caché del step que lo lee se invalida si el dataset cambia
+        note_dataset_input(dataset_dir)
+        return get_data_path(layer, name), dataset_dir
+
+    # La versión refleja el layer: <run_id>/<name>.parquet|.arrow o <run_id>/<name>/
+    version_dir = versions.resolve(dataset_dir, version, as_of) / dataset_dir.name
+    singles = _single_files(version_dir)
+    return next((p for p in singles if p.exists()), singles[0]), version_dir
+
+
+def scan(layer: DataLayer, name: str, filters: Optional[Filters] = None,
+         version: Optional[int] = None,
+         as_of: Optional[versions.AsOf] = None) -> pl.LazyFrame:
+    """
+    Devuelve un LazyFrame sobre el dataset (archivo único o particionado).
+    Selección de columnas, filtros y límites aplicados sobre el resultado se
+    empujan al lector de Parquet, así que solo se lee lo necesario.
+
+    Uso: kipo.scan(DataLayer.GOLD, "ventas").select("total").head(10).collect()
+    En datasets particionados, los filtros sobre columnas de partición
+    podan directorios; el resto se aplica como predicado.
+
+    `version` (id del run que lo escribió) o `as_of` (fecha/hora, local si no
+    tiene zona) leen una versión anterior del dataset; ver `kipo versions`.
+    """
+    filters = filters or {}
+    path, dataset_dir = _locate(layer, name, version, as_of)
+
+    if path.exists():
+        files = [path]
+        lf = scan_files(files)
+        remaining = filters
+    elif dataset_dir.is_dir():
+        files = list(_pruned_files(dataset_dir, _wanted_partitions(filters)))
+        if not files:
+            all_files = list(_pruned_files(dataset_dir, {}))
+            if not all_files:
+                # Directorio sin archivos de datos: no hay dataset que leer
+                raise FileNotFoundError(f"No dataset found at {path}")
+            # Ninguna partición coincide: dataset vacío con el esquema correcto
+            return track_scan(scan_files(all_files, hive_partitioning=True).head(0),
+                              all_files, "empty")
+
+        lf = scan_files(files, hive_partitioning=True)
+        partition_columns = _partition_columns(files, dataset_dir)
+        remaining = {c: v for c, v in filters.items()
+                     if c not in partition_columns}
+    else:
         raise FileNotFoundError(f"No dataset found at {path}")
 
-    return pl.read_parquet(path)
+    if remaining:
+        lf = lf.filter(*_predicate(remaining))
+    return track_scan(lf, files, repr(sorted(remaining.items())))
+
+
+def read(layer: DataLayer, name: str, filters: Optional[Filters] = None,
+         use_cache: bool = True, version: Optional[int] = None,
+         as_of: Optional[versions.AsOf] = None) -> pl.DataFrame:
+    """
+    Lee un dataset del framework asegurando consistencia en la ruta.
+
+    Uso: df = kipo.read(DataLayer.SILVER, "cosechas", filters={"semana": "2024-10"})
+    En datasets particionados solo se leen los directorios que cumplen los filtros.
+
+    Lecturas repetidas de un dataset sin cambios en disco se sirven desde el
+    caché en memoria del proceso (ver `kipo.core.read_cache`); `use_cache=False`
+    fuerza la lectura desde disco.
+
+    Los datasets en Arrow IPC sin comprimir se abren con memory-map: el frame
+    apunta al archivo sin copiarlo y varios procesos comparten sus páginas.
+
+    Versiones: `version=42` lee el dataset tal como lo dejó el run 42 y
+    `as_of="2024-05-01 08:00"` la última versión escrita hasta ese momento.
+    Uso: df = kipo.read(DataLayer.GOLD, "ventas", as_of="2024-05-01")
+    """
+    path, dataset_dir = _locate(layer, name, version, as_of)
+    target = path if path.exists() else dataset_dir
+
+    def load() -> pl.DataFrame:
+        if path.exists() and not filters:
+            if format_of(path) == StorageFormat.IPC:
+                # read_ipc mapea el archivo local en memoria (sin memory_map=False)
+                return pl.read_ipc(path)
+            return pl.read_parquet(path)
+        return scan(layer, name, filters, version, as_of).collect()
+
+    if not use_cache:
+        return load()
+    return read_cache.get_or_load(target, filters, load)
+
+
+# Un lock por dataset: escrituras y compactación no se pisan entre threads
+_locks: Dict[Path, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def dataset_lock(dataset_dir: Path) -> threading.Lock:
+    with _locks_guard:
+        return _locks.setdefault(dataset_dir.resolve(), threading.Lock())
+
+
+WriteOptions = Dict[str, Any]
+
+
+def _writer(data: Union[pl.DataFrame, pl.LazyFrame], engine: Engine,
+            options: Optional[WriteOptions] = None,
+            format: StorageFormat = StorageFormat.PARQUET) -> Callable[[Path], None]:
+    """
+    Función que escribe `data` en una ruta según el motor elegido y las
+    opciones del perfil de escritura (codec, row groups, estadísticas, orden).
+    En Arrow IPC solo aplican `compression` (sin comprimir por defecto) y `sort_by`.
+    """
+    options = dict(options or {})
+    sort_by = options.pop("sort_by", None)
+    if sort_by:
+        # Ordenar por las columnas de filtro hace útiles las estadísticas
+        # min/max de cada row group. Las columnas de partición ya no están.
+        sort_by = [sort_by] if isinstance(sort_by, str) else list(sort_by)
+        schema = data.collect_schema() if isinstance(data, pl.LazyFrame) else data.schema
+        present = [c for c in sort_by if c in schema]
+        if present:
+            data = data.sort(present)
+
+    if format == StorageFormat.IPC:
+        compression = options.get("compression", "uncompressed")
+        if compression not in IPC_COMPRESSIONS:
+            raise ValueError(
+                f"Compression '{compression}' is not supported by the IPC format. "
+                f"Options are: {', '.join(IPC_COMPRESSIONS)}")
+        if isinstance(data, pl.LazyFrame):
+            if engine == Engine.STREAMING:
+                return lambda path: data.sink_ipc(path, compression=compression)
+            return lambda path: data.collect().write_ipc(path, compression=compression)
+        return lambda path: data.write_ipc(path, compression=compression)
+
+    if isinstance(data, pl.LazyFrame):
+        if engine == Engine.STREAMING:
+            return lambda path: data.sink_parquet(path, **options)
+        return lambda path: data.collect().write_parquet(path, **options)
+    return lambda path: data.write_parquet(path, **options)
+
+
+def _atomic_write(target: Path, writer: Callable[[Path], None]) -> Path:
+    """
+    Escribe en un temporal junto a `target` y lo renombra: los lectores nunca
+    ven un archivo a medio escribir y un fallo deja intacto el anterior.
+    El temporal tiene nombre único: dos procesos pueden escribir el mismo
+    dataset a la vez (jobs del dashboard) y gana el último rename.
+    """
+    tmp_file = target.with_name(f".{target.name}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        writer(tmp_file)
+        os.replace(tmp_file, target)
+    except BaseException:
+        tmp_file.unlink(missing_ok=True)
+        raise
+    return target
+
+
+def write_file(data: Union[pl.DataFrame, pl.LazyFrame], path: Path,
+               engine: Engine = Engine.STREAMING,
+               options: Optional[WriteOptions] = None) -> Path:
+    """
+    Escribe `data` en un único archivo de forma atómica con las opciones dadas.
+    El formato (Parquet o Arrow IPC) sale de la extensión de `path`.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return _atomic_write(path, _writer(data, engine, options, format_of(path)))
+
+
+def list_fragments(directory: Path) -> List[Path]:
+    """Fragmentos de un directorio de dataset, en orden de escritura."""
+    return sorted(p for p in directory.glob("part-*") if p.suffix in DATA_SUFFIXES)
+
+
+def _write_fragment(directory: Path, writer: Callable[[Path], None],
+                    format: StorageFormat = StorageFormat.PARQUET) -> Path:
+    """Escribe un fragmento nuevo (temporal + rename) sin tocar los existentes."""
+    directory.mkdir(parents=True, exist_ok=True)
+    target = directory / f"part-{time.time_ns()}-{uuid.uuid4().hex[:8]}{format.suffix}"
+    note_output(_atomic_write(target, writer))
+    return target
+
+
+def _replace_partition(partition_dir: Path, writer: Callable[[Path], None],
+                       format: StorageFormat = StorageFormat.PARQUET) -> Path:
+    """
+    Escribe una partición en un temporal y lo renombra sobre part-0.parquet
+    (part-0.arrow en IPC). Solo se toca el directorio de esta partición.
+    """
+    partition_dir.mkdir(parents=True, exist_ok=True)
+    target = partition_dir / Path(PART_FILE).with_suffix(format.suffix)
+
+    def replace(tmp_file: Path) -> None:
+        writer(tmp_file)
+        for old in list(partition_dir.iterdir()):
+            if old.is_file() and old.suffix in DATA_SUFFIXES and old.name != target.name \
+                    and not old.name.startswith("."):
+                old.unlink()
+
+    note_output(_atomic_write(target, replace))
+    return target
+
+
+def _upsert_into(directory: Path, data: Union[pl.DataFrame, pl.LazyFrame],
+                 key: Sequence[str], engine: Engine,
+                 options: Optional[WriteOptions] = None,
+                 format: StorageFormat = StorageFormat.PARQUET) -> Path:
+    """
+    Merge por clave a nivel de fragmento: las filas nuevas van a un fragmento
+    nuevo y solo se reescriben los fragmentos que contienen alguna clave nueva.
+    Sin columnas de clave (clave = columnas de partición) se reemplaza todo.
+    """
+    key = list(key)
+    existing = list_fragments(directory)
+    new_rows = data.lazy()
+    if key:
+        new_rows = new_rows.unique(subset=key, keep="last", maintain_order=True)
+
+    # Primero el fragmento nuevo: ante un fallo preferimos duplicados a pérdidas
+    written = _write_fragment(directory, _writer(new_rows, engine, options, format), format)
+
+    if not key:
+        for fragment in existing:
+            fragment.unlink()
+        return written
+
+    new_keys = scan_files([written]).select(key).unique().collect().lazy()
+    for fragment in existing:
+        current = scan_files([fragment])
+        overlap = current.join(new_keys, on=key, how="semi").select(pl.len()).collect().item()
+        if not overlap:
+            continue
+
+        total = current.select(pl.len()).collect().item()
+        if overlap == total:
+            fragment.unlink()
+            continue
+
+        write_file(current.join(new_keys, on=key, how="anti"), fragment, options=options)
+
+    return written
+
 
+def _single_files(dataset_dir: Path) -> List[Path]:
+    """<name>.parquet / <name>.arrow: el dataset como archivo único, en cualquier formato."""
+    return [dataset_dir.with_name(dataset_dir.name + suffix) for suffix in DATA_SUFFIXES]
 
-def read_raw(filename: str) -> pl.DataFrame:
+
+def _adopt_single_file(dataset_dir: Path) -> None:
+    """Convierte <name>.parquet en el primer fragmento de <name>/ (sin copiar datos)."""
+    for path in _single_files(dataset_dir):
+        if path.exists():
+            dataset_dir.mkdir(parents=True, exist_ok=True)
+            os.replace(path, dataset_dir / f"part-0-{uuid.uuid4().hex[:8]}{path.suffix}")
+
+
+def _write_partitioned(data: Union[pl.DataFrame, pl.LazyFrame], dataset_dir: Path,
+                       columns: Sequence[str], engine: Engine,
+                       store: Callable[[Path, Union[pl.DataFrame, pl.LazyFrame]], Any]) -> None:
+    columns = list(columns)
+
+    def partition_dir(key: Sequence[Any]) -> Path:
+        parts = [f"{c}={_format_partition_value(v)}" for c, v in zip(columns, key)]
+        return dataset_dir.joinpath(*parts)
+
+    if isinstance(data, pl.LazyFrame) and engine == Engine.STREAMING:
+        # Una sola pasada streaming por la consulta, a un archivo temporal
+        # (fuera del dataset, que los lectores no ven); cada partición se
+        # guarda filtrando ese archivo. Nunca se materializa completo.
+        staging = dataset_dir.with_name(
+            f".{dataset_dir.name}.staging-{uuid.uuid4().hex[:8]}{StorageFormat.IPC.suffix}")
+        staging.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            data.sink_ipc(staging)
+            staged = pl.scan_ipc(staging)
+            keys = staged.select(columns).unique(maintain_order=True).collect()
+            for key in keys.iter_rows():
+                match = [pl.col(c).is_null() if v is None else pl.col(c) == v
+                         for c, v in zip(columns, key)]
+                store(partition_dir(key), staged.filter(*match).drop(columns))
+        finally:
+            staging.unlink(missing_ok=True)
+        return
+
+    if isinstance(data, pl.LazyFrame):
+        data = data.collect()
+
+    for key, part in data.partition_by(columns, as_dict=True).items():
+        key = key if isinstance(key, tuple) else (key,)
+        store(partition_dir(key), part.drop(columns))
+
+
+def _snapshot(dataset_dir: Path, written: Path) -> None:
+    """Guarda el estado recién escrito como la versión del run en curso (fuera de un run, nada)."""
+    run_id = KipoContext.get_instance().run_id
+    if run_id is None:
+        return
+    files = [written] if written.is_file() else list(_pruned_files(written, {}))
+    versions.snapshot(dataset_dir, files, run_id)
+
+
+def write(data: Union[pl.DataFrame, pl.LazyFrame], layer: DataLayer, name: str,
+          engine: Engine = Engine.STREAMING,
+          partition_by: Optional[Sequence[str]] = None,
+          mode: WriteMode = WriteMode.OVERWRITE,
+          key: Optional[Sequence[str]] = None,
+          write_profile: Union[str, WriteOptions, None] = None,
+          format: Union[StorageFormat, str, None] = None) -> Path:
+    """
+    Persiste un dataset en su ruta estandarizada y devuelve la ruta escrita.
+    Los LazyFrame se escriben con `sink_parquet` (motor streaming) para no
+    materializar el resultado completo en memoria, salvo que se pida el
+    motor en memoria.
+
+    Con `partition_by` se escribe un dataset Hive (<layer>/<name>/col=valor/)
+    y se devuelve su directorio. Solo se reemplazan las particiones presentes
+    en `data`; las demás quedan intactas.
+
+    Modos:
+    - OVERWRITE: reemplaza el dataset (o las particiones presentes).
+    - APPEND: agrega `data` como un fragmento nuevo en <layer>/<name>/.
+    - UPSERT: merge por `key`; solo se reescriben los fragmentos con claves nuevas.
+
+    Las opciones Parquet salen de [storage.layers.<layer>] en kipo_config.toml;
+    `write_profile` las pisa (dict de opciones o nombre de [storage.profiles]).
+    Cada archivo se escribe en un temporal y se renombra al terminar.
+
+    `format` ("parquet" o "ipc") elige el formato en disco; por defecto el
+    `format` de [storage.layers.<layer>], o Parquet. Los archivos nuevos
+    usan ese formato y `read`/`scan` detectan el de cada archivo.
+
+    Dentro de un run, el estado resultante queda como versión del run
+    (hard links, sin copiar datos); ver `read(version=..., as_of=...)`.
+    """
+    mode = WriteMode(mode)
+    options = get_write_profile(layer, write_profile)
+    format = StorageFormat(format or get_storage_format(layer))
+    path = get_data_path(layer, name, format)
+    dataset_dir = get_dataset_dir(layer, name)
+
+    if mode == WriteMode.UPSERT and not key:
+        raise ValueError("Upsert mode requires a key")
+    # Una escritura directa no se adelanta a una async pendiente del mismo dataset
+    writers.wait_for(path)
+
+    try:
+        with dataset_lock(dataset_dir):
+            if partition_by:
+                # Un archivo único previo haría ambigua la lectura
+                for single in _single_files(dataset_dir):
+                    single.unlink(missing_ok=True)
+            elif mode != WriteMode.OVERWRITE:
+                _adopt_single_file(dataset_dir)
+
+            if mode == WriteMode.OVERWRITE and not partition_by:
+                note_output(write_file(data, path, engine, options))
+
+                # El archivo en el otro formato (si cambió el formato) queda obsoleto
+                for single in _single_files(dataset_dir):
+                    if single != path:
+                        single.unlink(missing_ok=True)
+                if dataset_dir.is_dir():
+                    # El dataset dejó de estar fragmentado: el archivo único lo reemplaza
+                    shutil.rmtree(dataset_dir)
+                _snapshot(dataset_dir, path)
+                return path
+
+            partition_columns = list(partition_by or [])
+
+            def store(directory: Path, frame: Union[pl.DataFrame, pl.LazyFrame]) -> None:
+                if mode == WriteMode.APPEND:
+                    _write_fragment(directory, _writer(frame, engine, options, format), format)
+                elif mode == WriteMode.UPSERT:
+                    # Dentro de una partición sus columnas son constantes
+                    local_key = [c for c in key if c not in partition_columns]
+                    _upsert_into(directory, frame, local_key, engine, options, format)
+                else:
+                    _replace_partition(directory, _writer(frame, engine, options, format), format)
+
+            if partition_columns:
+                _write_partitioned(data, dataset_dir, partition_columns, engine, store)
+            else:
+                store(dataset_dir, data)
+
+            _snapshot(dataset_dir, dataset_dir)
+            return dataset_dir
+    finally:
+        # Las lecturas cacheadas en memoria de este dataset quedan obsoletas
+        for single in _single_files(dataset_dir):
+            read_cache.invalidate(single)
+        read_cache.invalidate(dataset_dir)
+
+
+def _read_excel(raw_path: Path, schema: Optional[contracts.Schema] = None,
+                **kwargs: Any) -> Any:
+    """
+    pl.read_excel con calamine. Con contrato, las celdas se leen como texto
+    (sin inferencia) y se convierten a los tipos del contrato en `enforce`:
+    los tipos del parser de Excel dejan en null los valores que no convierten.
+    """
+    if schema is None:
+        return pl.read_excel(raw_path, engine="calamine", **kwargs)
+    return pl.read_excel(raw_path, engine="calamine", infer_schema_length=0, **kwargs)
+
+
+def _check_csv_header(files: Sequence[Path], schema: contracts.Schema) -> None:
+    # Solo el encabezado: un archivo con otras columnas se rechaza sin leerlo
+    for file in files:
+        header = pl.read_csv(file, n_rows=0, infer_schema=False).columns
+        contracts.check_columns(header, schema, file.name)
+
+
+def _parse_raw(raw_path: Path, schema: Optional[contracts.Schema] = None) -> pl.DataFrame:
+    """Parsea un archivo crudo según su extensión (con los tipos de su contrato, si tiene)."""
+    suffix = raw_path.suffix.lower()
+
+    if suffix in [".xlsx", ".xls"]:
+
+        # Usamos engine='calamine' porque es ultrarrápido y ya lo tienes en dependencias
+        df = _read_excel(raw_path, schema)
+
+    elif suffix == ".csv":
+        if schema is None:
+            return pl.read_csv(raw_path)
+        _check_csv_header([raw_path], schema)
+        try:
+            df = pl.read_csv(raw_path, schema_overrides=schema, infer_schema=False)
+        except pl.exceptions.PolarsError as e:
+            raise ValueError(f"{raw_path.name} does not match its schema contract: {e}") from e
+
+    elif suffix == ".parquet":
+        df = pl.read_parquet(raw_path)
+
+    elif suffix in [".arrow", ".ipc"]:
+        df = pl.read_ipc(raw_path)
+
+    else:
+        raise ValueError(f"Unsupported format: {suffix}")
+
+    if schema is None:
+        return df
+    return contracts.enforce(df, schema, raw_path.name)
+
+
+def _is_glob(filename: str) -> bool:
+    return any(ch in filename for ch in "*?[")
+
+
+def _scan_raw(files: Sequence[Path],
+              schema: Optional[contracts.Schema] = None) -> pl.LazyFrame:
+    """
+    Escaneo lazy de uno o varios archivos crudos del mismo formato.
+    Polars reparte los archivos entre núcleos y, al escribirse con
+    `sink_parquet`, los procesa por lotes sin materializarlos completos.
+    Con contrato, las columnas de cada archivo se verifican al escanear y
+    los tipos se aplican (estrictos) al ejecutar la consulta.
+    """
+    suffix = files[0].suffix.lower()
+    if any(f.suffix.lower() != suffix for f in files):
+        raise ValueError("All files matched by a raw pattern must share the same format")
+
+    if suffix == ".csv":
+        if schema is None:
+            return pl.scan_csv(files)
+        _check_csv_header(files, schema)
+        return pl.scan_csv(files, schema_overrides=schema, infer_schema=False).select(list(schema))
+    elif suffix == ".parquet":
+        lf = pl.scan_parquet(files)
+    elif suffix in [".arrow", ".ipc"]:
+        lf = pl.scan_ipc(files)
+    else:
+        raise ValueError(
+            f"Lazy ingestion supports CSV, Parquet and Arrow IPC files, got: {suffix}")
+
+    if schema is None:
+        return lf
+    current = lf.collect_schema()
+    contracts.check_columns(current.names(), schema, files[0].name)
+    return lf.cast({c: d for c, d in schema.items() if current[c] != d}).select(list(schema))
+
+
+def read_raw(filename: str, use_cache: bool = True,
+             lazy: bool = False) -> Union[pl.DataFrame, pl.LazyFrame]:
     """
     Ingesta un archivo crudo (Excel o CSV) desde la carpeta 'raw' del Data Lake.
     Detecta automáticamente la extensión.
 
+    Los Excel/CSV se convierten a Parquet una sola vez (caché en .kipo/raw_cache,
+    invalidado por tamaño/mtime del archivo); las lecturas siguientes salen de
+    esa copia. `use_cache=False` fuerza el parseo del original.
+
+    Patrones glob (ej: "ventas_*.csv") o `lazy=True` devuelven un LazyFrame
+    sobre todos los archivos coincidentes. Devuelto desde un @step, se escribe
+    en streaming a Parquet sin construir un DataFrame gigante en memoria.
+
+    Si el archivo tiene contrato de esquema (sidecar <archivo>.schema.json o
+    [raw.schemas], ver `kipo schema infer`), se lee con esos tipos sin
+    inferirlos y un archivo que no lo cumple se rechaza con ValueError.
+
     Uso: df = kipo.read_raw("cosecha_semanal.xlsx")
+         lf = kipo.read_raw("ventas_*.csv")
     """
     base = get_base_dir()
-    raw_path = base / "raw" / filename
+    raw_dir = base / "raw"
+
+    # El caché de steps invalida el resultado si estos archivos (o sus contratos) cambian
+    note_raw_input(str(raw_dir / filename))
+    note_raw_input(str(raw_dir / filename) + contracts.SIDECAR_SUFFIX)
+
+    if _is_glob(filename):
+        files = sorted(p for p in raw_dir.glob(filename)
+                       if p.is_file() and not p.name.endswith(contracts.SIDECAR_SUFFIX))
+        if not files:
+            raise FileNotFoundError(f"No raw files match: {raw_dir / filename}")
+
+        print(f"Ingesting: {filename} ({len(files)} files, lazy)...")
+        return _scan_raw(files, contracts.load(files[0]))
+
+    raw_path = raw_dir / filename
 
     if not raw_path.exists():
         raise FileNotFoundError(f"Raw file not found: {raw_path}")
 
     # Detección de extensión
     suffix = raw_path.suffix.lower()
+    if suffix not in [".xlsx", ".xls", ".csv", ".parquet", ".arrow", ".ipc"]:
+        raise ValueError(f"Unsupported format: {suffix}")
+
+    schema = contracts.load(raw_path)
+
+    if lazy:
+        print(f"Ingesting: {filename} (lazy)...")
+        return _scan_raw([raw_path], schema)
 
     print(f"Ingesting: {filename}...")
 
-    if suffix in [".xlsx", ".xls"]:
+    def parse(path: Path) -> pl.DataFrame:
+        return _parse_raw(path, schema)
 
-        # Usamos engine='calamine' porque es ultrarrápido y ya lo tienes en dependencias
-        return pl.read_excel(raw_path, engine="calamine")
+    # Un Parquet o Arrow crudo no gana nada con una copia Parquet
+    if use_cache and suffix not in [".parquet", ".arrow", ".ipc"]:
+        # Otro contrato, otra copia: los tipos cacheados son los del contrato
+        variant = contracts.digest(schema) if schema is not None else ""
+        df = raw_cache.cached_read(raw_path, parse, variant=variant)
+        if df is not None:
+            return df
 
-    elif suffix == ".csv":
-        return pl.read_csv(raw_path)
+    return parse(raw_path)
 
-    elif suffix == ".parquet":
-        return pl.read_parquet(raw_path)
 
+# Valor de `sheets` que selecciona todas las hojas de cada libro
+ALL_SHEETS = "*"
+
+Sheets = Union[str, Sequence[str], None]
+
+
+def _parse_workbook(path: Path, sheets: Sheets, sheet_column: str,
+                    schema: Optional[contracts.Schema] = None) -> pl.DataFrame:
+    """
+    Parsea las hojas pedidas de un Excel (abriéndolo una sola vez cuando se
+    puede) y las concatena con el nombre de cada hoja en `sheet_column`.
+    Con contrato, cada hoja debe cumplirlo.
+    """
+    if sheets is None:
+        parsed = _read_excel(path, schema, sheet_id=[1])
+    elif sheets == ALL_SHEETS:
+        parsed = _read_excel(path, schema, sheet_id=0)
     else:
-        raise ValueError(f"Unsupported format: {suffix}")
+        wanted = [sheets] if isinstance(sheets, str) else list(sheets)
+        if any(_is_glob(w) for w in wanted):
+            # Patrones (ej: "Semana *"): hay que conocer los nombres de las hojas
+            import fastexcel
+            available = fastexcel.read_excel(path).sheet_names
+            names: List[str] = []
+            for item in wanted:
+                matches = fnmatch.filter(available, item) if _is_glob(item) else [item]
+                names.extend(m for m in matches if m not in names)
+        else:
+            names = wanted
+        # Un libro sin ninguna hoja que coincida con el patrón no aporta filas
+        parsed = _read_excel(path, schema, sheet_name=names) if names else {}
+
+    if schema is not None:
+        parsed = {name: contracts.enforce(df, schema, f"{path.name} [{name}]")
+                  for name, df in parsed.items()}
+    frames = [df.with_columns(pl.lit(name, dtype=pl.String).alias(sheet_column))
+              for name, df in parsed.items()]
+    if not frames:
+        return pl.DataFrame({sheet_column: []}, schema={sheet_column: pl.String})
+    return pl.concat(frames, how="diagonal_relaxed")
+
+
+def read_raw_many(pattern: str, sheets: Sheets = None, use_cache: bool = True,
+                  workers: Optional[int] = None, into: Optional[str] = None,
+                  source_column: str = "source_file",
+                  sheet_column: str = "sheet") -> Union[pl.DataFrame, Path]:
+    """
+    Ingesta en paralelo todos los archivos crudos que coinciden con `pattern`
+    (Excel, CSV, Parquet o Arrow) y los une en un solo DataFrame, con el
+    archivo de origen en `source_column` y la hoja en `sheet_column`.
+
+    `sheets` elige las hojas de cada Excel: None (la primera), un nombre, un
+    patrón glob ("Semana *"), una lista de nombres/patrones o "*" (todas).
+    Las columnas que faltan en alguna hoja quedan en null.
+
+    Cada archivo se parsea en un thread del pool (`workers`, por defecto uno
+    por núcleo): calamine suelta el GIL mientras lee, así que los libros se
+    parsean a la vez. Cada archivo y selección de hojas se cachea como en
+    `read_raw`.
+
+    Con `into`, cada archivo se escribe en bronze/<into>/ a medida que
+    termina (una partición por archivo de origen, reemplazada en cada
+    ingesta) en vez de juntarlo todo en memoria; devuelve el directorio.
+
+    Uso: df = kipo.read_raw_many("fincas/*.xlsx", sheets="*")
+         kipo.read_raw_many("fincas/*.xlsx", sheets="Semana *", into="cosechas")
+    """
+    raw_dir = get_base_dir() / "raw"
+    note_raw_input(str(raw_dir / pattern))
+    note_raw_input(str(raw_dir / pattern) + contracts.SIDECAR_SUFFIX)
+
+    files = sorted(p for p in raw_dir.glob(pattern)
+                   if p.is_file() and not p.name.endswith(contracts.SIDECAR_SUFFIX))
+    if not files:
+        raise FileNotFoundError(f"No raw files match: {raw_dir / pattern}")
+    for file in files:
+        if file.suffix.lower() not in [".xlsx", ".xls", ".csv", ".parquet", ".arrow", ".ipc"]:
+            raise ValueError(f"Unsupported format: {file.suffix.lower()} ({file.name})")
+
+    def load(file: Path) -> pl.DataFrame:
+        schema = contracts.load(file)
+        if file.suffix.lower() in [".xlsx", ".xls"]:
+            def parse(path: Path) -> pl.DataFrame:
+                return _parse_workbook(path, sheets, sheet_column, schema)
+            variant = f"sheets={sheets!r};column={sheet_column}"
+        else:
+            def parse(path: Path) -> pl.DataFrame:
+                return _parse_raw(path, schema).with_columns(
+                    pl.lit(None, dtype=pl.String).alias(sheet_column))
+            variant = f"column={sheet_column}"
+        if schema is not None:
+            variant += f";{contracts.digest(schema)}"
+
+        df = None
+        if use_cache and file.suffix.lower() not in [".parquet", ".arrow", ".ipc"]:
+            df = raw_cache.cached_read(file, parse, variant=variant)
+        if df is None:
+            df = parse(file)
+
+        source = file.relative_to(raw_dir).as_posix()
+        df = df.with_columns(pl.lit(source, dtype=pl.String).alias(source_column))
+        return df.select(source_column, sheet_column, pl.exclude(source_column, sheet_column))
+
+    workers = workers or min(len(files), os.cpu_count() or 1)
+    print(f"Ingesting: {pattern} ({len(files)} files, {workers} workers)...")
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="kipo-raw") as pool:
+        futures = {pool.submit(load, file): file for file in files}
+        current: Optional[Path] = None
+        try:
+            if into:
+                # Cada archivo va a su partición apenas termina: memoria acotada
+                for future in as_completed(futures):
+                    current = futures[future]
+                    write(future.result(), DataLayer.BRONZE, into,
+                          partition_by=[source_column])
+                return get_dataset_dir(DataLayer.BRONZE, into)
+
+            frames = []
+            for future, current in futures.items():
+                frames.append(future.result())
+        except BaseException as e:
+            # Un archivo que falla cancela los que aún no empezaron
+            for pending in futures:
+                pending.cancel()
+            if current is not None:
+                e.add_note(f"While ingesting raw file: {current}")
+            raise
+
+    return pl.concat(frames, how="diagonal_relaxed")
+
@@ -0,0 +1,301 @@
+import multiprocessing
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from rich.console import Console
+from sqlalchemy import update
+from sqlmodel import Session, desc, select
+from kipo.core import events
+from kipo.core.config import get_job_workers
+from kipo.core.db import get_engine, init_db, update_run_status
+from kipo.core.models import Job, JobStatus, PipelineRun, RunStatus
+
+
+console = Console()
+
+# Cada job corre en su propio proceso (spawn: no hereda los threads del servidor)
+_mp = multiprocessing.get_context("spawn")
+
+ACTIVE = (JobStatus.QUEUED, JobStatus.RUNNING)
+
+
+def enqueue(pipeline_name: str, priority: int = 0) -> Job:
+    """
+    Encola un pipeline. Si ya hay un job QUEUED para el mismo pipeline,
+    lo reutiliza (subiendo su prioridad si la nueva es mayor).
+    """
+    init_db()
+    with Session(get_engine()) as session:
+        existing = session.exec(
+            select(Job).where(Job.pipeline_name == pipeline_name,
+                              Job.status == JobStatus.QUEUED)
+        ).first()
+
+        if existing:
+            if priority > existing.priority:
+                existing.priority = priority
+                session.add(existing)
+                session.commit()
+                session.refresh(existing)
+            return existing
+
+        job = Job(pipeline_name=pipeline_name, priority=priority)
+        session.add(job)
+        session.commit()
+        session.refresh(job)
+        events.publish("job.queued", job_id=job.id, pipeline=pipeline_name,
+                       priority=priority)
+        return job
+
+
+def active_jobs() -> List[Job]:
+    """Jobs en cola o corriendo, en el orden en que se despachan."""
+    init_db()
+    with Session(get_engine()) as session:
+        return list(session.exec(
+            select(Job).where(Job.status.in_(ACTIVE))
+            .order_by(desc(Job.priority), Job.created_at)
+        ).all())
+
+
+def list_jobs(limit: int = 50) -> List[Job]:
+    """Jobs activos primero, luego los más recientes."""
+    active = active_jobs()
+    with Session(get_engine()) as session:
+        recent = session.exec(
+            select(Job).where(Job.status.notin_(ACTIVE))
+            .order_by(desc(Job.created_at)).limit(limit)
+        ).all()
+        return active + list(recent)
+
+
+def get_job(job_id: int) -> Optional[Job]:
+    init_db()
+    with Session(get_engine()) as session:
+        return session.get(Job, job_id)
+
+
+def attach_run(job_id: int, run_id: int) -> None:
+    """Vincula el PipelineRun creado por el proceso worker con su job."""
+    with Session(get_engine()) as session:
+        session.exec(update(Job).where(Job.id == job_id).values(run_id=run_id))
+        session.commit()
+
+
+def _finish(job_id: int, status: str, error_message: Optional[str] = None) -> None:
+    with Session(get_engine()) as session:
+        session.exec(
+            update(Job).where(Job.id == job_id, Job.status == JobStatus.RUNNING)
+            .values(status=status, finished_at=datetime.utcnow(),
+                    error_message=error_message)
+        )
+        session.commit()
+    events.publish("job.finished", job_id=job_id, status=status,
+                   error=error_message)
+
+
+def _fail_run(job_id: int, error_message: str) -> None:
+    """
+    El run de un job interrumpido queda FAILED en lugar de RUNNING para
+    siempre. Un run que el worker ya cerró (p. ej. el pipeline falló y lo
+    registró con su error) no se toca.
+    """
+    job = get_job(job_id)
+    if not job or not job.run_id:
+        return
+    with Session(get_engine()) as session:
+        run = session.get(PipelineRun, job.run_id)
+        if run is None or run.status != RunStatus.RUNNING:
+            return
+    update_run_status(job.run_id, RunStatus.FAILED, error_message=error_message)
+
+
+def _job_main(job_id: int, pipeline_name: str, event_queue=None) -> None:
+    """
+    Punto de entrada del proceso worker. Los eventos del run se reenvían
+    al servidor por `event_queue` para el progreso en vivo del dashboard.
+    """
+    from kipo.core.runner import run_pipeline
+
+    if event_queue is not None:
+        events.subscribe(event_queue.put)
+    run_pipeline(pipeline_name, job_id=job_id)
+
+
+class JobDispatcher:
+    """
+    Ejecuta los jobs encolados con concurrencia acotada, cada uno en un
+    proceso separado para que el servidor web siga respondiendo.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, poll_seconds: float = 1.0):
+        self.max_workers = max_workers or get_job_workers()
+        self.poll_seconds = poll_seconds
+        self._processes: Dict[int, multiprocessing.Process] = {}
+        self._cancelled: set = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Eventos publicados por los workers, re-publicados en el bus del servidor
+        self._events = None
+        self._forwarder: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        init_db()
+        self._recover()
+        self._events = _mp.Queue()
+        self._forwarder = threading.Thread(
+            target=self._forward_events, name="kipo-job-events", daemon=True)
+        self._forwarder.start()
+        self._thread = threading.Thread(
+            target=self._loop, name="kipo-dispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Detiene el dispatcher y termina los jobs en curso."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join()
+        if self._forwarder:
+            self._events.put(None)
+            self._forwarder.join()
+
+        with self._lock:
+            running = list(self._processes.items())
+            self._processes.clear()
+        for job_id, process in running:
+            process.terminate()
+            process.join()
+            _finish(job_id, JobStatus.FAILED, "Server stopped")
+            _fail_run(job_id, "Server stopped")
+
+    def notify(self) -> None:
+        """Despierta al dispatcher (job nuevo o cancelado)."""
+        self._wake.set()
+
+    def cancel(self, job_id: int) -> Optional[Job]:
+        """
+        Cancela un job: si está en cola no llega a correr; si está
+        corriendo se termina su proceso y su run queda FAILED.
+        """
+        with Session(get_engine()) as session:
+            session.exec(
+                update(Job).where(Job.id == job_id, Job.status == JobStatus.QUEUED)
+                .values(status=JobStatus.CANCELLED, finished_at=datetime.utcnow())
+            )
+            session.commit()
+
+        # Con el lock, el dispatcher no puede estar entre "reclamado" y "proceso registrado"
+        with self._lock:
+            process = self._processes.get(job_id)
+            if process is not None and process.is_alive():
+                self._cancelled.add(job_id)
+                process.terminate()
+            elif process is None:
+                job = get_job(job_id)
+                if job is not None and job.status == JobStatus.RUNNING and job.pid is None:
+                    # Reclamado pero sin proceso todavía: _loop no lo arranca
+                    self._cancelled.add(job_id)
+
+        self.notify()
+        return get_job(job_id)
+
+    def _forward_events(self) -> None:
+        while True:
+            event = self._events.get()
+            if event is None:
+                return
+            events.dispatch(event)
+
+    def _recover(self) -> None:
+        """Jobs RUNNING de un servidor anterior perdieron su proceso (y sus runs también)."""
+        error = "Worker lost (server restarted)"
+        with Session(get_engine()) as session:
+            lost = session.exec(select(Job.id).where(Job.status == JobStatus.RUNNING)).all()
+        for job_id in lost:
+            _fail_run(job_id, error)
+
+        with Session(get_engine()) as session:
+            session.exec(
+                update(Job).where(Job.status == JobStatus.RUNNING)
+                .values(status=JobStatus.FAILED, finished_at=datetime.utcnow(),
+                        error_message=error)
+            )
+            session.commit()
+
+    def _claim_next(self) -> Optional[Job]:
+        # expire_on_commit=False: el job reclamado se usa fuera de la sesión
+        with Session(get_engine(), expire_on_commit=False) as session:
+            candidates = session.exec(
+                select(Job).where(Job.status == JobStatus.QUEUED)
+                .order_by(desc(Job.priority), Job.created_at).limit(5)
+            ).all()
+            for job in candidates:
+                # UPDATE condicional: solo un dispatcher puede tomar el job
+                claimed = session.exec(
+                    update(Job).where(Job.id == job.id, Job.status == JobStatus.QUEUED)
+                    .values(status=JobStatus.RUNNING, started_at=datetime.utcnow())
+                )
+                session.commit()
+                if claimed.rowcount == 1:
+                    return job
+        return None
+
+    def _reap(self) -> None:
+        with self._lock:
+            finished = [(job_id, p) for job_id, p in self._processes.items()
+                        if not p.is_alive()]
+            for job_id, _ in finished:
+                del self._processes[job_id]
+
+        for job_id, process in finished:
+            if job_id in self._cancelled:
+                self._cancelled.discard(job_id)
+                _finish(job_id, JobStatus.CANCELLED, "Cancelled")
+                _fail_run(job_id, "Cancelled")
+            elif process.exitcode == 0:
+                _finish(job_id, JobStatus.SUCCESS)
+            else:
+                error = f"Worker exited with code {process.exitcode}"
+                _finish(job_id, JobStatus.FAILED, error)
+                # Crash, OOM kill o señal: el worker no llegó a cerrar su run
+                _fail_run(job_id, error)
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self._reap()
+                while len(self._processes) < self.max_workers:
+                    job = self._claim_next()
+                    if job is None:
+                        break
+                    # Arranque y registro bajo el lock: un cancel no se pierde entre ambos
+                    with self._lock:
+                        if job.id in self._cancelled:
+                            self._cancelled.discard(job.id)
+                            process = None
+                        else:
+                            process = _mp.Process(
+                                target=_job_main, args=(job.id, job.pipeline_name, self._events),
+                                name=f"kipo-job-{job.id}")
+                            process.start()
+                            self._processes[job.id] = process
+                    if process is None:
+                        _finish(job.id, JobStatus.CANCELLED, "Cancelled")
+                        continue
+                    with Session(get_engine()) as session:
+                        session.exec(update(Job).where(Job.id == job.id)
+                                     .values(pid=process.pid))
+                        session.commit()
+                    events.publish("job.started", job_id=job.id,
+                                   pipeline=job.pipeline_name, pid=process.pid)
+                    console.print(
+                        f"[bold blue]Job #{job.id} started:[/bold blue] {job.pipeline_name} (pid {process.pid})")
+            except Exception as e:
+                console.print(f"[bold red]Job dispatcher error:[/bold red] {e}")
+
+            self._wake.wait(self.poll_seconds)
+            self._wake.clear()
@@ -0,0 +1,125 @@
+import math
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, List, Optional, Sequence
+
+import polars as pl
+from kipo.core.context import KipoContext
+from kipo.core.definitions import DATA_SUFFIXES
+from kipo.core.db import save_step_runs
+from kipo.core.models import RunStatus, StepRun
+
+try:
+    import resource
+except ImportError:  # Windows: sin getrusage
+    resource = None
+
+# Métricas pendientes de guardar. Se escriben en lote al terminar el run
+# (o al llenarse el buffer) para no sumar un round-trip a SQLite por step.
+FLUSH_EVERY = 500
+
+_buffer: List[StepRun] = []
+_buffer_lock = threading.Lock()
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """
+    High-water mark de memoria residente del proceso completo (desde que
+    arrancó), no de un step: con steps en paralelo incluye a los demás.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KB, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def count_input_rows(args: Sequence[Any], kwargs: dict) -> Optional[int]:
+    """Filas de los DataFrame de entrada (los LazyFrame no se cuentan: costaría un scan)."""
+    frames = [v for v in list(args) + list(kwargs.values())
+              if isinstance(v, pl.DataFrame)]
+    if not frames:
+        return None
+    return sum(f.height for f in frames)
+
+
+def written_files(output: Path, since: float) -> List[Path]:
+    """Archivos de datos (Parquet o Arrow IPC) escritos desde `since` (epoch) en la ruta de salida."""
+    if output.is_file():
+        return [output]
+    if output.is_dir():
+        # Redondeo hacia abajo: hay filesystems con mtime al segundo
+        since = math.floor(since)
+        return [f for f in output.rglob("*") if f.suffix in DATA_SUFFIXES
+                and f.is_file() and f.stat().st_mtime >= since]
+    return []
+
+
+class StepTimer:
+    """
+    Mide wall time, CPU y memoria de un step y arma su StepRun.
+
+    El wall time es del step; CPU y memoria son del proceso. El trabajo de
+    Polars corre en su propio pool de threads, así que no se puede atribuir
+    CPU a un step con time.thread_time(): cpu_seconds es el CPU de todo el
+    proceso mientras el step corría (con el scheduler en paralelo suma el de
+    los steps simultáneos) y peak_rss_bytes el pico del proceso al terminar.
+    """
+
+    def __init__(self, step_name: str, layer: str):
+        self.step_name = step_name
+        self.layer = layer
+        self.start_time = datetime.utcnow()
+        self.start_epoch = time.time()
+        self._wall = time.perf_counter()
+        # CPU del proceso completo: incluye los threads de Polars y los
+        # demás steps que corran a la vez
+        self._cpu = time.process_time()
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._wall
+
+    def finish(self, status: str = RunStatus.SUCCESS, **fields: Any) -> Optional[StepRun]:
+        """Registra el step en el buffer si hay un run activo."""
+        step_run = self.build(status, **fields)
+        if step_run is not None:
+            record(step_run)
+        return step_run
+
+    def build(self, status: str = RunStatus.SUCCESS, **fields: Any) -> Optional[StepRun]:
+        """Arma el StepRun con los tiempos hasta ahora, sin registrarlo (None fuera de un run)."""
+        run_id = KipoContext.get_instance().run_id
+        if run_id is None:
+            return None
+
+        return StepRun(
+            run_id=run_id,
+            step_name=self.step_name,
+            layer=self.layer,
+            status=status,
+            start_time=self.start_time,
+            end_time=datetime.utcnow(),
+            wall_seconds=time.perf_counter() - self._wall,
+            cpu_seconds=time.process_time() - self._cpu,
+            peak_rss_bytes=peak_rss_bytes(),
+            **fields,
+        )
+
+
+def record(step_run: StepRun) -> None:
+    with _buffer_lock:
+        _buffer.append(step_run)
+        full = len(_buffer) >= FLUSH_EVERY
+    if full:
+        flush()
+
+
+def flush() -> None:
+    """Guarda las métricas pendientes en una sola transacción."""
+    with _buffer_lock:
+        pending = list(_buffer)
+        _buffer.clear()
+    save_step_runs(pending)
@@ -1,20 +1,82 @@
 from datetime import datetime
 from typing import Optional
+from sqlalchemy import Index, UniqueConstraint
 from sqlmodel import Field, SQLModel
-from enum import StrEnum
-
-
-class RunStatus(StrEnum):
-    RUNNING = "RUNNING"
-    SUCCESS = "SUCCESS"
-    FAILED = "FAILED"
+from kipo.core.definitions import JobStatus, RunStatus
 
 
 class PipelineRun(SQLModel, table=True):
+    # Historial ordenado por fecha, global y por pipeline
+    __table_args__ = (
+        Index("ix_pipelinerun_pipeline_start", "pipeline_name", "start_time"),
+        Index("ix_pipelinerun_status_start", "status", "start_time"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     pipeline_name: str
     status: str = Field(default=RunStatus.RUNNING)
-    start_time: datetime = Field(default_factory=datetime.utcnow)
+    start_time: datetime = Field(default_factory=datetime.utcnow, index=True)
     end_time: Optional[datetime] = None
     duration_seconds: Optional[float] = None
     error_message: Optional[str] = None
+
+
+class StepRun(SQLModel, table=True):
+    """Métricas de una ejecución de @step dentro de un PipelineRun."""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    run_id: Optional[int] = Field(
+        default=None, foreign_key="pipelinerun.id", index=True)
+    step_name: str
+    layer: str
+    status: str = Field(default=RunStatus.SUCCESS)
+    start_time: datetime = Field(default_factory=datetime.utcnow)
+    end_time: Optional[datetime] = None
+    wall_seconds: Optional[float] = None
+    # Del proceso, no del step: CPU consumido mientras el step corría (con
+    # steps en paralelo incluye los simultáneos) y pico de RSS al terminar
+    cpu_seconds: Optional[float] = None
+    peak_rss_bytes: Optional[int] = None
+    input_rows: Optional[int] = None
+    output_rows: Optional[int] = None
+    bytes_written: Optional[int] = None
+    cached: bool = False
+
+
+class Job(SQLModel, table=True):
+    """Ejecución de pipeline encolada desde el dashboard."""
+    __table_args__ = (
+        # El dispatcher toma el siguiente job por prioridad y antigüedad
+        Index("ix_job_status_priority", "status", "priority", "created_at"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    pipeline_name: str
+    priority: int = 0
+    status: str = Field(default=JobStatus.QUEUED)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    run_id: Optional[int] = Field(default=None, foreign_key="pipelinerun.id")
+    pid: Optional[int] = None
+    error_message: Optional[str] = None
+
+
+class Dataset(SQLModel, table=True):
+    """Entrada del catálogo: último estado escrito de un dataset."""
+    __table_args__ = (UniqueConstraint("layer", "name"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    layer: str
+    name: str
+    path: str
+    partition_by: Optional[str] = None
+    column_types: str = "{}"
+    row_count: int = 0
+    bytes: int = 0
+    file_count: int = 0
+    row_groups: int = 0
+    format: str = "parquet"
+    # Por columna: codec, bytes comprimidos, nulos, min y max de los footers
+    column_stats: Optional[str] = None
+    run_id: Optional[int] = Field(default=None, foreign_key="pipelinerun.id")
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,189 @@
+import os
+import struct
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional, Set
+
+# Lector mínimo del footer Parquet (FileMetaData, Thrift compact protocol).
+# Polars no expone los row groups ni sus estadísticas y pyarrow no es una
+# dependencia; leer solo el footer cuesta unos KB por archivo.
+
+MAGIC = b"PAR1"
+
+CODECS = ["UNCOMPRESSED", "SNAPPY", "GZIP", "LZO", "BROTLI", "LZ4", "ZSTD", "LZ4_RAW"]
+
+# Tipos físicos de Parquet -> formato struct de sus estadísticas (PLAIN)
+_PHYSICAL = {1: "<i", 2: "<q", 4: "<f", 5: "<d"}
+# INT32/INT64 de columnas sin signo (UInt8..UInt64)
+_UNSIGNED = {1: "<I", 2: "<Q"}
+BOOLEAN, BYTE_ARRAY = 0, 6
+
+# ConvertedType UINT_8..UINT_64 (esquemas sin LogicalType)
+_UNSIGNED_CONVERTED = {11, 12, 13, 14}
+
+
+class _Compact:
+    """Decodifica structs Thrift compact como {field_id: valor}."""
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.pos = 0
+
+    def _byte(self) -> int:
+        value = self.data[self.pos]
+        self.pos += 1
+        return value
+
+    def _varint(self) -> int:
+        result = shift = 0
+        while True:
+            byte = self._byte()
+            result |= (byte & 0x7F) << shift
+            if not byte & 0x80:
+                return result
+            shift += 7
+
+    def _zigzag(self) -> int:
+        n = self._varint()
+        return (n >> 1) ^ -(n & 1)
+
+    def _value(self, kind: int) -> Any:
+        if kind in (1, 2):            # BOOLEAN_TRUE / BOOLEAN_FALSE (en structs)
+            return kind == 1
+        if kind == 3:                 # BYTE
+            return struct.unpack("<b", bytes([self._byte()]))[0]
+        if kind in (4, 5, 6):         # I16 / I32 / I64
+            return self._zigzag()
+        if kind == 7:                 # DOUBLE
+            value = struct.unpack_from("<d", self.data, self.pos)[0]
+            self.pos += 8
+            return value
+        if kind == 8:                 # BINARY / STRING
+            size = self._varint()
+            value = self.data[self.pos:self.pos + size]
+            self.pos += size
+            return value
+        if kind in (9, 10):           # LIST / SET
+            header = self._byte()
+            size, elem = header >> 4, header & 0x0F
+            if size == 15:
+                size = self._varint()
+            if elem in (1, 2):
+                return [self._byte() == 1 for _ in range(size)]
+            return [self._value(elem) for _ in range(size)]
+        if kind == 11:                # MAP
+            size = self._varint()
+            if not size:
+                return {}
+            types = self._byte()
+            return {self._value(types >> 4): self._value(types & 0x0F) for _ in range(size)}
+        if kind == 12:                # STRUCT
+            return self.read_struct()
+        raise ValueError(f"Unsupported Thrift compact type {kind}")
+
+    def read_struct(self) -> Dict[int, Any]:
+        fields: Dict[int, Any] = {}
+        last_id = 0
+        while True:
+            header = self._byte()
+            if header == 0:           # STOP
+                return fields
+            delta, kind = header >> 4, header & 0x0F
+            field_id = last_id + delta if delta else self._zigzag()
+            fields[field_id] = self._value(kind)
+            last_id = field_id
+
+
+def _raw_footer(f: BinaryIO) -> bytes:
+    f.seek(0, os.SEEK_END)
+    size = f.tell()
+    if size < 12:
+        raise ValueError("File too small to be Parquet")
+    f.seek(size - 8)
+    length, magic = struct.unpack("<i4s", f.read(8))
+    if magic != MAGIC or length > size - 12:
+        raise ValueError("Not a Parquet file (bad footer)")
+    f.seek(size - 8 - length)
+    return f.read(length)
+
+
+def _unsigned_columns(schema: List[Dict[int, Any]]) -> Set[str]:
+    """
+    Columnas hoja (ruta con puntos) de enteros sin signo. El esquema es un
+    árbol aplanado en preorden: cada grupo indica cuántos hijos le siguen.
+    """
+    unsigned: Set[str] = set()
+    pos = 1
+
+    def walk(prefix: List[str], children: int) -> None:
+        nonlocal pos
+        for _ in range(children):
+            element = schema[pos]
+            pos += 1
+            path = prefix + [element.get(4, b"").decode()]
+            if element.get(5):
+                walk(path, element[5])
+                continue
+            integer = element.get(10, {}).get(10, {})
+            if element.get(6) in _UNSIGNED_CONVERTED or integer.get(2) is False:
+                unsigned.add(".".join(path))
+
+    if schema:
+        walk([], schema[0].get(5, 0))
+    return unsigned
+
+
+def _decode_stat(raw: Optional[bytes], physical: int, unsigned: bool = False) -> Any:
+    if raw is None:
+        return None
+    if physical in _PHYSICAL:
+        fmt = _UNSIGNED[physical] if unsigned and physical in _UNSIGNED else _PHYSICAL[physical]
+        if len(raw) == struct.calcsize(fmt):
+            return struct.unpack(fmt, raw)[0]
+        return None
+    if physical == BOOLEAN and raw:
+        return bool(raw[0])
+    if physical == BYTE_ARRAY:
+        return raw.decode("utf-8", errors="replace")
+    return None
+
+
+def read_footer(path: Path) -> Dict[str, Any]:
+    """
+    Metadata de un archivo Parquet sin leer sus datos: filas, row groups y,
+    por columna de cada row group, codec, tamaño comprimido, nulos y min/max
+    (valores físicos: fechas como días, timestamps como enteros; los enteros
+    sin signo se decodifican como tales).
+    """
+    with open(path, "rb") as f:
+        meta = _Compact(_raw_footer(f)).read_struct()
+    unsigned = _unsigned_columns(meta.get(2, []))
+
+    row_groups: List[Dict[str, Any]] = []
+    for group in meta.get(4, []):
+        columns = {}
+        for chunk in group.get(1, []):
+            info = chunk.get(3, {})
+            physical = info.get(1)
+            name = ".".join(p.decode() for p in info.get(3, []))
+            stats = info.get(12, {})
+            codec = info.get(4)
+            columns[name] = {
+                "codec": CODECS[codec] if codec is not None and codec < len(CODECS) else codec,
+                "compressed_bytes": info.get(7),
+                "null_count": stats.get(3),
+                # min_value/max_value (5/6) reemplazan a los min/max (1/2) obsoletos
+                "min": _decode_stat(stats.get(6, stats.get(2)), physical, name in unsigned),
+                "max": _decode_stat(stats.get(5, stats.get(1)), physical, name in unsigned),
+            }
+        row_groups.append({
+            "num_rows": group.get(3),
+            "total_byte_size": group.get(2),
+            "columns": columns,
+        })
+
+    created_by = meta.get(6)
+    return {
+        "num_rows": meta.get(3, 0),
+        "row_groups": row_groups,
+        "created_by": created_by.decode(errors="replace") if created_by else None,
+    }
@@ -0,0 +1,172 @@
+import cProfile
+import json
+import os
+import pstats
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import polars as pl
+from kipo.core import metrics
+
+# Perfiles de steps, junto a la metadata del proyecto:
+# <run_id>/<step>.prof (cProfile), <step>.plan.txt (plan de Polars) y
+# <step>.json (resumen: tiempos, memoria, archivos)
+def profiles_dir() -> Path:
+    """Directorio de perfiles del proyecto actual (se resuelve en cada uso, no al importar)."""
+    return Path.cwd() / ".kipo" / "profiles"
+
+
+def __getattr__(name: str) -> Any:
+    # Compatibilidad: PROFILES_DIR ya no se calcula al importar el módulo
+    if name == "PROFILES_DIR":
+        return profiles_dir()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Ruido del propio profiler en la lista de hotspots
+_IGNORED = ("_lsprof.Profiler", "cProfile.py")
+
+
+def run_dir(run_id: Optional[int]) -> Path:
+    """Directorio de perfiles de un run. Fuera de `kipo run` se usa uno por proceso."""
+    return profiles_dir() / (str(run_id) if run_id is not None else f"adhoc-{os.getpid()}")
+
+
+# Desde Python 3.12 solo puede haber un cProfile activo por proceso
+_active = threading.Lock()
+
+
+class StepProfiler:
+    """
+    Perfila un step con cProfile y registra el high-water mark de memoria
+    del proceso y el plan de Polars del resultado. Si otro step (o una
+    herramienta externa) ya está perfilando, se guardan solo memoria y plan.
+    """
+
+    def __init__(self, step_name: str, run_id: Optional[int]):
+        self.step_name = step_name
+        self.directory = run_dir(run_id)
+        self.plan: Optional[str] = None
+        self._rss_before = metrics.peak_rss_bytes()
+        self._wall = time.perf_counter()
+        self._profiler: Optional[cProfile.Profile] = None
+        self.summary_file: Optional[Path] = None
+
+        if _active.acquire(blocking=False):
+            self._profiler = cProfile.Profile()
+            try:
+                self._profiler.enable()
+            except ValueError:
+                self._profiler = None
+                _active.release()
+
+    def capture_plan(self, result: Any) -> None:
+        """Guarda el plan optimizado si el step devolvió un LazyFrame (antes de escribirlo)."""
+        if not isinstance(result, pl.LazyFrame):
+            return
+        if self._profiler:
+            self._profiler.disable()
+        try:
+            self.plan = result.explain()
+        except Exception as e:
+            self.plan = f"Could not explain the query plan: {e}"
+        finally:
+            if self._profiler:
+                self._profiler.enable()
+
+    def finish(self, status: str) -> Path:
+        """Detiene el profiler y escribe los artefactos. Devuelve el resumen JSON."""
+        if self.summary_file is not None:
+            return self.summary_file
+        if self._profiler:
+            self._profiler.disable()
+            _active.release()
+        wall = time.perf_counter() - self._wall
+        rss_after = metrics.peak_rss_bytes()
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        prof_file = None
+        if self._profiler:
+            prof_file = self.directory / f"{self.step_name}.prof"
+            self._profiler.dump_stats(prof_file)
+
+        summary = {
+            "step": self.step_name,
+            "status": status,
+            "wall_seconds": wall,
+            "peak_rss_bytes": rss_after,
+            # Cuánto subió el high-water mark durante el step (0 si no lo superó)
+            "peak_rss_growth_bytes": (rss_after - self._rss_before)
+            if rss_after is not None and self._rss_before is not None else None,
+            "profile_file": prof_file.name if prof_file else None,
+            "plan_file": None,
+        }
+        if self.plan is not None:
+            plan_file = self.directory / f"{self.step_name}.plan.txt"
+            plan_file.write_text(self.plan, encoding="utf-8")
+            summary["plan_file"] = plan_file.name
+
+        self.summary_file = self.directory / f"{self.step_name}.json"
+        self.summary_file.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+        return self.summary_file
+
+
+def hotspots(prof_file: Path, sort: str = "tottime", limit: int = 15) -> List[Dict[str, Any]]:
+    """
+    Funciones más costosas de un perfil. `sort`: "tottime" (tiempo propio)
+    o "cumtime" (incluye lo que llaman).
+    """
+    stats = pstats.Stats(str(prof_file))
+    rows = []
+    for (filename, line, func), (_, calls, tottime, cumtime, _) in stats.stats.items():
+        # Las funciones de C (incluidas las de Polars) no tienen archivo: "~"
+        location = "built-in" if filename == "~" else f"{filename}:{line}"
+        if any(ignored in location or ignored in func for ignored in _IGNORED):
+            continue
+        rows.append({
+            "function": func,
+            "location": _short_path(location),
+            "calls": calls,
+            "tottime": tottime,
+            "cumtime": cumtime,
+        })
+
+    rows.sort(key=lambda r: r[sort], reverse=True)
+    return rows[:limit]
+
+
+def _short_path(location: str) -> str:
+    # .../site-packages/polars/... -> polars/...; rutas del proyecto relativas al cwd
+    marker = "site-packages" + os.sep
+    if marker in location:
+        return location.split(marker, 1)[1]
+    try:
+        return str(Path(location).relative_to(Path.cwd()))
+    except ValueError:
+        return location
+
+
+def load_run(run_id: Union[int, str], sort: str = "tottime",
+             limit: int = 15) -> List[Dict[str, Any]]:
+    """
+    Perfiles guardados de un run, uno por step en orden de ejecución:
+    resumen + hotspots + plan de Polars (si lo hay).
+    """
+    directory = profiles_dir() / str(run_id)
+    if not directory.is_dir():
+        return []
+
+    profiles = []
+    summaries = sorted(directory.glob("*.json"), key=lambda f: f.stat().st_mtime)
+    for summary_file in summaries:
+        summary = json.loads(summary_file.read_text(encoding="utf-8"))
+        summary["hotspots"] = []
+        if summary.get("profile_file"):
+            summary["hotspots"] = hotspots(directory / summary["profile_file"], sort, limit)
+        summary["plan"] = None
+        if summary.get("plan_file"):
+            summary["plan"] = (directory / summary["plan_file"]).read_text(encoding="utf-8")
+        profiles.append(summary)
+    return profiles
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+from kipo.core.config import get_raw_cache_config
+
+if TYPE_CHECKING:
+    # Solo cached_read usa Polars: `kipo cache info/clear` no lo importan
+    import polars as pl
+
+# Copias Parquet de los archivos crudos, junto a la metadata del proyecto.
+# Cada entrada: <hash ruta>-<hash clave>.parquet + .json con su descripción.
+def cache_dir() -> Path:
+    """Directorio del caché del proyecto actual (se resuelve en cada uso, no al importar)."""
+    return Path.cwd() / ".kipo" / "raw_cache"
+
+
+def __getattr__(name: str) -> Any:
+    # Compatibilidad: CACHE_DIR ya no se calcula al importar el módulo
+    if name == "CACHE_DIR":
+        return cache_dir()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# read_raw_many llena el caché desde varios threads: el reemplazo de
+# versiones viejas y el desalojo se hacen de a uno
+_lock = threading.Lock()
+
+
+def _source_id(source: Path, variant: str = "") -> str:
+    identity = str(source.resolve()) + (f"|{variant}" if variant else "")
+    return hashlib.sha256(identity.encode()).hexdigest()[:16]
+
+
+def _content_hash(source: Path) -> str:
+    digest = hashlib.sha256()
+    with open(source, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _entry_key(source: Path, hash_content: bool) -> str:
+    """Clave de la entrada: ruta, tamaño, mtime y opcionalmente el contenido."""
+    stat = source.stat()
+    key = f"{source.resolve()}|{stat.st_size}|{stat.st_mtime_ns}"
+    if hash_content:
+        key += f"|{_content_hash(source)}"
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+def entries() -> List[Dict[str, Any]]:
+    """Lista las entradas del caché con su metadata, la más reciente primero."""
+    directory = cache_dir()
+    if not directory.exists():
+        return []
+
+    result = []
+    for meta_file in directory.glob("*.json"):
+        data_file = meta_file.with_suffix(".parquet")
+        if not data_file.exists():
+            continue
+        try:
+            meta = json.loads(meta_file.read_text(encoding="utf-8"))
+            stat = data_file.stat()
+        except (OSError, ValueError):
+            continue
+        meta.update(path=data_file, bytes=stat.st_size, last_used=stat.st_mtime)
+        result.append(meta)
+
+    return sorted(result, key=lambda e: e["last_used"], reverse=True)
+
+
+def _remove(data_file: Path) -> None:
+    data_file.unlink(missing_ok=True)
+    data_file.with_suffix(".json").unlink(missing_ok=True)
+
+
+def evict(max_bytes: int) -> int:
+    """Desaloja las entradas menos usadas hasta quedar bajo `max_bytes`."""
+    current = entries()
+    total = sum(e["bytes"] for e in current)
+    removed = 0
+    while current and total > max_bytes:
+        oldest = current.pop()
+        _remove(oldest["path"])
+        total -= oldest["bytes"]
+        removed += 1
+    return removed
+
+
+def clear() -> int:
+    """Elimina todas las entradas. Devuelve cuántas se eliminaron."""
+    current = entries()
+    for entry in current:
+        _remove(entry["path"])
+    return len(current)
+
+
+def cached_read(source: Path, parse: Callable[[Path], "pl.DataFrame"],
+                variant: str = "") -> Optional["pl.DataFrame"]:
+    """
+    Devuelve el contenido de `source` desde su copia Parquet si está vigente.
+    Si no lo está, parsea con `parse`, guarda la copia y desaloja si hace falta.
+    Devuelve None si el caché está desactivado (el llamador parsea directo).
+
+    `variant` distingue lecturas distintas del mismo archivo (p. ej. qué
+    hojas de un Excel): cada una tiene su propia entrada.
+    """
+    import polars as pl
+
+    settings = get_raw_cache_config()
+    if not settings["enabled"]:
+        return None
+
+    directory = cache_dir()
+    source_id = _source_id(source, variant)
+    data_file = directory / f"{source_id}-{_entry_key(source, settings['hash_content'])}.parquet"
+
+    if data_file.exists():
+        # Marcamos el uso para la política LRU
+        os.utime(data_file)
+        return pl.read_parquet(data_file)
+
+    df = parse(source)
+
+    directory.mkdir(parents=True, exist_ok=True)
+    # Temporal único: otro proceso puede estar convirtiendo el mismo archivo
+    tmp_file = data_file.with_name(f".{data_file.name}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        df.write_parquet(tmp_file)
+
+        with _lock:
+            # Versiones anteriores del mismo archivo ya no sirven
+            for stale in directory.glob(f"{source_id}-*.parquet"):
+                _remove(stale)
+
+            os.replace(tmp_file, data_file)
+            data_file.with_suffix(".json").write_text(json.dumps({
+                "source": str(source.resolve()),
+                "variant": variant or None,
+                "created": time.time(),
+                "rows": df.height,
+            }), encoding="utf-8")
+
+            evict(settings["max_bytes"])
+    finally:
+        tmp_file.unlink(missing_ok=True)
+    return df
@@ -0,0 +1,124 @@
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import polars as pl
+from kipo.core.config import get_read_cache_config
+from kipo.core.definitions import DATA_SUFFIXES
+
+# Caché en memoria de io.read: DataFrames ya decodificados, por ruta del
+# dataset + filtros, validados contra mtime/tamaño de sus archivos. LRU
+# acotado por el tamaño Arrow estimado de los frames ([cache] read_max_mb).
+
+Key = Tuple[str, Tuple[Tuple[str, str], ...]]
+Stamp = Tuple[Tuple[str, int, int], ...]
+
+_entries: "OrderedDict[Key, Tuple[Stamp, pl.DataFrame, int]]" = OrderedDict()
+_lock = threading.Lock()
+_bytes = 0
+_counters = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+
+def _stamp(target: Path) -> Optional[Stamp]:
+    """mtime y tamaño de los archivos del dataset; None si no existe."""
+    try:
+        if target.is_file():
+            stat = target.stat()
+            return ((target.name, stat.st_mtime_ns, stat.st_size),)
+        files = []
+        for root, _, names in os.walk(target):
+            for file_name in names:
+                if file_name.endswith(DATA_SUFFIXES) and not file_name.startswith("."):
+                    stat = os.stat(os.path.join(root, file_name))
+                    files.append((os.path.join(root, file_name), stat.st_mtime_ns, stat.st_size))
+    except FileNotFoundError:
+        return None
+    return tuple(sorted(files)) or None
+
+
+def _key(target: Path, filters: Optional[Dict[str, Any]]) -> Key:
+    normalized = tuple(sorted((column, repr(value)) for column, value in (filters or {}).items()))
+    return str(target.resolve()), normalized
+
+
+def _drop(key: Key) -> None:
+    global _bytes
+    _, _, size = _entries.pop(key)
+    _bytes -= size
+
+
+def get_or_load(target: Path, filters: Optional[Dict[str, Any]],
+                loader: Callable[[], pl.DataFrame]) -> pl.DataFrame:
+    """
+    Devuelve el frame cacheado si los archivos de `target` no cambiaron;
+    si no, lo carga con `loader` y lo guarda. Cada llamada recibe su propia
+    copia (clone es barato: comparte los buffers Arrow).
+    """
+    global _bytes
+
+    settings = get_read_cache_config()
+    if not settings["enabled"]:
+        return loader()
+
+    # El sello se toma antes de leer: una escritura concurrente invalida la entrada
+    stamp = _stamp(target)
+    if stamp is None:
+        return loader()
+    key = _key(target, filters)
+
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None and entry[0] == stamp:
+            _entries.move_to_end(key)
+            _counters["hits"] += 1
+            return entry[1].clone()
+        if entry is not None:
+            _drop(key)
+        _counters["misses"] += 1
+
+    df = loader()
+    size = df.estimated_size()
+    if size > settings["max_bytes"]:
+        return df
+
+    with _lock:
+        if key in _entries:
+            _drop(key)
+        _entries[key] = (stamp, df, size)
+        _bytes += size
+        while _bytes > settings["max_bytes"]:
+            _drop(next(iter(_entries)))
+            _counters["evictions"] += 1
+    return df.clone()
+
+
+def invalidate(target: Path) -> int:
+    """Descarta las entradas de un dataset (con cualquier filtro). Devuelve cuántas."""
+    path = str(target.resolve())
+    with _lock:
+        stale = [key for key in _entries if key[0] == path]
+        for key in stale:
+            _drop(key)
+        _counters["invalidations"] += len(stale)
+    return len(stale)
+
+
+def clear() -> int:
+    """Vacía el caché y reinicia los contadores. Devuelve cuántas entradas había."""
+    global _bytes
+    with _lock:
+        removed = len(_entries)
+        _entries.clear()
+        _bytes = 0
+        for name in _counters:
+            _counters[name] = 0
+    return removed
+
+
+def stats() -> Dict[str, int]:
+    """Contadores del proceso actual: hits, misses, evictions, invalidations, entries, bytes."""
+    with _lock:
+        return {**_counters, "entries": len(_entries), "bytes": _bytes,
+                "max_bytes": get_read_cache_config()["max_bytes"]}
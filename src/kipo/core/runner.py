@@ -1,7 +1,10 @@
 import runpy
 import time
 from pathlib import Path
+from typing import Optional
 from rich.console import Console
+from kipo.core import compaction, events, jobs, metrics, profiling, read_cache, scheduler, writers
+from kipo.core.context import KipoContext
 from kipo.core.db import create_run, update_run_status
 from kipo.core.models import RunStatus
 
@@ -9,12 +12,26 @@ from kipo.core.models import RunStatus
 console = Console()
 
 
-def run_pipeline(pipeline_name: str):
+def _report_read_cache(before: dict) -> None:
+    after = read_cache.stats()
+    hits = after["hits"] - before["hits"]
+    misses = after["misses"] - before["misses"]
+    if hits or misses:
+        console.print(
+            f"[dim]Read cache: {hits} hit(s), {misses} miss(es), "
+            f"{after['evictions'] - before['evictions']} eviction(s)[/dim]")
+
+
+def run_pipeline(pipeline_name: str, use_cache: bool = True, job_id: Optional[int] = None,
+                 profile: bool = False):
     """
     Locates and executes a pipeline script from the user's `pipelines/` directory.
 
     Args:
         pipeline_name: Name of the pipeline file (with or without .py extension).
+        use_cache: If False, steps ignore their recorded fingerprints and recompute.
+        job_id: Dashboard job that launched this run, linked to the run record.
+        profile: If True, every step saves a profile under .kipo/profiles/<run_id>/.
     """
     # 1. Resolver ruta base (CWD del usuario)
     cwd = Path.cwd()
@@ -37,28 +54,70 @@ def run_pipeline(pipeline_name: str):
     console.print(
         f"[bold blue]Launching Pipeline:[/bold blue] {pipeline_name}")
 
+    context = KipoContext.get_instance()
+    context.use_cache = use_cache
+    context.profile = profile
+
     # --- METADATA STORE START ---
     run_record = create_run(pipeline_name)
+    context.run_id = run_record.id
+    if job_id is not None:
+        jobs.attach_run(job_id, run_record.id)
     # ----------------------------
+    events.publish("run.started", run_id=run_record.id, pipeline=pipeline_name,
+                   start_time=run_record.start_time.isoformat(), job_id=job_id)
+
+    read_stats = read_cache.stats()
 
     try:
         start_time = time.perf_counter()
         # runpy.run_path ejecuta el script como si se llamara con `python script.py`
         # run_name="__main__" activa el bloque `if __name__ == "__main__":`
+        scheduler.reset()
         runpy.run_path(str(pipeline_path), run_name="__main__")
 
+        # Pipelines que solo declaran steps (sin llamarlos) se ejecutan como DAG
+        if scheduler.has_pending_steps():
+            # Perfilando, los steps corren de a uno: cProfile admite un solo
+            # perfil activo y el paralelismo mezclaría los tiempos
+            scheduler.run_dag(max_workers=1 if profile else None)
+
+        # Las escrituras async (en disco, con fsync) terminan antes de cerrar
+        # el run; un fallo lo marca FAILED. Recién entonces, sin steps leyendo
+        # los fragmentos, se compactan los datasets append/upsert
+        writers.wait_all()
+        compaction.run_pending_compactions()
+
         duration = time.perf_counter() - start_time
 
         # --- SUCCESS UPDATE ---
+        metrics.flush()
         update_run_status(run_record.id, RunStatus.SUCCESS)
+        events.publish("run.finished", run_id=run_record.id, pipeline=pipeline_name,
+                       status=RunStatus.SUCCESS, duration_seconds=duration)
         console.print(
             f"\n[bold green]Pipeline Execution Completed[/bold green] in {duration:.2f}s")
+        _report_read_cache(read_stats)
+        if profile:
+            console.print(
+                f"[dim]Profiles saved to: {profiling.run_dir(run_record.id)} (kipo profile {run_record.id})[/dim]")
 
     except Exception as e:
+        writers.wait_all(raise_errors=False)
+        compaction.run_pending_compactions()
+
         # --- FAILURE UPDATE ---
+        metrics.flush()
         update_run_status(run_record.id, RunStatus.FAILED,
                           error_message=str(e))
+        events.publish("run.finished", run_id=run_record.id, pipeline=pipeline_name,
+                       status=RunStatus.FAILED, error=str(e),
+                       duration_seconds=time.perf_counter() - start_time)
         console.print(f"\n[bold red]Pipeline Crashed:[/bold red] {e}")
 
         # Re-raise para que Typer pueda manejar el código de salida si es necesario
         raise e
+
+    finally:
+        context.run_id = None
+        context.profile = False
@@ -0,0 +1,160 @@
+import inspect
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from rich.console import Console
+from kipo.core.config import get_max_workers
+
+
+console = Console()
+
+
+@dataclass
+class StepNode:
+    """Un step registrado en el DAG del pipeline actual."""
+    name: str
+    func: Callable[..., Any]
+    depends_on: List[str] = field(default_factory=list)
+    called: bool = False
+
+
+# Registro de steps declarados por el pipeline en ejecución.
+# Clave: nombre sanitizado del step (y alias por nombre de función).
+_registry: Dict[str, StepNode] = {}
+_aliases: Dict[str, str] = {}
+
+
+def reset() -> None:
+    """Limpia el registro. El runner lo llama antes de cargar cada pipeline."""
+    _registry.clear()
+    _aliases.clear()
+
+
+def register(name: str, func: Callable[..., Any], depends_on: Sequence[str] = ()) -> StepNode:
+    """
+    Registra un step en el DAG. `func` es el wrapper del decorador;
+    `depends_on` lista dependencias explícitas (nombres de step o de función).
+    """
+    node = StepNode(name=name, func=func, depends_on=list(depends_on))
+    _registry[name] = node
+    _aliases[getattr(func, "__name__", name)] = name
+    return node
+
+
+def mark_called(name: str) -> None:
+    if name in _registry:
+        _registry[name].called = True
+
+
+def has_pending_steps() -> bool:
+    """True si el pipeline declaró steps pero no ejecutó ninguno por su cuenta."""
+    return bool(_registry) and not any(node.called for node in _registry.values())
+
+
+def _resolve(name: str) -> Optional[str]:
+    clean = name.strip().lower().replace(" ", "_")
+    if clean in _registry:
+        return clean
+    return _aliases.get(name)
+
+
+def _plan(node: StepNode) -> Dict[str, Any]:
+    """
+    Calcula dependencias y cómo se inyectan sus resultados:
+    - Parámetros cuyo nombre coincide con un step upstream reciben su resultado.
+    - Dependencias explícitas restantes se asignan en orden a los parámetros libres.
+    """
+    params = list(inspect.signature(node.func).parameters.values())
+    by_param: Dict[str, str] = {}
+
+    for param in params:
+        upstream = _resolve(param.name)
+        if upstream is not None and upstream != node.name:
+            by_param[param.name] = upstream
+
+    explicit = []
+    for dep in node.depends_on:
+        upstream = _resolve(dep)
+        if upstream is None:
+            raise ValueError(
+                f"Step '{node.name}' depends on unknown step '{dep}'")
+        explicit.append(upstream)
+
+    free_params = [
+        p.name for p in params
+        if p.name not in by_param
+        and p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD)
+    ]
+    for param_name, upstream in zip(free_params, [d for d in explicit if d not in by_param.values()]):
+        by_param[param_name] = upstream
+
+    deps = set(by_param.values()) | set(explicit)
+    return {"deps": deps, "args": by_param}
+
+
+def run_dag(max_workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Ejecuta los steps registrados respetando sus dependencias.
+    Las ramas independientes corren en paralelo en un pool de threads
+    (Polars libera el GIL). Devuelve los resultados por nombre de step.
+
+    Args:
+        max_workers: Concurrencia máxima. Por defecto `[runner] max_workers`
+            de kipo_config.toml.
+    """
+    if max_workers is None:
+        max_workers = get_max_workers()
+
+    plans = {name: _plan(node) for name, node in _registry.items()}
+    remaining = {name: set(plan["deps"]) for name, plan in plans.items()}
+    dependents: Dict[str, List[str]] = {name: [] for name in plans}
+    for name, plan in plans.items():
+        for dep in plan["deps"]:
+            dependents[dep].append(name)
+
+    results: Dict[str, Any] = {}
+    ready = [name for name, deps in remaining.items() if not deps]
+    if plans and not ready:
+        raise ValueError("Pipeline steps form a dependency cycle")
+
+    console.print(
+        f"[dim]Scheduling {len(plans)} step(s) with up to {max_workers} worker(s)[/dim]")
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="kipo-step") as pool:
+        running: Dict[Future, str] = {}
+        error: Optional[BaseException] = None
+
+        def submit(name: str) -> None:
+            kwargs = {param: results[dep]
+                      for param, dep in plans[name]["args"].items()}
+            running[pool.submit(_registry[name].func, **kwargs)] = name
+
+        for name in ready:
+            submit(name)
+
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    # No lanzamos nuevos steps; esperamos a los que ya corren
+                    error = error or e
+                    continue
+
+                if error is not None:
+                    continue
+                for child in dependents[name]:
+                    remaining[child].discard(name)
+                    if not remaining[child]:
+                        submit(child)
+
+        if error is not None:
+            raise error
+
+    if len(results) != len(plans):
+        raise ValueError("Pipeline steps form a dependency cycle")
+
+    return results
@@ -0,0 +1,198 @@
+import json
+import os
+import shutil
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from kipo.core.config import get_base_dir, get_versions_config
+
+# Versiones de datasets: tras cada escritura dentro de un run, el estado del
+# dataset queda en data/.versions/<layer>/<name>/<run_id>/ como hard links a
+# sus archivos. Kipo nunca modifica un archivo en su lugar (escribe un
+# temporal y lo renombra), así que un link conserva el contenido anterior y
+# los archivos que no cambian entre versiones se comparten sin copiarse.
+# Cada versión refleja el layer: <name>.parquet / <name>.arrow o <name>/.
+
+VERSIONS_DIR = ".versions"
+MANIFEST = "manifest.json"
+
+# Un temporal de snapshot más viejo que esto quedó de una escritura interrumpida
+STALE_SECONDS = 3600
+
+AsOf = Union[datetime, date, str]
+
+
+def store_dir(dataset_dir: Path) -> Path:
+    """Versiones de un dataset: data/silver/ventas -> data/.versions/silver/ventas/"""
+    base = get_base_dir()
+    return base / VERSIONS_DIR / dataset_dir.relative_to(base)
+
+
+def _link(source: Path, target: Path) -> None:
+    target.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(source, target)
+    except OSError:
+        # Sistemas de archivos sin hard links: copia completa
+        shutil.copy2(source, target)
+
+
+def snapshot(dataset_dir: Path, files: Sequence[Path], run_id: int) -> Optional[Path]:
+    """
+    Registra los archivos actuales del dataset como la versión del run
+    `run_id` (si el run ya escribió el dataset, la reemplaza) y aplica la
+    retención. Devuelve el directorio de la versión, o None si el
+    versionado está desactivado.
+    """
+    settings = get_versions_config()
+    if not settings["enabled"]:
+        return None
+
+    layer_dir = dataset_dir.parent
+    store = store_dir(dataset_dir)
+    target = store / str(run_id)
+    tmp_dir = store / f".{run_id}-{uuid.uuid4().hex[:8]}.tmp"
+    try:
+        for file in files:
+            _link(file, tmp_dir / file.relative_to(layer_dir))
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        (tmp_dir / MANIFEST).write_text(json.dumps({
+            "run_id": run_id,
+            "created": datetime.utcnow().isoformat(timespec="microseconds"),
+            "files": len(files),
+            "bytes": sum(f.stat().st_size for f in files),
+        }, indent=2), encoding="utf-8")
+
+        # Reemplazo: la versión anterior del mismo run se aparta y se borra
+        old = None
+        if target.exists():
+            old = store / f".{run_id}-{uuid.uuid4().hex[:8]}.old"
+            os.replace(target, old)
+        os.replace(tmp_dir, target)
+        if old is not None:
+            shutil.rmtree(old, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    prune(dataset_dir, settings["keep"], settings["keep_days"])
+    return target
+
+
+def list_versions(dataset_dir: Path) -> List[Dict[str, Any]]:
+    """Versiones de un dataset (run_id, created, files, bytes, path), de la más antigua a la más nueva."""
+    store = store_dir(dataset_dir)
+    if not store.is_dir():
+        return []
+
+    found = []
+    for child in store.iterdir():
+        if not child.name.isdigit():
+            continue
+        try:
+            manifest = json.loads((child / MANIFEST).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        manifest["created"] = datetime.fromisoformat(manifest["created"])
+        manifest["path"] = child
+        found.append(manifest)
+    found.sort(key=lambda v: (v["created"], v["run_id"]))
+    return found
+
+
+def _to_utc(as_of: AsOf) -> datetime:
+    """Momento en UTC naive (como se guardan); fechas y horas sin zona son hora local."""
+    if isinstance(as_of, str):
+        try:
+            as_of = datetime.fromisoformat(as_of.strip())
+        except ValueError:
+            raise ValueError(
+                f"Invalid as_of value {as_of!r}: use an ISO date or datetime") from None
+    if not isinstance(as_of, datetime):
+        # Una fecha sola incluye todo ese día
+        as_of = datetime.combine(as_of, datetime.max.time())
+    if as_of.tzinfo is None:
+        as_of = as_of.astimezone()
+    return as_of.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def resolve(dataset_dir: Path, version: Optional[int] = None,
+            as_of: Optional[AsOf] = None) -> Path:
+    """
+    Directorio de una versión: la escrita por el run `version`, o la última
+    escrita hasta `as_of`. Lanza FileNotFoundError si no existe.
+    """
+    if version is not None and as_of is not None:
+        raise ValueError("Pass either version or as_of, not both")
+
+    if version is not None:
+        path = store_dir(dataset_dir) / str(int(version))
+        if not (path / MANIFEST).exists():
+            raise FileNotFoundError(
+                f"No version {version} of dataset {dataset_dir} (see `kipo versions list`)")
+        return path
+
+    moment = _to_utc(as_of)
+    candidates = [v for v in list_versions(dataset_dir) if v["created"] <= moment]
+    if not candidates:
+        raise FileNotFoundError(
+            f"No version of dataset {dataset_dir} was written up to {moment.isoformat()} UTC")
+    return candidates[-1]["path"]
+
+
+def prune(dataset_dir: Path, keep: int, keep_days: int = 0) -> List[int]:
+    """
+    Retención: borra las versiones que no están entre las `keep` más nuevas
+    (0 = sin límite) o que tienen más de `keep_days` días (0 = sin límite).
+    La más nueva siempre se conserva. Devuelve los run_id borrados.
+    """
+    current = list_versions(dataset_dir)
+    oldest = datetime.utcnow() - timedelta(days=keep_days) if keep_days > 0 else None
+
+    removed = []
+    for index, version in enumerate(reversed(current)):
+        if index == 0:
+            continue
+        if (keep > 0 and index >= keep) or (oldest is not None and version["created"] < oldest):
+            # Los archivos se liberan cuando ninguna versión ni el dataset los enlaza
+            shutil.rmtree(version["path"], ignore_errors=True)
+            removed.append(version["run_id"])
+    return removed
+
+
+def datasets() -> List[Path]:
+    """Directorio (en su layer) de cada dataset con versiones guardadas."""
+    base = get_base_dir()
+    root = base / VERSIONS_DIR
+    if not root.is_dir():
+        return []
+    found = []
+    for layer_dir in sorted(p for p in root.iterdir() if p.is_dir()):
+        for store in sorted(p for p in layer_dir.iterdir() if p.is_dir()):
+            found.append(base / layer_dir.name / store.name)
+    return found
+
+
+def gc(keep: Optional[int] = None, keep_days: Optional[int] = None) -> Dict[str, List[int]]:
+    """
+    Aplica la retención a todos los datasets versionados (por defecto la de
+    [versions] en kipo_config.toml). Devuelve los run_id borrados por dataset.
+    """
+    settings = get_versions_config()
+    keep = settings["keep"] if keep is None else keep
+    keep_days = settings["keep_days"] if keep_days is None else keep_days
+
+    removed = {}
+    for dataset_dir in datasets():
+        pruned = prune(dataset_dir, keep, keep_days)
+        if pruned:
+            removed[str(dataset_dir.relative_to(get_base_dir()))] = pruned
+
+        # Restos de snapshots interrumpidos (no los de una escritura en curso)
+        now = datetime.now().timestamp()
+        for leftover in store_dir(dataset_dir).glob(".*"):
+            if now - leftover.stat().st_mtime > STALE_SECONDS:
+                shutil.rmtree(leftover, ignore_errors=True)
+    return removed
@@ -0,0 +1,339 @@
+import hashlib
+import importlib
+import json
+import os
+import signal
+import socket
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from kipo import __version__
+
+# Daemon "fork server" por proyecto: importa una vez polars, sqlmodel y la
+# base de metadata, y atiende cada `kipo run` en un hijo creado con fork().
+# El cliente le pasa sus stdin/stdout/stderr por el socket (SCM_RIGHTS): la
+# salida del run va directo a la terminal o al log de quien lo lanzó, y el
+# código de salida vuelve como mensaje. Este módulo solo importa la librería
+# estándar: el lado cliente debe ser barato.
+
+SOCKET_NAME = "worker.sock"
+
+# Lo caro de arrancar un run; los hijos lo heredan ya cargado
+PRELOAD = ("polars", "sqlmodel", "sqlalchemy", "rich.console", "rich.table",
+           "kipo.core.config", "kipo.core.db")
+
+# Espera máxima por la solicitud de un cliente recién conectado
+REQUEST_TIMEOUT_SECONDS = 5
+
+
+def supported() -> bool:
+    return hasattr(os, "fork") and hasattr(socket, "AF_UNIX") and hasattr(socket, "send_fds")
+
+
+def socket_path() -> Path:
+    """Socket del daemon del proyecto actual (.kipo/worker.sock)."""
+    path = Path.cwd() / ".kipo" / SOCKET_NAME
+    # sun_path admite ~107 bytes: proyectos con rutas largas usan el tmp del sistema
+    if len(os.fsencode(path)) > 100:
+        digest = hashlib.sha1(os.fsencode(Path.cwd())).hexdigest()[:16]
+        path = Path(tempfile.gettempdir()) / f"kipo-worker-{digest}.sock"
+    return path
+
+
+def _send(sock: socket.socket, message: Dict[str, Any]) -> None:
+    sock.sendall(json.dumps(message).encode() + b"\n")
+
+
+def _send_request(sock: socket.socket, message: Dict[str, Any],
+                  fds: Optional[List[int]] = None) -> None:
+    # Un byte que lleva los descriptores adjuntos y luego la solicitud
+    socket.send_fds(sock, [b"K"], fds or [])
+    _send(sock, message)
+
+
+def _messages(sock: socket.socket) -> Iterator[Dict[str, Any]]:
+    buffer = b""
+    while True:
+        chunk = sock.recv(65536)
+        if not chunk:
+            return
+        buffer += chunk
+        while b"\n" in buffer:
+            line, buffer = buffer.split(b"\n", 1)
+            yield json.loads(line)
+
+
+def _receive(conn: socket.socket):
+    """Solicitud de un cliente: (mensaje, descriptores recibidos)."""
+    _, fds, _, _ = socket.recv_fds(conn, 1, 3)
+    buffer = b""
+    while b"\n" not in buffer:
+        chunk = conn.recv(65536)
+        if not chunk:
+            raise ConnectionError("Client closed the connection")
+        buffer += chunk
+    return json.loads(buffer.split(b"\n", 1)[0]), fds
+
+
+def _connect(path: Optional[Path] = None) -> Optional[socket.socket]:
+    if not supported():
+        return None
+    path = path or socket_path()
+    if not path.exists():
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(path))
+    except OSError:
+        # Socket huérfano de un daemon que ya no corre
+        sock.close()
+        return None
+    return sock
+
+
+def _request(message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    sock = _connect()
+    if sock is None:
+        return None
+    with sock:
+        _send_request(sock, message)
+        return next(_messages(sock), None)
+
+
+def status() -> Optional[Dict[str, Any]]:
+    """Estado del daemon del proyecto, o None si no hay uno corriendo."""
+    return _request({"type": "ping"})
+
+
+def stop() -> bool:
+    """Pide al daemon que termine (los runs en curso siguen). False si no corría."""
+    return _request({"type": "stop"}) is not None
+
+
+def submit(pipeline_name: str, use_cache: bool = True, profile: bool = False) -> Optional[int]:
+    """
+    Ejecuta el pipeline en el daemon del proyecto y devuelve su código de
+    salida. Devuelve None si no hay daemon disponible: el llamador corre el
+    pipeline en su propio proceso.
+    """
+    sock = _connect()
+    if sock is None:
+        return None
+
+    with sock:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        try:
+            _send_request(sock, {
+                "type": "run",
+                "version": __version__,
+                "cwd": os.getcwd(),
+                "env": dict(os.environ),
+                "pipeline": pipeline_name,
+                "use_cache": use_cache,
+                "profile": profile,
+            }, fds=[0, 1, 2])
+        except OSError:
+            return None
+
+        pid = None
+        buffer = b""
+        while True:
+            try:
+                chunk = sock.recv(65536)
+            except KeyboardInterrupt:
+                # Ctrl-C llega al cliente: se reenvía al run y se sigue esperando
+                if pid is not None:
+                    os.kill(pid, signal.SIGINT)
+                continue
+
+            if not chunk:
+                if pid is None:
+                    return None
+                print(f"Kipo worker: run process {pid} exited without a status", file=sys.stderr)
+                return 1
+
+            buffer += chunk
+            while b"\n" in buffer:
+                line, buffer = buffer.split(b"\n", 1)
+                message = json.loads(line)
+                if message["type"] == "rejected":
+                    return None
+                if message["type"] == "accepted":
+                    pid = message["pid"]
+                elif message["type"] == "exit":
+                    return message["code"]
+
+
+def _run_child(conn: socket.socket, request: Dict[str, Any], fds: List[int]) -> int:
+    """Cuerpo del hijo: adopta la terminal, el entorno y el cwd del cliente y ejecuta el run."""
+    for target, fd in enumerate(fds):
+        os.dup2(fd, target)
+        os.close(fd)
+    os.chdir(request["cwd"])
+    os.environ.clear()
+    os.environ.update(request["env"])
+    time.tzset()
+
+    # Las conexiones SQLite del daemon no se comparten con el hijo
+    from kipo.core.db import get_engine
+    get_engine().dispose(close=False)
+
+    _send(conn, {"type": "accepted", "pid": os.getpid()})
+
+    # Los módulos con Console de rich se importan aquí, ya con la salida del cliente
+    from kipo.core.runner import run_pipeline
+
+    code = 1
+    try:
+        run_pipeline(request["pipeline"], use_cache=request["use_cache"],
+                     profile=request["profile"])
+        code = 0
+    except KeyboardInterrupt:
+        code = 130
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else 1
+    except Exception:
+        code = 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        _send(conn, {"type": "exit", "code": code})
+    return code
+
+
+def _reap(children: Set[int], log) -> None:
+    for pid in list(children):
+        try:
+            done, status_code = os.waitpid(pid, os.WNOHANG)
+        except ChildProcessError:
+            children.discard(pid)
+            continue
+        if done:
+            children.discard(pid)
+            log(f"[dim]Run process {pid} exited with code {os.waitstatus_to_exitcode(status_code)}[/dim]")
+
+
+def serve() -> None:
+    """
+    Corre el daemon en primer plano hasta Ctrl-C, SIGTERM o `kipo worker stop`.
+    """
+    if not supported():
+        raise RuntimeError("The Kipo worker needs fork() and Unix sockets (not available on this platform)")
+
+    path = socket_path()
+    if status() is not None:
+        raise RuntimeError(f"A Kipo worker is already running on {path}")
+
+    from rich.console import Console
+    console = Console()
+
+    # 1. Precarga: lo que cada `kipo run` pagaría al arrancar
+    started = time.perf_counter()
+    for module in PRELOAD:
+        importlib.import_module(module)
+    from kipo.core.db import get_engine, init_db
+    init_db()
+    get_engine().dispose()
+    # polars arranca dos threads propios al importarse (jemalloc y limpieza
+    # out-of-core) que quedan inactivos: el daemon nunca ejecuta consultas,
+    # así que el fork es seguro pese al aviso de Python
+    warnings.filterwarnings("ignore", message=r".*use of fork\(\) may lead to deadlocks",
+                            category=DeprecationWarning)
+
+    # 2. Socket solo accesible por el usuario (recibe su entorno)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.unlink(missing_ok=True)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    previous_umask = os.umask(0o177)
+    try:
+        server.bind(str(path))
+    finally:
+        os.umask(previous_umask)
+    server.listen(16)
+    server.settimeout(1.0)
+
+    stopping = False
+    started_at = time.time()
+    served = 0
+    children: Set[int] = set()
+
+    def request_stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, request_stop)
+
+    console.print(
+        f"[bold green]Kipo worker ready[/bold green] on {path} "
+        f"[dim](preloaded in {time.perf_counter() - started:.2f}s, pid {os.getpid()})[/dim]")
+
+    # 3. Un hijo por run; el daemon solo acepta conexiones y recoge hijos
+    try:
+        while not stopping:
+            _reap(children, console.print)
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                continue
+
+            fds: List[int] = []
+            try:
+                conn.settimeout(REQUEST_TIMEOUT_SECONDS)
+                request, fds = _receive(conn)
+                kind = request.get("type")
+
+                if kind == "ping":
+                    _send(conn, {"type": "pong", "pid": os.getpid(), "version": __version__,
+                                 "cwd": os.getcwd(), "uptime_seconds": time.time() - started_at,
+                                 "runs_served": served, "running": len(children)})
+                elif kind == "stop":
+                    _send(conn, {"type": "stopping"})
+                    stopping = True
+                elif kind == "run":
+                    if request.get("version") != __version__ or request.get("cwd") != os.getcwd() \
+                            or len(fds) != 3:
+                        _send(conn, {"type": "rejected",
+                                     "reason": "version or project mismatch"})
+                        continue
+
+                    sys.stdout.flush()
+                    sys.stderr.flush()
+                    pid = os.fork()
+                    if pid == 0:
+                        code = 1
+                        try:
+                            server.close()
+                            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                            # Ctrl-C del cliente llega como SIGINT reenviado, aunque el
+                            # daemon se haya lanzado con SIGINT ignorado (nohup, &)
+                            signal.signal(signal.SIGINT, signal.default_int_handler)
+                            conn.settimeout(None)
+                            code = _run_child(conn, request, fds)
+                        finally:
+                            os._exit(code)
+
+                    children.add(pid)
+                    served += 1
+                    console.print(f"Run [bold]{request['pipeline']}[/bold] → pid {pid}")
+            except (OSError, ValueError, ConnectionError) as e:
+                console.print(f"[yellow]Dropped a client request:[/yellow] {e}")
+            finally:
+                for fd in fds:
+                    try:
+                        os.close(fd)
+                    except OSError:
+                        pass
+                conn.close()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        path.unlink(missing_ok=True)
+        console.print(
+            f"[bold blue]Kipo worker stopped[/bold blue] ({served} run(s) served"
+            f"{f', {len(children)} still running' if children else ''})")
@@ -0,0 +1,159 @@
+import atexit
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from rich.console import Console
+from kipo.core.config import get_persist_config
+
+
+console = Console()
+
+# Pool de escritura de los steps con persist="async". Por dataset se
+# encadenan las escrituras en orden; las lecturas del dataset esperan la
+# última pendiente (wait_for) y el runner espera todas antes de cerrar el
+# run (wait_all), que además reporta los fallos.
+
+THREAD_PREFIX = "kipo-writer"
+
+_executor: Optional[ThreadPoolExecutor] = None
+_slots: Optional[threading.BoundedSemaphore] = None
+_lock = threading.Lock()
+_pending: Dict[str, Future] = {}
+_failures: List[Tuple[str, BaseException]] = []
+
+
+def _key(dataset: Path) -> str:
+    # <name>.parquet, <name>.arrow y <name>/ son el mismo dataset
+    return str(dataset.with_suffix("").resolve())
+
+
+def _start() -> None:
+    global _executor, _slots
+    workers = get_persist_config()["workers"]
+    _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=THREAD_PREFIX)
+    # Como mucho dos escrituras por writer retienen su frame en memoria:
+    # si el pipeline produce más rápido de lo que se escribe, el step espera
+    _slots = threading.BoundedSemaphore(workers * 2)
+    atexit.register(_drain_at_exit)
+
+
+def _run(label: str, task: Callable[[], Any], previous: Optional[Future],
+         on_done: Optional[Callable[[Any, Optional[BaseException]], None]]) -> Any:
+    try:
+        if previous is not None:
+            # Escrituras del mismo dataset en el orden en que se pidieron
+            try:
+                previous.result()
+            except Exception:
+                pass
+        try:
+            value = task()
+        except BaseException as e:
+            with _lock:
+                _failures.append((label, e))
+            if on_done:
+                on_done(None, e)
+            raise
+        if on_done:
+            on_done(value, None)
+        return value
+    finally:
+        _slots.release()
+
+
+def submit(dataset: Path, label: str, task: Callable[[], Any],
+           on_done: Optional[Callable[[Any, Optional[BaseException]], None]] = None) -> Future:
+    """
+    Programa `task` (la escritura de `dataset`) en el pool. `on_done(valor, error)`
+    corre en el writer al terminar, antes de que la escritura cuente como completa.
+    """
+    with _lock:
+        if _executor is None:
+            _start()
+    _slots.acquire()
+
+    key = _key(dataset)
+    with _lock:
+        previous = _pending.get(key)
+        future = _executor.submit(_run, label, task, previous, on_done)
+        _pending[key] = future
+
+    def forget(done: Future) -> None:
+        with _lock:
+            if _pending.get(key) is done:
+                del _pending[key]
+
+    future.add_done_callback(forget)
+    return future
+
+
+def wait_for(dataset: Path) -> None:
+    """
+    Espera la escritura pendiente de un dataset, si la hay. Si falló,
+    propaga el error: el archivo en disco no es el que se pidió escribir.
+    """
+    # Un writer que lee su propio dataset se esperaría a sí mismo
+    if threading.current_thread().name.startswith(THREAD_PREFIX):
+        return
+    with _lock:
+        future = _pending.get(_key(dataset))
+    if future is not None:
+        future.result()
+
+
+def wait_all(raise_errors: bool = True) -> None:
+    """
+    Espera todas las escrituras pendientes. Con `raise_errors`, si alguna
+    falló lanza un RuntimeError que las resume (y olvida los fallos).
+    """
+    while True:
+        with _lock:
+            running = [f for f in _pending.values() if not f.done()]
+        if not running:
+            break
+        for future in running:
+            try:
+                future.result()
+            except BaseException:
+                pass
+
+    with _lock:
+        failures = list(_failures)
+        _failures.clear()
+    if failures and raise_errors:
+        details = "; ".join(f"{label}: {error}" for label, error in failures)
+        raise RuntimeError(f"{len(failures)} background write(s) failed: {details}")
+
+
+def _drain_at_exit() -> None:
+    # Scripts que llaman steps sin `kipo run`: que un fallo no pase en silencio
+    try:
+        wait_all()
+    except RuntimeError as e:
+        console.print(f"[bold red]{e}[/bold red]")
+
+
+def fsync(paths: Iterable[Path]) -> None:
+    """Fuerza a disco los archivos escritos y sus directorios (los renames)."""
+    directories = set()
+    for path in paths:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        directories.add(path.parent)
+
+    for directory in directories:
+        try:
+            fd = os.open(directory, os.O_RDONLY)
+        except OSError:
+            # Windows no permite abrir directorios
+            continue
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
@@ -1,18 +1,16 @@
 import typer
-import uvicorn
+from pathlib import Path
 from typing import Optional
 
-import uvicorn
-
 from rich.console import Console
 from rich.panel import Panel
 from kipo import __version__
-from kipo.commands.init import init_project
-from kipo.core.io import read
-from kipo.core.definitions import DataLayer
 from kipo.core.definitions import DataLayer
-from kipo.core.runner import run_pipeline
-from kipo.commands.history import show_history
+from kipo.core.definitions import RunStatus
+
+# Cada comando importa lo que necesita (polars, sqlmodel, uvicorn...) al
+# ejecutarse: `kipo version` o `kipo history` no cargan el stack completo.
+# python -m kipo.bench.startup vigila que siga siendo así.
 
 app = typer.Typer(
     name="kipo",
@@ -47,6 +45,8 @@ def init(
     """
     Initialize a new Kipo project.
     """
+    from kipo.commands.init import init_project
+
     if not project_name:
         project_name = typer.prompt("Project name", default=".")
 
@@ -58,12 +58,25 @@ def show(
     layer: str = typer.Argument(..., help="Layer: bronze, silver, or gold"),
     name: str = typer.Argument(..., help="Dataset name (e.g., process_data)"),
     limit: int = typer.Option(
-        10, "--limit", "-n", help="Number of rows to display")
+        10, "--limit", "-n", help="Number of rows to display"),
+    columns: Optional[str] = typer.Option(
+        None, "--columns", "-c", help="Comma-separated columns to display"),
+    where: Optional[str] = typer.Option(
+        None, "--where", "-w", help="SQL filter expression (e.g. \"val > 10\")"),
+    version: Optional[int] = typer.Option(
+        None, "--version", help="Show the version written by this run (see `kipo versions list`)"),
+    as_of: Optional[str] = typer.Option(
+        None, "--as-of", help="Show the latest version written up to this local date/time (ISO)")
 ):
     """
     Inspect a dataset directly from the CLI without writing scripts.
-    Example: kipo show silver process_data
+    Only the requested columns, rows and limit are read from disk
+    (Parquet and Arrow IPC datasets alike).
+    Example: kipo show silver process_data -c id,val -w "val > 10"
     """
+    import polars as pl
+    from kipo.core.io import scan
+
     try:
         # 1. Normalizar el input del layer (string -> Enum)
         try:
@@ -77,15 +90,23 @@ def show(
         console.print(
             f"[bold blue]🔍 Inspecting:[/bold blue] {name} [{target_layer}]")
 
-        # 3. Lectura usando el motor de I/O
-        df = read(target_layer, name)
+        # 3. Lectura lazy: filtro, proyección y límite se empujan al lector
+        lf = scan(target_layer, name, version=version, as_of=as_of)
+        if where:
+            lf = lf.filter(pl.sql_expr(where))
+        if columns:
+            lf = lf.select([c.strip() for c in columns.split(",") if c.strip()])
+        df = lf.head(limit).collect()
 
         # 4. Mostrar datos (Polars se encarga del formato bonito)
-        print(df.head(limit))
+        print(df)
 
-    except FileNotFoundError:
+    except FileNotFoundError as e:
+        if version is not None or as_of is not None:
+            console.print(f"[bold yellow]⚠️  Version not found:[/bold yellow] {e}")
+            raise typer.Exit(code=1)
         console.print(f"[bold yellow]⚠️  Dataset not found.[/bold yellow]")
-        console.print(f"Checked in: [italic]{layer}/{name}.parquet[/italic]")
+        console.print(f"Checked in: [italic]{layer}/{name}.parquet, .arrow or {name}/[/italic]")
         raise typer.Exit(code=1)
 
     except Exception as e:
@@ -96,14 +117,36 @@ def show(
 @app.command()
 def run(
     pipeline_name: str = typer.Argument(
-        ..., help="Name of the pipeline to run (e.g., example_pipeline)")
+        ..., help="Name of the pipeline to run (e.g., example_pipeline)"),
+    force: bool = typer.Option(
+        False, "--force", "--no-cache",
+        help="Ignore cached step results and recompute every step"),
+    profile: bool = typer.Option(
+        False, "--profile",
+        help="Profile every step (cProfile, memory, query plans); implies --no-cache. See `kipo profile`"),
+    no_worker: bool = typer.Option(
+        False, "--no-worker", help="Run in this process even if a `kipo worker` is running")
 ):
     """
     Execute a pipeline script located in the pipelines/ directory.
+    If a `kipo worker` daemon serves the project, the run is handed to it
+    (no interpreter or import startup); otherwise it runs in this process.
     Example: kipo run example_pipeline
     """
+    from kipo.core import worker
+
+    # Un step servido desde caché no tiene nada que perfilar
+    use_cache = not (force or profile)
+
+    if not no_worker:
+        code = worker.submit(pipeline_name, use_cache=use_cache, profile=profile)
+        if code is not None:
+            raise typer.Exit(code=code)
+
+    from kipo.core.runner import run_pipeline
+
     try:
-        run_pipeline(pipeline_name)
+        run_pipeline(pipeline_name, use_cache=use_cache, profile=profile)
     except FileNotFoundError:
         raise typer.Exit(code=1)
     except Exception:
@@ -113,12 +156,284 @@ def run(
 @app.command()
 def history(
     limit: int = typer.Option(
-        10, "--limit", "-n", help="Number of rows to display")
+        10, "--limit", "-n", help="Number of rows to display"),
+    run_id: Optional[int] = typer.Option(
+        None, "--run", "-r", help="Show the per-step breakdown of a run"),
+    pipeline: Optional[str] = typer.Option(
+        None, "--pipeline", "-p", help="Only runs of this pipeline (e.g., main.py)"),
+    status: Optional[RunStatus] = typer.Option(
+        None, "--status", "-s", case_sensitive=False, help="Only runs with this status"),
+    since: Optional[str] = typer.Option(
+        None, "--since", help="Only runs started after a date (2024-05-01) or age (7d, 12h)"),
+    page: Optional[str] = typer.Option(
+        None, "--page", help="Cursor of the next page, printed under the previous one")
 ):
     """
     Show pipeline execution history.
+    Example: kipo history --pipeline main.py --status failed --since 7d
+    """
+    from kipo.commands.history import show_history, show_run_steps
+
+    if run_id is not None:
+        show_run_steps(run_id)
+    else:
+        show_history(limit, pipeline=pipeline, status=status, since=since, page=page)
+
+
+@app.command()
+def profile(
+    run_id: int = typer.Argument(..., help="Run ID (see `kipo history`)"),
+    step: Optional[str] = typer.Option(
+        None, "--step", "-s", help="Only this step"),
+    limit: int = typer.Option(
+        15, "--limit", "-n", help="Hotspots to show per step"),
+    sort: str = typer.Option(
+        "tottime", "--sort", help="tottime (own time) or cumtime (including callees)"),
+    plan: bool = typer.Option(
+        False, "--plan", help="Also print the Polars query plan of lazy steps")
+):
+    """
+    Show the top hotspots of a profiled run (kipo run --profile).
+    Example: kipo profile 42 --step clean_sales --plan
+    """
+    from kipo.commands.profile import show_profile
+
+    if sort not in ("tottime", "cumtime"):
+        console.print(
+            f"[bold red]❌ Invalid sort:[/bold red] '{sort}'. Options are: tottime, cumtime.")
+        raise typer.Exit(code=1)
+
+    show_profile(run_id, step=step, limit=limit, sort=sort, show_plan=plan)
+
+
+@app.command()
+def compact(
+    layer: str = typer.Argument(..., help="Layer: bronze, silver, or gold"),
+    name: str = typer.Argument(..., help="Dataset name (e.g., eventos)"),
+    target_mb: Optional[int] = typer.Option(
+        None, "--target-mb", help="Target file size in MB (default: [storage] target_file_mb)")
+):
+    """
+    Merge the small fragments of an append/upsert dataset into right-sized files.
+    Example: kipo compact bronze eventos
+    """
+    from kipo.core.compaction import compact as compact_dataset
+
+    try:
+        target_layer = DataLayer[layer.upper()]
+    except KeyError:
+        console.print(
+            f"[bold red]❌ Invalid Layer:[/bold red] '{layer}'. Options are: bronze, silver, gold.")
+        raise typer.Exit(code=1)
+
+    try:
+        target_bytes = target_mb * 1024 * 1024 if target_mb else None
+        stats = compact_dataset(target_layer, name, target_bytes)
+    except FileNotFoundError as e:
+        console.print(f"[bold yellow]⚠️  {e}[/bold yellow]")
+        raise typer.Exit(code=1)
+
+    console.print(
+        f"[bold green]Compacted:[/bold green] {stats['fragments_merged']} fragment(s) into {stats['files_written']} file(s)")
+
+
+@app.command()
+def bench(
+    sizes: str = typer.Option(
+        "10000,100000,1000000", "--sizes", help="Comma-separated synthetic dataset sizes (rows)"),
+    repeat: int = typer.Option(5, "--repeat", help="Timed repetitions per benchmark"),
+    metadata_rows: int = typer.Option(
+        100_000, "--metadata-rows", help="Runs in the synthetic metadata store"),
+    output: Optional[Path] = typer.Option(
+        None, "--output", "-o", help="Write the JSON results to this file (default: stdout)"),
+    baseline: Optional[Path] = typer.Option(
+        None, "--baseline", "-b", help="Compare against a previously saved results file"),
+    threshold: float = typer.Option(
+        0.2, "--threshold", help="Allowed slowdown vs the baseline (0.2 = 20%)")
+):
+    """
+    Benchmark framework overhead and I/O paths on synthetic data.
+    Exits with code 1 if a benchmark regressed beyond the threshold.
+    Example: kipo bench --sizes 10000,100000 -o baseline.json
+    """
+    from kipo.commands.bench import run_bench
+
+    try:
+        size_list = [int(s) for s in sizes.split(",") if s.strip()]
+    except ValueError:
+        console.print(f"[bold red]❌ Invalid --sizes:[/bold red] '{sizes}'")
+        raise typer.Exit(code=1)
+
+    ok = run_bench(size_list, repeat, metadata_rows, output, baseline, threshold)
+    if not ok:
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def datasets(
+    layer: Optional[str] = typer.Argument(
+        None, help="Only this layer: bronze, silver, or gold"),
+    name: Optional[str] = typer.Argument(
+        None, help="Show the schema and column statistics of this dataset")
+):
+    """
+    List the datasets in the catalog (rows, size, files, producing run).
+    Answered from the metadata DB without reading the data files.
+    Example: kipo datasets silver process_data
+    """
+    from kipo.commands.datasets import show_dataset, show_datasets
+
+    if name is not None:
+        show_dataset(layer, name)
+    else:
+        show_datasets(layer)
+
+
+catalog_app = typer.Typer(help="Manage the dataset catalog.")
+app.add_typer(catalog_app, name="catalog")
+
+
+@catalog_app.command("rebuild")
+def catalog_rebuild():
+    """
+    Rebuild the dataset catalog by scanning the data directory.
+    """
+    from kipo.commands.datasets import rebuild_catalog
+
+    rebuild_catalog()
+
+
+worker_app = typer.Typer(help="Manage the warm worker daemon that speeds up `kipo run`.")
+app.add_typer(worker_app, name="worker")
+
+
+@worker_app.command("start")
+def worker_start():
+    """
+    Start the worker daemon for this project (foreground; use systemd,
+    tmux or nohup to keep it running). It preloads Polars, SQLModel and the
+    metadata DB once and forks an isolated process per `kipo run`.
+    """
+    from kipo.commands.worker import start_worker
+
+    if not start_worker():
+        raise typer.Exit(code=1)
+
+
+@worker_app.command("stop")
+def worker_stop():
+    """
+    Stop the worker daemon of this project.
+    """
+    from kipo.commands.worker import stop_worker
+
+    stop_worker()
+
+
+@worker_app.command("status")
+def worker_status():
+    """
+    Show whether a worker daemon is serving this project.
+    """
+    from kipo.commands.worker import show_worker_status
+
+    show_worker_status()
+
+
+cache_app = typer.Typer(help="Manage the step result and raw file caches.")
+app.add_typer(cache_app, name="cache")
+
+
+@cache_app.command("clear")
+def cache_clear(
+    layer: Optional[str] = typer.Argument(
+        None, help="Layer to clear: bronze, silver, or gold (default: all)"),
+    name: Optional[str] = typer.Argument(
+        None, help="Dataset name to clear (default: whole layer)"),
+    raw: bool = typer.Option(
+        False, "--raw", help="Clear the Parquet copies of raw files instead")
+):
+    """
+    Forget recorded step fingerprints so the next run recomputes them.
+    Example: kipo cache clear silver process_data
+    """
+    from kipo.commands.cache import clear_cache, clear_raw_cache
+
+    if raw:
+        clear_raw_cache()
+    else:
+        clear_cache(layer, name)
+
+
+@cache_app.command("info")
+def cache_info():
+    """
+    Show the raw file cache contents and disk usage.
+    """
+    from kipo.commands.cache import show_cache_info
+
+    show_cache_info()
+
+
+versions_app = typer.Typer(help="Inspect and clean up saved dataset versions.")
+app.add_typer(versions_app, name="versions")
+
+
+@versions_app.command("list")
+def versions_list(
+    layer: str = typer.Argument(..., help="Layer: bronze, silver, or gold"),
+    name: str = typer.Argument(..., help="Dataset name (e.g., ventas)"),
+):
+    """
+    List the versions of a dataset: one per run that wrote it.
+    Example: kipo versions list gold ventas
+    """
+    from kipo.commands.versions import show_versions
+
+    show_versions(layer, name)
+
+
+@versions_app.command("gc")
+def versions_gc(
+    keep: Optional[int] = typer.Option(
+        None, "--keep", help="Versions to keep per dataset, 0 = all (default: [versions] keep)"),
+    keep_days: Optional[int] = typer.Option(
+        None, "--keep-days", help="Remove versions older than this, 0 = no limit (default: [versions] keep_days)"),
+):
+    """
+    Remove old dataset versions according to the retention policy.
+    The newest version of each dataset is always kept.
     """
-    show_history(limit)
+    from kipo.commands.versions import gc_versions
+
+    gc_versions(keep, keep_days)
+
+
+schema_app = typer.Typer(help="Manage schema contracts of raw files.")
+app.add_typer(schema_app, name="schema")
+
+
+@schema_app.command("infer")
+def schema_infer(
+    filename: str = typer.Argument(..., help="Raw file, relative to data/raw (e.g., ventas.csv)"),
+    sample_rows: int = typer.Option(
+        10000, "--sample-rows", "-n", help="Rows read to infer the column types"),
+    sheet: Optional[str] = typer.Option(
+        None, "--sheet", help="Excel sheet to sample (default: the first one)"),
+    force: bool = typer.Option(
+        False, "--force", help="Overwrite an existing contract"),
+    toml: bool = typer.Option(
+        False, "--toml", help="Print a [raw.schemas] entry for kipo_config.toml instead of writing a sidecar")
+):
+    """
+    Bootstrap the schema contract of a raw file from a sample. With a
+    contract, read_raw uses its types without inference and rejects files
+    that do not match. Example: kipo schema infer ventas.csv
+    """
+    from kipo.commands.schema import infer_schema
+
+    if not infer_schema(filename, sample_rows, sheet, force, toml):
+        raise typer.Exit(code=1)
 
 
 @app.command()
@@ -128,6 +443,8 @@ def server(
     """
     Launch the Kipo Web Dashboard.
     """
+    import uvicorn
+
     console.print(
         f"[bold green]🚀 Starting Kipo Dashboard at http://localhost:{port}[/bold green]")
     # Importante: reload=False en producción local para evitar loops raros con importlib
@@ -1,18 +1,41 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import List
-from fastapi import FastAPI, Request, BackgroundTasks
+from typing import List, Optional
+from datetime import datetime, timezone
+from fastapi import FastAPI, Query, Request, HTTPException
+from fastapi.responses import StreamingResponse
 from fastapi.templating import Jinja2Templates
-from sqlmodel import Session, select, desc
-from kipo.core.db import engine
-from kipo.core.models import PipelineRun, RunStatus
-from kipo.core.runner import run_pipeline
+from sqlmodel import Session
+from kipo.core import catalog, events, jobs, profiling, read_cache
+from kipo.core.definitions import DataLayer
+from kipo.core.db import get_engine, get_step_runs, init_db, query_runs
+from kipo.core.models import JobStatus, PipelineRun, RunStatus
 
 
 # Resolución robusta de rutas
 BASE_DIR = Path(__file__).resolve().parent
 templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
 
-app = FastAPI(title="Kipo Dashboard")
+# Ejecuta los pipelines encolados desde el dashboard en procesos separados
+dispatcher = jobs.JobDispatcher()
+
+# Tamaño máximo de página de /api/runs
+MAX_PAGE_SIZE = 500
+
+# Intervalo de keep-alive del stream SSE (proxies cortan conexiones mudas)
+HEARTBEAT_SECONDS = 15
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    dispatcher.start()
+    yield
+    dispatcher.stop()
+
+
+app = FastAPI(title="Kipo Dashboard", lifespan=lifespan)
 
 
 def get_available_pipelines() -> List[str]:
@@ -33,25 +56,175 @@ def dashboard(request: Request):
     """
     available_pipelines = get_available_pipelines()
 
-    with Session(engine) as session:
-        runs = session.exec(select(PipelineRun).order_by(
-            desc(PipelineRun.start_time)).limit(50)).all()
+    runs, next_cursor = query_runs(limit=50)
 
     return templates.TemplateResponse(
+        request,
         "dashboard.html",
         {
-            "request": request,
             "runs": runs,
+            "next_cursor": next_cursor,
             "pipelines": available_pipelines,
+            "jobs": jobs.active_jobs(),
+            "RunStatus": RunStatus,
+            "JobStatus": JobStatus
+        }
+    )
+
+
+@app.get("/api/runs")
+def list_runs_endpoint(
+    pipeline: Optional[str] = None,
+    status: Optional[RunStatus] = None,
+    since: Optional[datetime] = None,
+    before: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+):
+    """
+    Lists runs newest first, optionally filtered by pipeline, status and
+    start time (`since`, UTC). Pass the returned `next_cursor` as `before`
+    to fetch the next page; it is null on the last page.
+    """
+    if since is not None and since.tzinfo is not None:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    try:
+        runs, next_cursor = query_runs(pipeline=pipeline, status=status, since=since,
+                                       before=before, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {"runs": [run.model_dump() for run in runs], "next_cursor": next_cursor}
+
+
+@app.get("/runs/{run_id}")
+def run_detail(request: Request, run_id: int):
+    """
+    Renders the per-step timing breakdown of a single run, plus the
+    hotspots and query plans of its steps if it was profiled.
+    """
+    init_db()
+    with Session(get_engine()) as session:
+        run = session.get(PipelineRun, run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail=f"Run {run_id} not found")
+
+    steps = get_step_runs(run_id)
+    total = run.duration_seconds or sum(s.wall_seconds or 0 for s in steps)
+
+    return templates.TemplateResponse(
+        request,
+        "run.html",
+        {
+            "run": run,
+            "steps": steps,
+            "total": total,
+            "profiles": profiling.load_run(run_id, limit=10),
             "RunStatus": RunStatus
         }
     )
 
 
+def _dataset_summary(dataset) -> dict:
+    summary = dataset.model_dump(exclude={"column_types", "column_stats"})
+    summary["schema"] = json.loads(dataset.column_types)
+    summary["columns"] = json.loads(dataset.column_stats or "{}")
+    return summary
+
+
+@app.get("/datasets")
+def datasets_page(request: Request):
+    """
+    Renders the dataset catalog: every dataset written by a step, with its
+    schema and column statistics, served from the metadata DB.
+    """
+    datasets = [_dataset_summary(d) for d in catalog.list_datasets()]
+    return templates.TemplateResponse(request, "datasets.html", {"datasets": datasets})
+
+
+@app.get("/api/datasets")
+def list_datasets_endpoint(layer: Optional[DataLayer] = None):
+    """
+    Lists the catalog entries, optionally for a single layer.
+    """
+    return [_dataset_summary(d) for d in catalog.list_datasets(layer)]
+
+
+@app.get("/api/cache/read")
+def read_cache_endpoint():
+    """
+    Hit, miss and eviction counters of the server's in-memory `io.read` cache.
+    """
+    return read_cache.stats()
+
+
 @app.post("/run/{pipeline_name}")
-async def run_pipeline_endpoint(pipeline_name: str, background_tasks: BackgroundTasks):
+def run_pipeline_endpoint(pipeline_name: str, priority: int = 0):
     """
-    Endpoint to trigger a pipeline execution in the background.
+    Enqueues a pipeline execution. Runs are executed by the job dispatcher
+    in worker processes, at most `[server] max_workers` at a time.
+    Re-submitting a pipeline that is still queued returns the existing job.
     """
-    background_tasks.add_task(run_pipeline, pipeline_name)
-    return {"message": f"Pipeline {pipeline_name} started"}
+    if pipeline_name not in get_available_pipelines():
+        raise HTTPException(status_code=404, detail=f"Pipeline {pipeline_name} not found")
+
+    job = jobs.enqueue(pipeline_name, priority=priority)
+    dispatcher.notify()
+    return {"message": f"Pipeline {pipeline_name} queued", "job_id": job.id, "status": job.status}
+
+
+@app.get("/jobs")
+def list_jobs_endpoint(limit: int = 50):
+    """
+    Lists queued and running jobs, followed by the most recent finished ones.
+    """
+    return [job.model_dump() for job in jobs.list_jobs(limit=limit)]
+
+
+@app.post("/jobs/{job_id}/cancel")
+def cancel_job_endpoint(job_id: int):
+    """
+    Cancels a queued job, or terminates its worker process if it is running.
+    """
+    job = jobs.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    if job.status not in jobs.ACTIVE:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is already {job.status}")
+
+    dispatcher.cancel(job_id)
+    return {"message": f"Job {job_id} cancelled", "job_id": job_id}
+
+
+@app.get("/events")
+async def events_endpoint(request: Request):
+    """
+    Server-Sent Events stream of run, step and job events, so the dashboard
+    can update in place instead of polling or reloading.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def on_event(event: dict) -> None:
+        # Los eventos llegan desde threads del servidor (dispatcher, forwarder)
+        loop.call_soon_threadsafe(queue.put_nowait, event)
+
+    unsubscribe = events.subscribe(on_event)
+
+    async def stream():
+        try:
+            yield ": connected\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+        finally:
+            unsubscribe()
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
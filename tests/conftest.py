@@ -0,0 +1,16 @@
+import pytest
+from kipo.core import read_cache, scheduler
+from kipo.core.context import KipoContext
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """Proyecto vacío en un directorio temporal, con el cwd en su raíz como en `kipo run`."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(KipoContext, "_instance", None)
+    # Estado de proceso que no debe pasar de un test a otro
+    scheduler.reset()
+    read_cache.clear()
+    yield tmp_path
+    scheduler.reset()
+    read_cache.clear()
@@ -0,0 +1,30 @@
+import os
+from datetime import date
+
+from kipo.bench._common import measure, region_name, synthetic
+
+
+def test_measure_reports_percentiles():
+    calls = []
+    stats = measure(lambda: calls.append(1), 7)
+    assert len(calls) == 7
+    assert set(stats) == {"p50_ms", "min_ms", "p95_ms", "ops_per_sec"}
+    assert stats["min_ms"] <= stats["p50_ms"] <= stats["p95_ms"]
+
+
+def test_synthetic_is_deterministic_and_bounded():
+    df = synthetic(1000, start=date(2023, 1, 1), days=730, regions=50)
+    assert df.equals(synthetic(1000, start=date(2023, 1, 1), days=730, regions=50))
+    assert df.columns == ["id", "fecha", "region", "cantidad", "monto", "nota"]
+    assert df["fecha"].min() >= date(2023, 1, 1)
+    assert set(df["region"]) <= {region_name(i) for i in range(50)}
+
+
+def test_cli_startup_does_not_import_heavy_modules(monkeypatch):
+    import kipo
+    from kipo.bench.startup import import_profile
+
+    src = os.path.dirname(os.path.dirname(kipo.__file__))
+    monkeypatch.setenv("PYTHONPATH", os.pathsep.join(
+        filter(None, [src, os.environ.get("PYTHONPATH")])))
+    assert import_profile("kipo.main")["heavy_modules_loaded"] == []
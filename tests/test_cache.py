@@ -0,0 +1,55 @@
+import os
+
+import polars as pl
+from kipo.core import cache
+from kipo.core.io import scan_files, track_scan
+
+
+def test_hash_frame_depends_on_row_order():
+    df = pl.DataFrame({"a": [1, 2, 3], "b": ["x", "y", "z"]})
+    assert cache._hash_frame(df) == cache._hash_frame(df.clone())
+    assert cache._hash_frame(df) != cache._hash_frame(df.reverse())
+
+
+def test_hash_frame_lazy_matches_eager():
+    df = pl.DataFrame({"a": [1, 2, 3]})
+    assert cache._hash_frame(df.lazy()) == cache._hash_frame(df)
+
+
+def test_tracked_scan_is_hashed_by_file_signature(tmp_path, monkeypatch):
+    """Un scan de kipo se identifica por sus archivos: no se ejecuta para hashearlo."""
+    path = tmp_path / "x.parquet"
+    pl.DataFrame({"a": [1, 2, 3]}).write_parquet(path)
+    lf = track_scan(scan_files([path]), [path])
+    first = cache._hash_frame(lf)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("tracked scans must not be collected")
+
+    monkeypatch.setattr(pl.LazyFrame, "collect", fail)
+    assert cache._hash_frame(lf) == first
+
+    # Reescribir el archivo cambia la firma
+    monkeypatch.undo()
+    pl.DataFrame({"a": [1, 2, 4]}).write_parquet(path)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert cache._hash_frame(lf) != first
+
+
+def test_derived_lazy_frame_is_hashed_by_content(tmp_path):
+    path = tmp_path / "x.parquet"
+    pl.DataFrame({"a": [1, 2, 3]}).write_parquet(path)
+    lf = track_scan(scan_files([path]), [path])
+    derived = lf.filter(pl.col("a") > 1)
+    assert cache._hash_frame(derived) == cache._hash_frame(pl.DataFrame({"a": [2, 3]}))
+
+
+def test_fingerprint_includes_settings():
+    def step(df):
+        return df
+
+    df = pl.DataFrame({"a": [1]})
+    plain = cache.fingerprint(step, (df,), {}, {"format": "parquet"})
+    assert plain == cache.fingerprint(step, (df,), {}, {"format": "parquet"})
+    assert plain != cache.fingerprint(step, (df,), {}, {"format": "ipc"})
@@ -0,0 +1,62 @@
+import json
+from datetime import datetime
+
+import polars as pl
+from kipo.core import catalog
+from kipo.core.definitions import DataLayer, WriteMode
+from kipo.core.io import get_data_path, write
+
+
+def test_describe_datetime_stats_round_trip(project):
+    """min/max de columnas Datetime en ms, us y ns vuelven al mismo instante."""
+    first = datetime(2024, 1, 15, 8, 30, 0, 123000)
+    last = datetime(2025, 6, 30, 23, 59, 59, 999000)
+    units = ("ms", "us", "ns")
+    df = pl.DataFrame({
+        f"ts_{unit}": pl.Series([first, last], dtype=pl.Datetime(unit)) for unit in units
+    })
+    path = get_data_path(DataLayer.SILVER, "eventos")
+    path.parent.mkdir(parents=True)
+    df.write_parquet(path)
+
+    description = catalog.describe(DataLayer.SILVER, "eventos")
+
+    for unit in units:
+        stats = description["columns"][f"ts_{unit}"]
+        assert stats["min"] == first.isoformat(), unit
+        assert stats["max"] == last.isoformat(), unit
+
+
+def test_describe_unsigned_stats(project):
+    df = pl.DataFrame({
+        "u64": pl.Series([1, 2**63 + 5], dtype=pl.UInt64),
+        "u32": pl.Series([1, 2**31 + 5], dtype=pl.UInt32),
+        "i64": [-(2**62), 5],
+    })
+    path = get_data_path(DataLayer.SILVER, "ids")
+    path.parent.mkdir(parents=True)
+    df.write_parquet(path)
+
+    columns = catalog.describe(DataLayer.SILVER, "ids")["columns"]
+
+    assert (columns["u64"]["min"], columns["u64"]["max"]) == (1, 2**63 + 5)
+    assert (columns["u32"]["min"], columns["u32"]["max"]) == (1, 2**31 + 5)
+    assert (columns["i64"]["min"], columns["i64"]["max"]) == (-(2**62), 5)
+
+
+def test_record_after_append_reads_only_new_footers(project, monkeypatch):
+    for i in range(3):
+        write(pl.DataFrame({"i": [i]}), DataLayer.BRONZE, "eventos", mode=WriteMode.APPEND)
+    catalog.record(DataLayer.BRONZE, "eventos")
+
+    read = []
+    original = catalog.read_footer
+    monkeypatch.setattr(catalog, "read_footer", lambda path: read.append(path) or original(path))
+    write(pl.DataFrame({"i": [3]}), DataLayer.BRONZE, "eventos", mode=WriteMode.APPEND)
+    entry = catalog.record(DataLayer.BRONZE, "eventos")
+
+    assert len(read) == 1
+    assert entry.row_count == 4
+    assert entry.file_count == 4
+    stats = json.loads(entry.column_stats)["i"]
+    assert (stats["min"], stats["max"]) == (0, 3)
@@ -0,0 +1,95 @@
+import json
+
+import polars as pl
+import pytest
+from kipo.core import compaction, io
+from kipo.core.definitions import DataLayer, WriteMode
+
+
+def _append(values, name="eventos"):
+    for value in values:
+        io.write(pl.DataFrame({"i": [value]}), DataLayer.BRONZE, name, mode=WriteMode.APPEND)
+    return io.get_dataset_dir(DataLayer.BRONZE, name)
+
+
+def _values(name="eventos"):
+    return io.read(DataLayer.BRONZE, name)["i"].to_list()
+
+
+def test_compact_merges_fragments_in_order(project):
+    directory = _append(range(5))
+    stats = compaction.compact(DataLayer.BRONZE, "eventos", target_bytes=1 << 30)
+
+    assert stats == {"fragments_merged": 5, "files_written": 1}
+    assert len(io.list_fragments(directory)) == 1
+    assert _values() == [0, 1, 2, 3, 4]
+
+    # Una segunda tanda se compacta detrás de la primera, sin alargar el nombre
+    _append(range(5, 8))
+    compaction.compact(DataLayer.BRONZE, "eventos", target_bytes=1 << 30)
+    fragments = io.list_fragments(directory)
+    assert len(fragments) == 1
+    assert fragments[0].stem.count("_c") == 1
+    assert _values() == list(range(8))
+
+
+@pytest.mark.parametrize("removed", [0, 1, 3])
+def test_interrupted_compaction_is_finished_without_duplicates(project, monkeypatch, removed):
+    """Un corte después de escribir el journal se completa en la próxima compactación."""
+    directory = _append(range(3))
+    fragments = io.list_fragments(directory)
+
+    finish = compaction._finish_pending
+
+    def crash(path):
+        # Se corta justo después de escribir el journal
+        if (path / compaction.JOURNAL).exists():
+            raise KeyboardInterrupt
+        finish(path)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(compaction, "_finish_pending", crash)
+        with pytest.raises(KeyboardInterrupt):
+            compaction.compact_dir(directory, 1 << 30)
+
+    journal = json.loads((directory / compaction.JOURNAL).read_text())
+    assert journal["replaces"] == [f.name for f in fragments]
+    # El corte puede llegar a mitad del borrado de los fragmentos
+    for fragment in fragments[:removed]:
+        fragment.unlink()
+    # Mientras tanto los lectores no ven el fusionado (archivo oculto)
+    if removed < len(fragments):
+        assert sorted(_values()) == list(range(removed, 3))
+
+    compaction.compact_dir(directory, 1 << 30)
+    assert not (directory / compaction.JOURNAL).exists()
+    assert _values() == [0, 1, 2]
+    assert not list(directory.glob(".*"))
+
+
+def test_failed_merge_leaves_fragments_intact(project, monkeypatch):
+    directory = _append(range(3))
+
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(compaction, "write_file", fail)
+        with pytest.raises(OSError):
+            compaction.compact_dir(directory, 1 << 30)
+
+    assert len(io.list_fragments(directory)) == 3
+    assert _values() == [0, 1, 2]
+
+
+def test_scheduled_compaction_runs_at_end_of_run(project):
+    (project / "kipo_config.toml").write_text("[storage]\nmax_fragments = 2\n")
+    directory = _append(range(4))
+    compaction.schedule_compaction(DataLayer.BRONZE, "eventos")
+
+    # Programar no toca los fragmentos: los steps del run pueden seguir leyéndolos
+    assert len(io.list_fragments(directory)) == 4
+
+    compaction.run_pending_compactions()
+    assert len(io.list_fragments(directory)) == 1
+    assert _values() == [0, 1, 2, 3]
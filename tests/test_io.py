@@ -0,0 +1,133 @@
+import polars as pl
+import pytest
+from kipo.core import io, read_cache
+from kipo.core.parquet_footer import read_footer
+from kipo.core.definitions import DataLayer, Engine, WriteMode
+
+
+def _temp_files(directory):
+    return [p for p in directory.iterdir() if p.name.endswith(".tmp")]
+
+
+def _sorted(df):
+    return df.sort(df.columns)
+
+
+@pytest.mark.parametrize("engine", [Engine.STREAMING, Engine.IN_MEMORY])
+def test_partitioned_write_and_pruned_scan(project, engine):
+    df = pl.DataFrame({
+        "region": ["norte", "sur", "norte", None, "sur este"],
+        "anio": [2024, 2024, 2025, 2025, 2024],
+        "monto": [1.0, 2.0, 3.0, 4.0, 5.0],
+    })
+    io.write(df.lazy(), DataLayer.SILVER, "ventas", engine=engine,
+             partition_by=["region", "anio"])
+
+    dataset_dir = io.get_dataset_dir(DataLayer.SILVER, "ventas")
+    assert (dataset_dir / "region=norte" / "anio=2024").is_dir()
+    assert (dataset_dir / "region=sur%20este" / "anio=2024").is_dir()
+    assert (dataset_dir / f"region={io.HIVE_NULL}" / "anio=2025").is_dir()
+    # El staging no queda en el layer
+    assert not [p for p in dataset_dir.parent.iterdir() if p.name.startswith(".")]
+
+    back = io.read(DataLayer.SILVER, "ventas").select(df.columns)
+    assert _sorted(back).equals(_sorted(df))
+
+    norte = io.scan(DataLayer.SILVER, "ventas", filters={"region": "norte"}).collect()
+    assert sorted(norte["monto"]) == [1.0, 3.0]
+
+
+def test_partitioned_overwrite_replaces_only_written_partitions(project):
+    first = pl.DataFrame({"region": ["norte", "sur"], "monto": [1, 2]})
+    io.write(first, DataLayer.SILVER, "ventas", partition_by=["region"])
+    io.write(pl.DataFrame({"region": ["sur"], "monto": [20]}),
+             DataLayer.SILVER, "ventas", partition_by=["region"])
+
+    back = io.read(DataLayer.SILVER, "ventas")
+    assert dict(zip(back["region"], back["monto"])) == {"norte": 1, "sur": 20}
+
+
+def test_scan_of_empty_dataset_dir_raises(project):
+    io.get_dataset_dir(DataLayer.BRONZE, "vacio").mkdir(parents=True)
+    with pytest.raises(FileNotFoundError):
+        io.scan(DataLayer.BRONZE, "vacio")
+
+
+def test_append_and_upsert(project):
+    io.write(pl.DataFrame({"id": [1, 2], "v": ["a", "b"]}), DataLayer.BRONZE, "t",
+             mode=WriteMode.APPEND)
+    io.write(pl.DataFrame({"id": [3], "v": ["c"]}), DataLayer.BRONZE, "t",
+             mode=WriteMode.APPEND)
+    io.write(pl.DataFrame({"id": [2, 4], "v": ["B", "d"]}), DataLayer.BRONZE, "t",
+             mode=WriteMode.UPSERT, key=["id"])
+
+    back = io.read(DataLayer.BRONZE, "t").sort("id")
+    assert back.to_dict(as_series=False) == {"id": [1, 2, 3, 4], "v": ["a", "B", "c", "d"]}
+
+
+def test_atomic_write_uses_unique_temp_names(project):
+    target = project / "data" / "x.parquet"
+    target.parent.mkdir(parents=True)
+    used = []
+
+    def writer(path):
+        used.append(path)
+        pl.DataFrame({"a": [len(used)]}).write_parquet(path)
+
+    io._atomic_write(target, writer)
+    io._atomic_write(target, writer)
+    assert used[0] != used[1]
+    assert all(p.parent == target.parent and p.name.startswith(".") for p in used)
+    assert pl.read_parquet(target)["a"].to_list() == [2]
+
+    def failing(path):
+        path.write_bytes(b"a medio escribir")
+        raise OSError("disco lleno")
+
+    with pytest.raises(OSError):
+        io._atomic_write(target, failing)
+    assert _temp_files(target.parent) == []
+    assert pl.read_parquet(target)["a"].to_list() == [2]
+
+
+def test_layer_write_profile(project):
+    (project / "kipo_config.toml").write_text(
+        "[storage]\nbase_dir = \"data\"\n"
+        "[storage.layers.gold]\ncompression = \"gzip\"\nsort_by = \"k\"\n",
+        encoding="utf-8")
+    io.write(pl.DataFrame({"k": [3, 1, 2]}), DataLayer.GOLD, "g")
+    io.write(pl.DataFrame({"k": [3, 1, 2]}), DataLayer.SILVER, "s")
+
+    gold = read_footer(io.get_data_path(DataLayer.GOLD, "g"))
+    assert gold["row_groups"][0]["columns"]["k"]["codec"] == "GZIP"
+    assert io.read(DataLayer.GOLD, "g")["k"].to_list() == [1, 2, 3]
+    silver = read_footer(io.get_data_path(DataLayer.SILVER, "s"))
+    assert silver["row_groups"][0]["columns"]["k"]["codec"] != "GZIP"
+
+
+def test_read_cache_hits_and_invalidation(project):
+    io.write(pl.DataFrame({"a": [1]}), DataLayer.SILVER, "t")
+
+    first = io.read(DataLayer.SILVER, "t")
+    io.read(DataLayer.SILVER, "t")
+    assert read_cache.stats()["hits"] == 1
+
+    # La copia entregada no comparte cambios con el caché
+    first.insert_column(1, pl.Series("b", [0]))
+    assert io.read(DataLayer.SILVER, "t").columns == ["a"]
+
+    io.write(pl.DataFrame({"a": [2]}), DataLayer.SILVER, "t")
+    assert io.read(DataLayer.SILVER, "t")["a"].to_list() == [2]
+    assert io.read(DataLayer.SILVER, "t", use_cache=False)["a"].to_list() == [2]
+
+
+def test_scan_pushes_down_projection_and_filters(project):
+    io.write(pl.DataFrame({"a": [1, 2, 3], "b": ["x", "y", "z"], "c": [0.1, 0.2, 0.3]}),
+             DataLayer.GOLD, "t")
+
+    lf = io.scan(DataLayer.GOLD, "t", filters={"a": [2, 3]}).select("b")
+    assert lf.collect()["b"].to_list() == ["y", "z"]
+    # El lector solo trae las columnas usadas y evalúa el filtro al leer
+    plan = lf.explain().upper()
+    assert "PROJECT 2/3" in plan
+    assert "SELECTION" in plan
@@ -0,0 +1,93 @@
+import threading
+
+from sqlmodel import Session
+from kipo.core import jobs
+from kipo.core.db import create_run, get_engine, init_db, update_run_status
+from kipo.core.models import Job, JobStatus, PipelineRun, RunStatus
+
+
+class _DeadProcess:
+    """Proceso worker que ya terminó con `exitcode`."""
+
+    def __init__(self, exitcode):
+        self.exitcode = exitcode
+
+    def is_alive(self):
+        return False
+
+
+def _running_job(project, with_run=True):
+    init_db()
+    run = create_run("main.py") if with_run else None
+    with Session(get_engine()) as session:
+        job = Job(pipeline_name="main.py", status=JobStatus.RUNNING,
+                  run_id=run.id if run else None)
+        session.add(job)
+        session.commit()
+        session.refresh(job)
+    return job, run
+
+
+def _run(run_id):
+    with Session(get_engine()) as session:
+        return session.get(PipelineRun, run_id)
+
+
+def test_crashed_worker_fails_its_run(project):
+    job, run = _running_job(project)
+    dispatcher = jobs.JobDispatcher(max_workers=1)
+    dispatcher._processes[job.id] = _DeadProcess(exitcode=-9)
+
+    dispatcher._reap()
+
+    assert jobs.get_job(job.id).status == JobStatus.FAILED
+    assert _run(run.id).status == RunStatus.FAILED
+    assert "-9" in _run(run.id).error_message
+
+
+def test_failed_pipeline_keeps_its_error(project):
+    job, run = _running_job(project)
+    update_run_status(run.id, RunStatus.FAILED, error_message="boom")
+    dispatcher = jobs.JobDispatcher(max_workers=1)
+    dispatcher._processes[job.id] = _DeadProcess(exitcode=1)
+
+    dispatcher._reap()
+
+    assert _run(run.id).error_message == "boom"
+
+
+def test_recover_fails_lost_runs(project):
+    job, run = _running_job(project)
+    jobs.JobDispatcher(max_workers=1)._recover()
+
+    assert jobs.get_job(job.id).status == JobStatus.FAILED
+    assert _run(run.id).status == RunStatus.FAILED
+
+
+def test_cancel_between_claim_and_start(project, monkeypatch):
+    """Un job cancelado después de reclamarlo y antes de arrancar su proceso no corre."""
+    job, _ = _running_job(project, with_run=False)
+    dispatcher = jobs.JobDispatcher(max_workers=1, poll_seconds=0.01)
+    dispatcher.cancel(job.id)
+
+    claims = iter([job])
+    monkeypatch.setattr(dispatcher, "_claim_next", lambda: next(claims, None))
+
+    def no_process(*args, **kwargs):
+        raise AssertionError("a cancelled job must not start")
+
+    monkeypatch.setattr(jobs._mp, "Process", no_process)
+    loop = threading.Thread(target=dispatcher._loop)
+    loop.start()
+    try:
+        for _ in range(200):
+            if jobs.get_job(job.id).status != JobStatus.RUNNING:
+                break
+            threading.Event().wait(0.01)
+    finally:
+        dispatcher._stop.set()
+        loop.join()
+
+    cancelled = jobs.get_job(job.id)
+    assert cancelled.status == JobStatus.CANCELLED
+    assert cancelled.pid is None
@@ -0,0 +1,27 @@
+from kipo.core import db, profiling, raw_cache
+
+
+def test_project_paths_follow_the_working_directory(project, monkeypatch):
+    """Las rutas de .kipo/ se resuelven en cada uso, no al importar."""
+    assert db.db_dir() == project / ".kipo"
+    assert profiling.profiles_dir() == project / ".kipo" / "profiles"
+    assert raw_cache.cache_dir() == project / ".kipo" / "raw_cache"
+
+    other = project / "other"
+    other.mkdir()
+    monkeypatch.chdir(other)
+    assert db.DB_DIR == other / ".kipo"
+    assert profiling.PROFILES_DIR == other / ".kipo" / "profiles"
+    assert profiling.run_dir(7) == other / ".kipo" / "profiles" / "7"
+
+
+def test_engine_per_project(project, monkeypatch):
+    first = db.get_engine()
+    assert first is db.get_engine()
+
+    other = project / "other"
+    other.mkdir()
+    monkeypatch.chdir(other)
+    db.init_db()
+    assert db.get_engine() is not first
+    assert (other / ".kipo" / db.DB_NAME).exists()
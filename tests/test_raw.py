@@ -0,0 +1,90 @@
+import os
+
+import polars as pl
+import pytest
+from kipo.core import contracts, io, raw_cache
+
+
+@pytest.fixture
+def raw_dir(project):
+    directory = project / "data" / "raw"
+    directory.mkdir(parents=True)
+    return directory
+
+
+def _touch_later(path):
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def test_raw_csv_is_converted_once_and_invalidated(raw_dir):
+    source = raw_dir / "ventas.csv"
+    source.write_text("id,monto\n1,10\n2,20\n", encoding="utf-8")
+
+    assert io.read_raw("ventas.csv")["monto"].to_list() == [10, 20]
+    assert len(raw_cache.entries()) == 1
+    assert io.read_raw("ventas.csv")["monto"].to_list() == [10, 20]
+
+    source.write_text("id,monto\n1,10\n2,20\n3,30\n", encoding="utf-8")
+    _touch_later(source)
+    assert io.read_raw("ventas.csv")["monto"].to_list() == [10, 20, 30]
+    # La copia vieja se reemplaza y no quedan temporales
+    assert len(raw_cache.entries()) == 1
+    assert not list(raw_cache.cache_dir().glob("*.tmp"))
+
+
+def test_raw_glob_is_read_lazily(raw_dir):
+    for i in range(3):
+        (raw_dir / f"v_{i}.csv").write_text(f"id\n{i}\n", encoding="utf-8")
+
+    lf = io.read_raw("v_*.csv")
+    assert isinstance(lf, pl.LazyFrame)
+    assert sorted(lf.collect()["id"]) == [0, 1, 2]
+
+    with pytest.raises(FileNotFoundError):
+        io.read_raw("nada_*.csv")
+
+
+def test_read_raw_many_reads_every_sheet(raw_dir):
+    import xlsxwriter
+
+    with xlsxwriter.Workbook(raw_dir / "finca_a.xlsx") as workbook:
+        pl.DataFrame({"kg": [1, 2]}).write_excel(workbook, worksheet="Semana 1")
+        pl.DataFrame({"kg": [3]}).write_excel(workbook, worksheet="Semana 2")
+        pl.DataFrame({"nota": ["x"]}).write_excel(workbook, worksheet="Resumen")
+    (raw_dir / "finca_b.csv").write_text("kg\n4\n", encoding="utf-8")
+
+    df = io.read_raw_many("finca_*", sheets="Semana *", workers=2)
+    assert df.sort("kg").select("kg", "sheet", "source_file").rows() == [
+        (1, "Semana 1", "finca_a.xlsx"),
+        (2, "Semana 1", "finca_a.xlsx"),
+        (3, "Semana 2", "finca_a.xlsx"),
+        (4, None, "finca_b.csv"),
+    ]
+
+    everything = io.read_raw_many("finca_a.xlsx", sheets="*")
+    assert set(everything["sheet"]) == {"Semana 1", "Semana 2", "Resumen"}
+
+
+def test_schema_contract_is_enforced(raw_dir):
+    source = raw_dir / "precios.csv"
+    source.write_text("codigo,precio\n007,1.5\n010,2\n", encoding="utf-8")
+
+    schema = contracts.infer(source)
+    schema["codigo"] = pl.String
+    contracts.save(source, schema)
+    assert contracts.sidecar_path(source).exists()
+
+    df = io.read_raw("precios.csv")
+    assert df.schema == {"codigo": pl.String, "precio": pl.Float64}
+    assert df["codigo"].to_list() == ["007", "010"]
+
+    source.write_text("codigo,precio\n007,gratis\n", encoding="utf-8")
+    _touch_later(source)
+    with pytest.raises(ValueError):
+        io.read_raw("precios.csv")
+
+    source.write_text("codigo\n007\n", encoding="utf-8")
+    _touch_later(source)
+    with pytest.raises(ValueError):
+        io.read_raw("precios.csv")
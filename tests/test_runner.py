@@ -0,0 +1,127 @@
+import textwrap
+
+import pytest
+from sqlalchemy import text
+from kipo.core import events, io, profiling
+from kipo.core.db import create_run, get_engine, get_step_runs, query_runs
+from kipo.core.definitions import DataLayer
+from kipo.core.models import RunStatus
+from kipo.core.runner import run_pipeline
+
+PIPELINE = """
+import polars as pl
+from kipo.core.decorators import step
+from kipo.core.definitions import DataLayer, WriteMode
+
+@step(DataLayer.BRONZE, mode=WriteMode.APPEND)
+def eventos(i):
+    return pl.DataFrame({"i": [i]})
+
+@step(DataLayer.SILVER)
+def total():
+    from kipo.core import io
+    return io.read(DataLayer.BRONZE, "eventos").select(pl.col("i").sum())
+
+if __name__ == "__main__":
+    for i in range(4):
+        eventos(i)
+    total()
+"""
+
+
+def _pipeline(project, source=PIPELINE, name="main"):
+    pipelines = project / "pipelines"
+    pipelines.mkdir(exist_ok=True)
+    (pipelines / f"{name}.py").write_text(textwrap.dedent(source), encoding="utf-8")
+
+
+def _latest_run(pipeline="main"):
+    runs, _ = query_runs(pipeline=pipeline, limit=1)
+    return runs[0]
+
+
+def test_run_records_status_and_step_metrics(project):
+    _pipeline(project)
+    run_pipeline("main")
+
+    run = _latest_run()
+    assert run.status == RunStatus.SUCCESS
+    steps = get_step_runs(run.id)
+    assert [s.step_name for s in steps] == ["eventos"] * 4 + ["total"]
+    assert steps[-1].output_rows == 1
+    assert all(s.status == RunStatus.SUCCESS and s.wall_seconds is not None for s in steps)
+
+
+def test_history_filter_accepts_name_with_or_without_extension(project):
+    _pipeline(project)
+    run_pipeline("main")
+
+    with_suffix, _ = query_runs(pipeline="main.py")
+    without_suffix, _ = query_runs(pipeline="main")
+    assert [r.id for r in with_suffix] == [r.id for r in without_suffix]
+    assert len(with_suffix) == 1
+
+
+def test_history_keyset_pagination(project):
+    created = [create_run("main.py").id for _ in range(5)]
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = query_runs(pipeline="main", before=cursor, limit=2)
+        seen.extend(r.id for r in page)
+        if cursor is None:
+            break
+    assert seen == sorted(created, reverse=True)
+
+    with pytest.raises(ValueError):
+        query_runs(before="no-es-un-cursor")
+
+
+def test_database_uses_wal(project):
+    create_run("main.py")
+    with get_engine().connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+
+
+def test_append_datasets_are_compacted_after_the_run(project):
+    (project / "kipo_config.toml").write_text(
+        "[storage]\nbase_dir = \"data\"\nmax_fragments = 2\n", encoding="utf-8")
+    _pipeline(project)
+    run_pipeline("main")
+
+    dataset_dir = io.get_dataset_dir(DataLayer.BRONZE, "eventos")
+    assert len(io.list_fragments(dataset_dir)) == 1
+    assert sorted(io.read(DataLayer.BRONZE, "eventos")["i"]) == [0, 1, 2, 3]
+    # El step que leyó los fragmentos antes de compactar vio todas las filas
+    assert io.read(DataLayer.SILVER, "total").item() == 6
+
+
+def test_profiled_run_writes_profiles_in_the_project(project):
+    _pipeline(project)
+    run_pipeline("main", profile=True)
+
+    run_dir = profiling.run_dir(_latest_run().id)
+    assert run_dir.parent == profiling.profiles_dir()
+    assert str(run_dir).startswith(str(project))
+    assert any(run_dir.iterdir())
+
+
+def test_failed_run_publishes_events_and_is_marked_failed(project):
+    _pipeline(project, "raise RuntimeError('boom')\n", name="roto")
+    received = []
+    unsubscribe = events.subscribe(received.append)
+    try:
+        with pytest.raises(RuntimeError):
+            run_pipeline("roto")
+    finally:
+        unsubscribe()
+
+    assert [e["type"] for e in received] == ["run.started", "run.finished"]
+    assert received[-1]["status"] == RunStatus.FAILED
+    run = _latest_run("roto")
+    assert run.status == RunStatus.FAILED
+    assert run.error_message == "boom"
+
+    # Sin suscriptores, publicar no entrega nada
+    events.publish("run.started", run_id=0)
+    assert len(received) == 2
@@ -0,0 +1,149 @@
+import polars as pl
+import pytest
+from kipo.core import cache, io, scheduler, writers
+from kipo.core.context import KipoContext
+from kipo.core.decorators import step
+from kipo.core.definitions import DataLayer, PersistMode, StorageFormat, WriteMode
+
+
+def test_lazy_result_is_streamed_and_returned_as_scan(project):
+    @step(DataLayer.BRONZE)
+    def base():
+        return pl.LazyFrame({"a": [1, 2, 3]})
+
+    out = base()
+    assert isinstance(out, pl.LazyFrame)
+    assert io.get_data_path(DataLayer.BRONZE, "base").exists()
+    assert out.collect()["a"].to_list() == [1, 2, 3]
+    # El siguiente step recibe un scan de kipo: se hashea sin leerlo
+    assert io.scan_signature(out) is not None
+
+
+def test_unchanged_call_is_cached(project):
+    calls = []
+
+    @step(DataLayer.SILVER)
+    def doble(df):
+        calls.append(df.height)
+        return df.with_columns(b=pl.col("a") * 2)
+
+    df = pl.DataFrame({"a": [1, 2]})
+    first = doble(df)
+    assert doble(df).equals(first)
+    assert len(calls) == 1
+
+    doble(pl.DataFrame({"a": [1, 3]}))
+    assert len(calls) == 2
+
+
+def test_dataset_read_inside_step_invalidates_cache(project):
+    io.write(pl.DataFrame({"a": [1]}), DataLayer.BRONZE, "origen")
+    calls = []
+
+    @step(DataLayer.SILVER)
+    def copia():
+        calls.append(1)
+        return io.read(DataLayer.BRONZE, "origen")
+
+    copia()
+    copia()
+    assert len(calls) == 1
+
+    io.write(pl.DataFrame({"a": [2]}), DataLayer.BRONZE, "origen")
+    assert copia()["a"].to_list() == [2]
+    assert len(calls) == 2
+
+
+def test_no_cache_skips_fingerprint_and_drops_the_old_one(project, monkeypatch):
+    @step(DataLayer.SILVER)
+    def valores(n):
+        return pl.DataFrame({"n": [n]})
+
+    valores(1)
+    fingerprint_file = cache.fingerprint_path(io.get_data_path(DataLayer.SILVER, "valores"))
+    assert fingerprint_file.exists()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("fingerprint computed with the cache off")
+
+    KipoContext.get_instance().use_cache = False
+    with monkeypatch.context() as patch:
+        patch.setattr(cache, "fingerprint", fail)
+        valores(2)
+    assert not fingerprint_file.exists()
+
+    # Con el cache de vuelta, la llamada original no devuelve el resultado de otra
+    KipoContext.get_instance().use_cache = True
+    assert valores(1)["n"].to_list() == [1]
+
+
+def test_append_step_returns_only_its_rows(project):
+    @step(DataLayer.BRONZE, mode=WriteMode.APPEND)
+    def eventos(i):
+        return pl.LazyFrame({"i": [i, i]})
+
+    eventos(1)
+    assert eventos(2).collect()["i"].to_list() == [2, 2]
+    assert io.read(DataLayer.BRONZE, "eventos")["i"].to_list() == [1, 1, 2, 2]
+
+
+def test_partitioned_step_returns_only_its_rows(project):
+    @step(DataLayer.SILVER, partition_by=["region"])
+    def ventas(rows):
+        return pl.LazyFrame(rows)
+
+    ventas({"region": ["a", "b"], "monto": [1, 2]})
+    out = ventas({"region": ["b"], "monto": [20]}).collect()
+    assert out.to_dict(as_series=False) == {"region": ["b"], "monto": [20]}
+
+
+def test_upsert_requires_key():
+    with pytest.raises(ValueError):
+        step(DataLayer.SILVER, mode=WriteMode.UPSERT)
+
+
+def test_async_persistence_writes_in_background(project):
+    @step(DataLayer.SILVER, persist=PersistMode.ASYNC)
+    def resultado():
+        return pl.DataFrame({"a": [1, 2]})
+
+    assert resultado()["a"].to_list() == [1, 2]
+    writers.wait_all()
+    assert io.read(DataLayer.SILVER, "resultado")["a"].to_list() == [1, 2]
+
+
+def test_ipc_format_step(project):
+    @step(DataLayer.SILVER, format=StorageFormat.IPC)
+    def intermedio():
+        return pl.DataFrame({"a": [1, 2]})
+
+    intermedio()
+    path = io.get_data_path(DataLayer.SILVER, "intermedio")
+    assert path.suffix == StorageFormat.IPC.suffix
+    assert io.read(DataLayer.SILVER, "intermedio")["a"].to_list() == [1, 2]
+
+
+def test_dag_runs_declared_steps_in_dependency_order(project):
+    order = []
+
+    @step(DataLayer.BRONZE)
+    def origen():
+        order.append("origen")
+        return pl.DataFrame({"a": [1, 2]})
+
+    @step(DataLayer.SILVER)
+    def total(origen):
+        order.append("total")
+        return origen.select(pl.col("a").sum())
+
+    @step(DataLayer.SILVER)
+    def conteo(origen):
+        order.append("conteo")
+        return origen.select(pl.len())
+
+    assert scheduler.has_pending_steps()
+    results = scheduler.run_dag(max_workers=2)
+
+    assert order[0] == "origen"
+    assert sorted(order[1:]) == ["conteo", "total"]
+    assert results["total"].item() == 3
@@ -0,0 +1,51 @@
+import time
+from datetime import datetime
+
+import polars as pl
+import pytest
+from kipo.core import io, versions
+from kipo.core.context import KipoContext
+from kipo.core.definitions import DataLayer
+
+
+def _write_in_run(run_id, values, **kwargs):
+    context = KipoContext.get_instance()
+    context.run_id = run_id
+    try:
+        io.write(pl.DataFrame({"v": values, "run": run_id}), DataLayer.GOLD, "kpi", **kwargs)
+    finally:
+        context.run_id = None
+
+
+def test_each_run_keeps_its_version(project):
+    _write_in_run(1, [1])
+    between = datetime.now()
+    time.sleep(0.01)
+    _write_in_run(2, [2])
+
+    assert io.read(DataLayer.GOLD, "kpi")["v"].to_list() == [2]
+    assert io.read(DataLayer.GOLD, "kpi", version=1)["v"].to_list() == [1]
+    assert io.read(DataLayer.GOLD, "kpi", as_of=between)["v"].to_list() == [1]
+    assert io.scan(DataLayer.GOLD, "kpi", version=2).collect()["v"].to_list() == [2]
+
+    with pytest.raises(FileNotFoundError):
+        io.read(DataLayer.GOLD, "kpi", version=3)
+    with pytest.raises(ValueError):
+        io.read(DataLayer.GOLD, "kpi", version=1, as_of=between)
+
+
+def test_writes_outside_a_run_are_not_versioned(project):
+    io.write(pl.DataFrame({"v": [1]}), DataLayer.GOLD, "kpi")
+    dataset_dir = io.get_dataset_dir(DataLayer.GOLD, "kpi")
+    assert versions.list_versions(dataset_dir) == []
+
+
+def test_prune_keeps_the_newest_versions(project):
+    for run_id in range(1, 5):
+        _write_in_run(run_id, [run_id], partition_by=["v"])
+
+    dataset_dir = io.get_dataset_dir(DataLayer.GOLD, "kpi")
+    assert versions.prune(dataset_dir, keep=2) == [2, 1]
+    assert [v["run_id"] for v in versions.list_versions(dataset_dir)] == [3, 4]
+    # Cada run reemplazó solo su partición: la versión 3 tiene las tres primeras
+    assert sorted(io.read(DataLayer.GOLD, "kpi", version=3)["v"]) == [1, 2, 3]